@@ -3,7 +3,6 @@ import json
 import uuid
 import datetime
 from flask import Flask, render_template, request, jsonify, session
-from groq import Groq
 from dotenv import load_dotenv
 import requests
 from bs4 import BeautifulSoup
@@ -23,11 +22,25 @@ print("====================================================\n")
 
 # Import roadmap generator
 from roadmap_generator import RoadmapGenerator
-from roadmap_integration import update_roadmap_with_dynamic_content, initialize_roadmap_cache
+from roadmap_integration import update_roadmap_with_dynamic_content, initialize_roadmap_cache, roadmap_gen
 from roadmap_knowledge_customizer import update_roadmap_with_knowledge_level
 
 # Import LLM chat handler
 from llm_chat import LLMChatHandler
+from interest_classifier import get_classifier
+
+# Shared, pooled Groq client
+from llm_client import get_groq_client, token_usage
+from llm_cache import response_cache
+from sse import wants_event_stream, sse_response, format_sse, StreamTimer
+from session_store import init_session_store, persist_session
+from keyword_matcher import message_matcher, detect_knowledge_level
+from roadmap_ids import roadmap_etag
+from context_manager import context_manager, context_stats
+from rate_limiter import RateLimited, rate_limiter, rate_limited_response, set_current_user
+from singleflight import singleflight_stats
+from llm_resilience import CircuitOpen, resilience
+from model_router import model_for, router
 
 # Import roadmap knowledge customizer
 from roadmap_knowledge_customizer import update_roadmap_with_knowledge_level
@@ -70,9 +83,15 @@ sample_roadmap = {
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-key-for-careerpath-ai')
 
+# Keep conversation/roadmap state server-side; the cookie only carries the session ID
+session_backend = init_session_store(app)
+
 # Initialize roadmap cache on startup
 initialize_roadmap_cache()
 
+# Train the local interest classifier now rather than inside the first chat request
+get_classifier()
+
 # Serve index.html as the main route
 @app.route('/')
 def index():
@@ -91,16 +110,17 @@ def test_api():
                 'error': 'API key not found'
             })
             
-        # Initialize client
-        client = Groq(api_key=api_key)
+        # Reuse the shared, pooled client
+        client = get_groq_client()
         
-        # Make a simple API call
-        response = client.chat.completions.create(
+        # Make a simple API call (never cached, so an outage shows up at once)
+        response = router.complete(
+            'api_health_check',
+            client=client,
             messages=[
                 {"role": "system", "content": "You are a helpful assistant."},
                 {"role": "user", "content": "Say hello and introduce yourself briefly."}
             ],
-            model="llama3-70b-8192",
             temperature=0.7,
             max_tokens=100
         )
@@ -118,6 +138,64 @@ def test_api():
             'traceback': traceback.format_exc()
         })
 
+# Runtime metrics: LLM token usage, response cache, session store and roadmap memo
+@app.route('/api/metrics')
+def metrics():
+    return jsonify({
+        'token_usage': token_usage.snapshot(),
+        'llm_cache': response_cache.stats(),
+        'sessions': session_backend.stats(),
+        'roadmap_memo': roadmap_gen.cache_stats(),
+        'context': context_stats.snapshot(),
+        'rate_limiter': rate_limiter.stats(),
+        'singleflight': singleflight_stats(),
+        'llm_resilience': resilience.stats(),
+        'model_router': router.stats()
+    })
+
+# The session's roadmap; identical roadmaps have identical ETags, so unchanged ones cost a 304
+@app.route('/api/roadmap')
+def current_roadmap():
+    roadmap = session.get('roadmap', empty_roadmap)
+    response = jsonify(roadmap)
+    response.set_etag(roadmap_etag(roadmap))
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+# Next page of a developer-roadmap node's children, for expanding trimmed roadmaps on click
+@app.route('/api/roadmap/node/<node_id>/children')
+def roadmap_node_children(node_id):
+    roadmap_name = request.args.get('roadmap', '')
+    if not roadmap_name:
+        return jsonify({'error': "Missing 'roadmap' parameter"}), 400
+    try:
+        page = roadmap_gen.get_children_page(
+            roadmap_name, node_id,
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if page is None:
+        return jsonify({'error': f"No node {node_id} in cached roadmap {roadmap_name}"}), 404
+    return jsonify(page)
+
+# A developer-roadmap node's content, loaded when its details are opened; `prefetch`
+# lists related node ids (e.g. visible siblings) to warm in the background
+@app.route('/api/roadmap/node/<node_id>/content')
+def roadmap_node_content(node_id):
+    roadmap_name = request.args.get('roadmap', '')
+    if not roadmap_name:
+        return jsonify({'error': "Missing 'roadmap' parameter"}), 400
+    prefetch_ids = [related for related in request.args.get('prefetch', '').split(',') if related]
+    try:
+        details = roadmap_gen.get_node_details(roadmap_name, node_id, prefetch_ids)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if details is None:
+        return jsonify({'error': f"No node {node_id} in cached roadmap {roadmap_name}"}), 404
+    return jsonify(details)
+
 # Session data to track conversation state
 user_sessions = {}
 
@@ -135,6 +213,7 @@ llm_chat_handler = LLMChatHandler()
 # Chat endpoint
 @app.route('/api/chat', methods=['POST'])
 def chat():
+    timer = StreamTimer()
     try:
         print("\n============ CHAT ENDPOINT CALLED ============")
         print(f"Time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -153,6 +232,8 @@ def chat():
         # Get session ID or create a new one if needed
         if 'session_id' not in session:
             session['session_id'] = str(uuid.uuid4())
+        # LLM calls wait for rate limiter capacity in a queue shared fairly between sessions
+        set_current_user(session['session_id'])
             
         # Initialize conversation history if needed
         if 'conversation' not in session:
@@ -179,9 +260,8 @@ def chat():
                 'roadmap': session['roadmap']
             })
             
-        # Create a direct Groq client with the API key
-        print("Creating Groq client with API key")
-        client = Groq(api_key=api_key)
+        # Reuse the shared, pooled Groq client (keeps connections alive across turns)
+        client = get_groq_client()
         
         # Prepare the messages for the API call with clear instructions for conciseness
         messages = [
@@ -189,173 +269,74 @@ def chat():
             {"role": "system", "content": "RESPONSE FORMAT RULES:\n1) Use bullet points for lists\n2) Maximum 2-3 sentences per paragraph\n3) Only list 1-2 resources per topic\n4) Use markdown for formatting\n5) Focus on next actions, not explanations\n6) Be direct and specific"}
         ]
         
-        # Add conversation history (limited to prevent context overflow)
-        if len(session['conversation']) > 15:
-            # Include the first message and the latest messages
-            messages.append(session['conversation'][0])
-            messages.extend(session['conversation'][-14:])
-        else:
-            messages.extend(session['conversation'])
+        # Add conversation history, packed into the token budget (older turns are summarized)
+        context_state = session.get('context', {})
+        messages = context_manager.pack(session['conversation'], context_state, system=messages, reserve=800)
+        session['context'] = context_state
             
         print(f"Sending {len(messages)} messages to Groq API")
         for i, msg in enumerate(messages):
             print(f"[{i}] {msg['role'].upper()}: {msg['content'][:50]}...")
+        
+        # Stream tokens as Server-Sent Events when the client asks for it.
+        # The roadmap only depends on the user message, so settle it before
+        # the response goes out.
+        if wants_event_stream(request, data):
+            try:
+                # Shed before the stream starts, while a 429 can still be sent
+                rate_limiter.check()
+            except RateLimited as limited:
+                session['conversation'].pop()
+                return rate_limited_response(limited, roadmap=session['roadmap'])
+            update_session_roadmap(user_message)
+            return sse_response(stream_chat_reply(client, messages, timer))
             
         try:
             # Make the API call
-            print("Making API call with model: llama3-70b-8192")
-            response = client.chat.completions.create(
-                messages=messages,
-                model="llama3-70b-8192",  # Use a known working model
-                temperature=0.7,
-                max_tokens=800,
-                top_p=1
-            )
-            
-            # Extract response
-            bot_response = response.choices[0].message.content
-            print(f"API response received: {bot_response[:100]}...")
+            # Opening messages ("hi", "I like AI") repeat across users, so the
+            # first turn is served from the response cache when possible
+            call_site = 'chat_first_turn' if len(session['conversation']) == 1 else 'chat'
+            print(f"Making API call with model: {model_for(call_site)}")
+            try:
+                response = router.complete(
+                    call_site,
+                    client=client,
+                    hedge=True,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=800,
+                    top_p=1
+                )
+                
+                # Extract response
+                bot_response = response.choices[0].message.content
+                print(f"API response received: {bot_response[:100]}...")
+            except CircuitOpen as unavailable:
+                # Groq is unhealthy: answer from the local templates instead of waiting on it
+                print(f"⚠️ {unavailable}, using the fallback response")
+                bot_response = llm_chat_handler._get_smart_fallback_response(
+                    user_message, session.get('interests', []), session['conversation'][:-1])
             
             # Add bot response to conversation history
             session['conversation'].append({"role": "assistant", "content": bot_response})
             
-            # Extract interests and knowledge level from the user message (more sophisticated)
-            interests = []
-            knowledge_level = 'beginner'  # Default level
-            
-            # Check for agentic AI specific interest
-            if 'agentic ai' in user_message.lower() or ('agentic' in user_message.lower() and 'ai' in user_message.lower()):
-                interests.append('agentic-ai')
-                
-                # Determine knowledge level for agentic AI based on mentioned concepts
-                advanced_concepts = ['rag', 'vector embeddings', 'multi-agent systems', 'tree of thought', 'reasoning', 'llm agents']
-                intermediate_concepts = ['frameworks', 'langchain', 'tools', 'agent memory', 'workflows']
-                beginner_concepts = ['what is', 'how to', 'basics', 'fundamentals', 'introduction']
-                
-                # Check for knowledge indicators in the message
-                user_msg_lower = user_message.lower()
-                
-                # Check if user explicitly mentions their knowledge level
-                if 'advanced' in user_msg_lower or 'expert' in user_msg_lower or any(concept in user_msg_lower for concept in advanced_concepts):
-                    knowledge_level = 'advanced'
-                    print(f"Detected ADVANCED knowledge level for agentic AI")
-                elif 'intermediate' in user_msg_lower or any(concept in user_msg_lower for concept in intermediate_concepts):
-                    knowledge_level = 'intermediate'
-                    print(f"Detected INTERMEDIATE knowledge level for agentic AI")
-                elif any(concept in user_msg_lower for concept in beginner_concepts):
-                    knowledge_level = 'beginner'
-                    print(f"Detected BEGINNER knowledge level for agentic AI")
-                
-                print(f"Knowledge level set to: {knowledge_level} for agentic AI")
-            
-            # General AI interest detection
-            elif 'ai' in user_message.lower() or 'artificial intelligence' in user_message.lower() or 'machine learning' in user_message.lower():
-                interests.append('ai')
-            
-            # Other domains (for future expansion)
-            if 'computer science' in user_message.lower() or 'programming' in user_message.lower():
-                interests.append('computer science')
-            if 'web development' in user_message.lower() or 'web' in user_message.lower():
-                interests.append('web development')
-            if 'data science' in user_message.lower() or 'data' in user_message.lower():
-                interests.append('data science')
-                
-            # Store knowledge level in session
-            if 'knowledge_levels' not in session:
-                session['knowledge_levels'] = {}
-            
-            # Update knowledge level for detected interests
-            if interests and interests[0] == 'agentic-ai':
-                session['knowledge_levels']['agentic-ai'] = knowledge_level
-                
-            # Update the interests in the session
-            for interest in interests:
-                if interest not in session['interests']:
-                    session['interests'].append(interest)
-                    
-            # ALWAYS update the roadmap with every message to ensure it persists
-            try:
-                # First, check for keywords that might indicate knowledge level changes
-                user_msg_lower = user_message.lower()
-                roadmap_keywords = {
-                    'beginner': ['beginner', 'basics', 'start', 'new to', 'introduction', 'fundamentals'],
-                    'intermediate': ['intermediate', 'already know', 'familiar with', 'experience with', 'worked with', 'prompt engineering', 'frameworks'],
-                    'advanced': ['advanced', 'expert', 'rag', 'vector embeddings', 'multi-agent systems', 'tree of thought']
-                }
-                
-                # Initialize with previous interests or empty list
-                if 'interests' not in session:
-                    session['interests'] = []
-                
-                # Add new detected interests
-                for interest in interests:
-                    if interest not in session['interests']:
-                        session['interests'].append(interest)
-                
-                # Initialize knowledge levels dictionary if needed
-                if 'knowledge_levels' not in session:
-                    session['knowledge_levels'] = {}
-                
-                # Parse this specific message for knowledge level indicators
-                detected_level = None
-                # Check for specific requests for roadmap changes
-                is_roadmap_request = 'roadmap' in user_msg_lower or 'next steps' in user_msg_lower
-                
-                # Detect knowledge level from current message
-                for level, keywords in roadmap_keywords.items():
-                    if any(keyword in user_msg_lower for keyword in keywords):
-                        detected_level = level
-                        print(f"Detected {level} knowledge level from message")
-                        break
-                
-                # If we found a new knowledge level, update it
-                if detected_level:
-                    if 'agentic-ai' in session['interests'] or 'ai' in session['interests']:
-                        session['knowledge_levels']['agentic-ai'] = detected_level
-                
-                # ALWAYS create a roadmap even if we don't have explicit interests yet
-                # This ensures the roadmap is always shown
-                current_interests = session.get('interests', [])
-                
-                # Default to AI interest if nothing specified yet but they requested a roadmap
-                if (not current_interests) and is_roadmap_request:
-                    current_interests = ['agentic-ai']
-                    session['interests'] = current_interests
-                
-                # If we have interests, create/update the roadmap
-                if current_interests:
-                    # Get current knowledge level (default to beginner if not set)
-                    current_knowledge_level = 'beginner'
-                    if 'knowledge_levels' in session:
-                        current_knowledge_level = session['knowledge_levels'].get('agentic-ai', 'beginner')
-                    
-                    print(f"Generating roadmap with interests: {current_interests}, level: {current_knowledge_level}")
-                    
-                    # Generate a fresh tailored roadmap
-                    updated_roadmap = update_roadmap_with_knowledge_level(
-                        empty_roadmap,  # Start fresh each time 
-                        current_interests,
-                        current_knowledge_level
-                    )
-                    
-                    # ALWAYS save the updated roadmap to session
-                    session['roadmap'] = updated_roadmap
-                    print(f"Roadmap updated successfully with {len(updated_roadmap.get('children', []))} top-level nodes")
-                else:
-                    # If no interests detected yet, use empty roadmap
-                    session['roadmap'] = empty_roadmap
-            except Exception as roadmap_error:
-                print(f"Error updating roadmap: {str(roadmap_error)}")
-                import traceback
-                print(traceback.format_exc())
+            # Detect interests and refresh the roadmap for this turn
+            update_session_roadmap(user_message)
             
             # Return the response to the frontend
             return jsonify({
                 'response': bot_response,
                 'roadmap': session['roadmap'],
+                'roadmap_etag': roadmap_etag(session['roadmap']),
                 'session_id': session['session_id']
             })
             
+        except RateLimited as limited:
+            # Shed under load: answer at once and let the client retry the same message
+            print(f"⚠️ {limited}")
+            session['conversation'].pop()
+            return rate_limited_response(limited, roadmap=session['roadmap'], session_id=session['session_id'])
+            
         except Exception as api_error:
             print(f"Error making API call: {str(api_error)}")
             import traceback
@@ -377,27 +358,172 @@ def chat():
             'roadmap': empty_roadmap
         })
 
+def stream_chat_reply(client, messages, timer):
+    """Yield the chat reply as SSE token events, then a terminal done/error event with the roadmap"""
+    try:
+        parts = []
+        try:
+            # Behind the circuit breaker, with a deadline for the first token
+            for delta in resilience.stream(
+                'chat',
+                client,
+                timer,
+                messages=messages,
+                model=model_for('chat'),
+                temperature=0.7,
+                max_tokens=800,
+                top_p=1
+            ):
+                parts.append(delta)
+                yield format_sse('token', {'text': delta})
+        except CircuitOpen as unavailable:
+            # Groq is unhealthy: answer from the local templates instead of waiting on it
+            print(f"⚠️ {unavailable}, using the fallback response")
+            parts = [llm_chat_handler._get_smart_fallback_response(
+                session['conversation'][-1]['content'], session.get('interests', []), session['conversation'][:-1])]
+            timer.mark_token()
+            yield format_sse('token', {'text': parts[0]})
+        
+        bot_response = "".join(parts)
+        print(f"Streamed response received: {bot_response[:100]}...")
+        
+        # The response headers are already out, so write the session explicitly
+        session['conversation'].append({"role": "assistant", "content": bot_response})
+        persist_session(session)
+        
+        metrics = timer.metrics()
+        print(f"Streamed reply: TTFB {metrics['ttfb_ms']}ms, total {metrics['total_ms']}ms")
+        yield format_sse('done', {
+            'response': bot_response,
+            'roadmap': session['roadmap'],
+            'roadmap_etag': roadmap_etag(session['roadmap']),
+            'session_id': session['session_id'],
+            'metrics': metrics
+        })
+    except Exception as api_error:
+        print(f"Error streaming API response: {str(api_error)}")
+        import traceback
+        print(traceback.format_exc())
+        yield format_sse('error', {
+            'message': "I'm sorry, I encountered an error connecting to my AI capabilities. Please try again.",
+            'roadmap': session['roadmap']
+        })
+
+def update_session_roadmap(user_message):
+    """Detect interests/knowledge level in the message and refresh the session roadmap"""
+    # One scan finds every domain, topic, level and intent keyword in the message
+    matches = message_matcher.scan(user_message)
+    interests = []
+    knowledge_level = 'beginner'  # Default level
+
+    # Check for agentic AI specific interest
+    if matches.has('roadmap_interest', 'agentic ai') or (
+            matches.has('roadmap_interest', 'agentic') and matches.has('roadmap_interest', 'ai')):
+        interests.append('agentic-ai')
+
+        # Determine knowledge level for agentic AI based on mentioned concepts
+        knowledge_level = detect_knowledge_level(matches, default='beginner')
+        print(f"Knowledge level set to: {knowledge_level} for agentic AI")
+
+    # General AI interest detection
+    elif matches.any('roadmap_interest', 'ai', 'artificial intelligence'):
+        interests.append('ai')
+
+    # Other domains (for future expansion)
+    for domain in ('computer science', 'web development', 'data science'):
+        if matches.has('roadmap_interest', domain):
+            interests.append(domain)
+
+    # Store knowledge level in session
+    if 'knowledge_levels' not in session:
+        session['knowledge_levels'] = {}
+
+    # Update knowledge level for detected interests
+    if interests and interests[0] == 'agentic-ai':
+        session['knowledge_levels']['agentic-ai'] = knowledge_level
+
+    # Update the interests in the session
+    for interest in interests:
+        if interest not in session['interests']:
+            session['interests'].append(interest)
+
+    # ALWAYS update the roadmap with every message to ensure it persists
+    try:
+        # Initialize with previous interests or empty list
+        if 'interests' not in session:
+            session['interests'] = []
+
+        # Add new detected interests
+        for interest in interests:
+            if interest not in session['interests']:
+                session['interests'].append(interest)
+
+        # Initialize knowledge levels dictionary if needed
+        if 'knowledge_levels' not in session:
+            session['knowledge_levels'] = {}
+
+        # Parse this specific message for knowledge level indicators
+        detected_level = detect_knowledge_level(matches)
+        if detected_level:
+            print(f"Detected {detected_level} knowledge level from message")
+        # Check for specific requests for roadmap changes
+        is_roadmap_request = matches.has('intent', 'roadmap_request')
+
+        # If we found a new knowledge level, update it
+        if detected_level:
+            if 'agentic-ai' in session['interests'] or 'ai' in session['interests']:
+                session['knowledge_levels']['agentic-ai'] = detected_level
+
+        # ALWAYS create a roadmap even if we don't have explicit interests yet
+        # This ensures the roadmap is always shown
+        current_interests = session.get('interests', [])
+
+        # Default to AI interest if nothing specified yet but they requested a roadmap
+        if (not current_interests) and is_roadmap_request:
+            current_interests = ['agentic-ai']
+            session['interests'] = current_interests
+
+        # If we have interests, create/update the roadmap
+        if current_interests:
+            # Get current knowledge level (default to beginner if not set)
+            current_knowledge_level = 'beginner'
+            if 'knowledge_levels' in session:
+                current_knowledge_level = session['knowledge_levels'].get('agentic-ai', 'beginner')
+
+            # The roadmap is a function of these; skip the rebuild when they haven't changed
+            roadmap_inputs = [list(current_interests), current_knowledge_level]
+            if session.get('roadmap_inputs') == roadmap_inputs and 'roadmap' in session:
+                return
+
+            print(f"Generating roadmap with interests: {current_interests}, level: {current_knowledge_level}")
+
+            # Generate a fresh tailored roadmap (shared template + level overlay)
+            updated_roadmap = update_roadmap_with_knowledge_level(
+                empty_roadmap,  # Start fresh each time 
+                current_interests,
+                current_knowledge_level
+            )
+
+            # ALWAYS save the updated roadmap to session
+            session['roadmap'] = updated_roadmap
+            session['roadmap_inputs'] = roadmap_inputs
+            print(f"Roadmap updated successfully with {len(updated_roadmap.get('children', []))} top-level nodes")
+        else:
+            # If no interests detected yet, use empty roadmap
+            session['roadmap'] = empty_roadmap
+            session.pop('roadmap_inputs', None)
+    except Exception as roadmap_error:
+        print(f"Error updating roadmap: {str(roadmap_error)}")
+        import traceback
+        print(traceback.format_exc())
+
 # Legacy keyword-based interest extraction (now used as fallback in LLMChatHandler)
 # This is kept for reference but no longer directly used
 def extract_interests_legacy(message):
-    interests = []
-    keywords = {
-        'computer science': ['programming', 'code', 'software', 'developer', 'computer science', 'coding'],
-        'ai': ['artificial intelligence', 'ai', 'machine learning', 'ml', 'data science', 'neural networks'],
-        'web development': ['web', 'frontend', 'backend', 'fullstack', 'html', 'css', 'javascript'],
-        'data science': ['data', 'analytics', 'statistics', 'visualization', 'big data'],
-        'cybersecurity': ['security', 'cyber', 'hacking', 'encryption', 'privacy', 'network security'],
-        'mobile development': ['mobile', 'app', 'android', 'ios', 'flutter', 'react native'],
-        'game development': ['game', 'gaming', 'unity', 'unreal', '3d', 'game design'],
-        'cloud computing': ['cloud', 'aws', 'azure', 'devops', 'infrastructure', 'serverless']
-    }
-    
-    message_lower = message.lower()
-    for field, terms in keywords.items():
-        if any(term in message_lower for term in terms):
-            interests.append(field)
-    
-    return interests
+    matches = message_matcher.scan(message)
+    interests = matches.names('domain')
+    # The legacy taxonomy called the AI domain 'ai'
+    return ['ai' if interest == 'artificial intelligence' else interest for interest in interests]
 
 # Update or create roadmap based on identified interests
 def update_roadmap_based_on_interests(current_roadmap, interests):
@@ -655,13 +781,7 @@ def generate_initial_roadmap():
 # These functions have been replaced by the LLMChatHandler which provides
 # more personalized, context-aware responses using the Groq API
 
-# Initialize Groq client
-client = Groq()
-groq_api_key = os.getenv("GROQ_API_KEY")
-if not groq_api_key:
-    print("ERROR: GROQ_API_KEY not set for global client!")
-else:
-    client.api_key = groq_api_key
+# The Groq client is shared process-wide via llm_client.get_groq_client()
 
 # In-memory storage for user sessions (MVP)
 user_sessions: Dict[str, Dict[str, Any]] = {}
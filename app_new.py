@@ -1,16 +1,21 @@
 import chainlit as cl
+import asyncio
 import os
 import json
 from dotenv import load_dotenv
-import groq
 from chainlit.element import Element
 import uuid
+from llm_parallel import call_with_deadline, CHAT_DEADLINE, ROADMAP_DEADLINE
+from model_router import router
+from roadmap_patch import PatchError, parse_roadmap_json
+from context_manager import context_manager
+from rate_limiter import set_current_user
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Groq client
-client = groq.Client(api_key=os.getenv("GROQ_API_KEY"))
+# Groq calls go through the shared async client (llm_client.async_chat_completion,
+# via model_router) so a slow completion never blocks the event loop for other sessions
 
 # Initialize session settings
 @cl.on_chat_start
@@ -742,51 +747,54 @@ async def update_roadmap_from_message(message_text, roadmap):
     Return ONLY the JSON of the updated roadmap, properly formatted.
     """
     
-    # Call the LLM to generate the updated roadmap
+    # Call the LLM to generate the updated roadmap (small model first; a reply
+    # that isn't a valid roadmap is retried on the large one)
     try:
-        response = client.chat.completions.create(
+        response, updated_roadmap = await router.acomplete_parsed(
+            'roadmap_json',
+            parse_roadmap_json,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
-            model="llama-3.3-70b-versatile",
             temperature=0.7,
-            max_tokens=2000
+            max_tokens=2000,
+            timeout=ROADMAP_DEADLINE
         )
         
-        # Extract the response
-        llm_response = response.choices[0].message.content
-        
-        # Try to parse the JSON from the response
-        updated_roadmap = None
-        try:
-            # Find JSON in the response (it might be wrapped in markdown code blocks)
-            json_match = llm_response
-            if "```json" in llm_response:
-                json_match = llm_response.split("```json")[1].split("```")[0].strip()
-            elif "```" in llm_response:
-                json_match = llm_response.split("```")[1].split("```")[0].strip()
-                
-            updated_roadmap = json.loads(json_match)
-        except Exception as e:
-            print(f"Error parsing JSON: {e}")
-            # If parsing fails, just return the original roadmap
-            return roadmap, []
-        
         # Get the IDs of new nodes
         new_node_ids = [node["id"] for node in updated_roadmap["nodes"] if node["id"] not in current_nodes]
         
         return updated_roadmap, new_node_ids
     
+    except PatchError as e:
+        print(f"Error parsing JSON: {e}")
+        # If parsing fails, just return the original roadmap
+        return roadmap, []
+    
     except Exception as e:
         print(f"Error calling LLM: {e}")
         return roadmap, []
 
+async def generate_chat_reply(messages):
+    """Get the assistant's chat reply for the conversation so far"""
+    response = await router.acomplete(
+        'chat',
+        messages=messages,
+        temperature=0.7,
+        max_tokens=800,
+        timeout=CHAT_DEADLINE
+    )
+    return response.choices[0].message.content
+
 @cl.on_message
 async def on_message(message: cl.Message):
     # Get message content
     message_text = message.content
     
+    # LLM calls wait for rate limiter capacity in a queue shared fairly between sessions
+    set_current_user(cl.user_session.get("id"))
+    
     # Get history
     history = cl.user_session.get("history", [])
     history.append({"role": "user", "content": message_text})
@@ -794,34 +802,38 @@ async def on_message(message: cl.Message):
     # Get current roadmap
     roadmap = cl.user_session.get("roadmap", create_default_roadmap())
     
-    # Update the roadmap based on user message
-    updated_roadmap, new_nodes = await update_roadmap_from_message(message_text, roadmap)
-    
-    # Update the session roadmap
-    cl.user_session.set("roadmap", updated_roadmap)
-    
     # Prepare system message
     system_prompt = cl.user_session.get("system_prompt")
     
-    # Create the context for the LLM
-    messages = [
-        {"role": "system", "content": system_prompt},
-    ] + history
+    # Create the context for the LLM, packed into the token budget (older turns
+    # are summarized; an LLM summary would block, so it runs off the event loop)
+    context_state = cl.user_session.get("context") or {}
+    messages = await asyncio.to_thread(
+        context_manager.pack, history, context_state,
+        system=[{"role": "system", "content": system_prompt}], reserve=800
+    )
+    cl.user_session.set("context", context_state)
     
     try:
         # Send typing indicator
         await cl.Message(content="").send()
         
-        # Get response from Groq
-        response = client.chat.completions.create(
-            messages=messages,
-            model="llama-3.3-70b-versatile",
-            temperature=0.7,
-            max_tokens=800
+        # The roadmap update and the chat reply are independent, so run them
+        # concurrently. If Chainlit cancels this handler (the user stopped the
+        # run or disconnected), gather cancels both calls.
+        (updated_roadmap, new_nodes), ai_response = await asyncio.gather(
+            call_with_deadline(
+                update_roadmap_from_message(message_text, roadmap),
+                ROADMAP_DEADLINE, 'roadmap', default=(roadmap, [])
+            ),
+            call_with_deadline(generate_chat_reply(messages), CHAT_DEADLINE, 'chat', default=None)
         )
         
-        # Extract the response
-        ai_response = response.choices[0].message.content
+        # Update the session roadmap
+        cl.user_session.set("roadmap", updated_roadmap)
+        
+        if ai_response is None:
+            raise RuntimeError("the AI service is unavailable right now")
         
         # Update history
         history.append({"role": "assistant", "content": ai_response})
@@ -0,0 +1,110 @@
+"""
+Concurrent-session throughput of one worker's event loop.
+
+Simulates N Chainlit sessions on a single asyncio loop, each sending chat
+turns that make the two Groq calls a turn needs (chat reply + roadmap update,
+gathered concurrently), against a local fake Groq server with an injected
+delay. Three ways of calling Groq from ``async def`` handlers are compared:
+
+    sync      blocking ``Groq`` client called directly (the old handlers)
+    thread    blocking client offloaded with ``asyncio.to_thread``
+    async     shared ``AsyncGroq`` client via ``llm_client.async_chat_completion``
+
+Besides turns/second it reports the worst event-loop stall observed by a
+heartbeat task, i.e. how long every other session on the worker was frozen.
+
+    python benchmarks/bench_async_sessions.py --sessions 1 8 32 64 --turns 3 --delay 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_groq_server import FakeGroqServer
+
+MESSAGES = [
+    {"role": "system", "content": "You are a career advisor."},
+    {"role": "user", "content": "I want to become an AI engineer"}
+]
+
+
+def make_callers():
+    from llm_client import async_chat_completion, llm_clients
+
+    def sync_call():
+        async def call():
+            return llm_clients.get_client().chat.completions.create(
+                messages=MESSAGES, model="llama-3.3-70b-versatile", max_tokens=50)
+        return call
+
+    def thread_call():
+        async def call():
+            return await asyncio.to_thread(
+                llm_clients.get_client().chat.completions.create,
+                messages=MESSAGES, model="llama-3.3-70b-versatile", max_tokens=50)
+        return call
+
+    def async_call():
+        async def call():
+            return await async_chat_completion(
+                'bench', messages=MESSAGES, model="llama-3.3-70b-versatile", max_tokens=50)
+        return call
+
+    return {"sync": sync_call(), "thread": thread_call(), "async": async_call()}
+
+
+async def heartbeat(stop, interval=0.01):
+    """Track the longest time the loop failed to wake this task on schedule"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run_load(call, sessions, turns):
+    async def session():
+        for _ in range(turns):
+            await asyncio.gather(call(), call())
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(session() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_stall = await monitor
+    return sessions * turns / elapsed, worst_stall * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--delay", type=float, default=0.2, help="Injected seconds per fake completion")
+    args = parser.parse_args()
+
+    server = FakeGroqServer(delay=args.delay).start()
+    os.environ["GROQ_API_KEY"] = "bench-key"
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_POOL_SIZE", "128")
+    callers = make_callers()
+
+    print(f"Injected delay per completion: {args.delay * 1000:.0f}ms, {args.turns} turns per session")
+    print(f"{'mode':<8}{'sessions':>9}{'turns/s':>10}{'worst loop stall':>20}")
+    try:
+        for mode, call in callers.items():
+            for sessions in args.sessions:
+                throughput, stall = asyncio.run(run_load(call, sessions, args.turns))
+                print(f"{mode:<8}{sessions:>9}{throughput:>10.1f}{stall:>17.0f}ms")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
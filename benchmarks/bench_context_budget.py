@@ -0,0 +1,99 @@
+"""
+Prompt size per chat turn: whole history vs the token-budgeted context.
+
+Replays synthetic sessions of different lengths through
+context_manager.ContextManager and reports p50/p95 prompt tokens for the
+whole history, app.py's old "first message + last 14" cut and the packed
+context, plus how often older turns were folded into the summary. With
+--llm, summaries come from a local fake Groq server and the summary calls
+are counted.
+
+    python benchmarks/bench_context_budget.py
+    python benchmarks/bench_context_budget.py --budget 2000 --llm
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_groq_server import FakeGroqServer
+
+SESSION_TURNS = [4, 10, 20, 40, 80]
+SESSIONS_PER_LENGTH = 20
+SYSTEM_PROMPT = "You are CareerPath.AI, a helpful career advisor. " * 12
+WORDS = ("agent frameworks memory retrieval python projects roadmap experience career interview "
+         "embeddings evaluation deployment langchain prompts tools research beginner portfolio").split()
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def message(rng, role):
+    sentences = rng.randint(1, 4) if role == 'user' else rng.randint(5, 12)
+    return {"role": role, "content": ' '.join(sentence(rng, rng.randint(6, 18)) for _ in range(sentences))}
+
+
+def old_cut(conversation):
+    """app.py's previous history limit"""
+    if len(conversation) > 15:
+        return [conversation[0]] + conversation[-14:]
+    return conversation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--budget', type=int, default=3000)
+    parser.add_argument('--llm', action='store_true', help="summarize through a fake Groq server")
+    args = parser.parse_args()
+
+    server = None
+    if args.llm:
+        server = FakeGroqServer(reply_text="- User wants to move into agentic AI; intermediate Python.").start()
+        os.environ.update(GROQ_BASE_URL=server.base_url, GROQ_API_KEY=os.getenv('GROQ_API_KEY', 'bench-key'))
+
+    from context_manager import ContextManager, ContextStats, extractive_summary, llm_summarizer, message_tokens
+
+    try:
+        stats = ContextStats(window=100000)
+        manager = ContextManager(budget=args.budget, stats=stats,
+                                 summarizer=llm_summarizer() if args.llm else extractive_summary)
+        system = [{"role": "system", "content": SYSTEM_PROMPT}]
+        rng = random.Random(7)
+        old_sizes = []
+        pack_seconds = 0.0
+        for turns in SESSION_TURNS:
+            for _ in range(SESSIONS_PER_LENGTH):
+                conversation, state = [], {}
+                for _ in range(turns):
+                    conversation.append(message(rng, 'user'))
+                    start = time.perf_counter()
+                    manager.pack(conversation, state, system=system, reserve=800)
+                    pack_seconds += time.perf_counter() - start
+                    old_sizes.append(sum(message_tokens(m) for m in system + old_cut(conversation)))
+                    conversation.append(message(rng, 'assistant'))
+
+        report = stats.snapshot()
+        old_sizes.sort()
+        print(f"{report['turns']} turns over sessions of {SESSION_TURNS} turns, budget {args.budget} tokens")
+        print(f"  whole history   p50 {report['prompt_tokens_p50_full']:6}  p95 {report['prompt_tokens_p95_full']:6}")
+        print(f"  first + last 14 p50 {old_sizes[len(old_sizes) // 2 - 1]:6}  "
+              f"p95 {old_sizes[int(len(old_sizes) * 0.95) - 1]:6}")
+        print(f"  packed          p50 {report['prompt_tokens_p50_packed']:6}  p95 {report['prompt_tokens_p95_packed']:6}")
+        print(f"  {report['summaries']} summary folds ({report['summaries'] / report['turns']:.1%} of turns), "
+              f"pack {pack_seconds / report['turns'] * 1e6:.0f}µs per turn")
+        if server:
+            print(f"  {server.requests} summary calls to the fake Groq server")
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Interest extraction: keyword extractor vs local classifier, accuracy and latency.
+
+Scores ``LLMChatHandler._basic_interest_extraction`` and the NumPy
+``interest_classifier`` on the held-out set in data/interest_eval.json
+(different sentence templates from the training set), then shows how the
+confidence threshold trades LLM escalations for accuracy on the messages
+answered locally.
+
+    python benchmarks/bench_interest_classifier.py
+"""
+
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from interest_classifier import get_classifier
+from llm_chat import LLMChatHandler
+
+
+def score(predictions, examples):
+    exact = sum(set(pred) == set(ex['labels']) for pred, ex in zip(predictions, examples))
+    tp = sum(len(set(pred) & set(ex['labels'])) for pred, ex in zip(predictions, examples))
+    fp = sum(len(set(pred) - set(ex['labels'])) for pred, ex in zip(predictions, examples))
+    fn = sum(len(set(ex['labels']) - set(pred)) for pred, ex in zip(predictions, examples))
+    f1 = 2 * tp / (2 * tp + fp + fn) if tp else 0.0
+    return exact / len(examples), f1
+
+
+def timed(fn, texts, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [fn(text) for text in texts]
+    return results, (time.perf_counter() - start) / (repeat * len(texts)) * 1e6
+
+
+def main():
+    with open(os.path.join(ROOT, 'data', 'interest_eval.json'), 'r', encoding='utf-8') as f:
+        examples = json.load(f)['examples']
+    texts = [example['text'] for example in examples]
+
+    start = time.perf_counter()
+    model = get_classifier()
+    print(f"Training time: {(time.perf_counter() - start) * 1000:.0f}ms, eval set: {len(examples)} messages\n")
+
+    keyword_preds, keyword_us = timed(lambda text: LLMChatHandler._basic_interest_extraction(None, text), texts)
+    model_out, model_us = timed(model.predict, texts)
+    model_preds = [labels for labels, _ in model_out]
+
+    print(f"{'extractor':<12}{'exact match':>12}{'micro F1':>10}{'us/message':>12}")
+    for label, preds, us in (("keywords", keyword_preds, keyword_us), ("classifier", model_preds, model_us)):
+        exact, f1 = score(preds, examples)
+        print(f"{label:<12}{exact:>12.3f}{f1:>10.3f}{us:>12.1f}")
+
+    print(f"\n{'threshold':<12}{'escalated':>10}{'local exact match':>19}")
+    for threshold in (0.5, 0.7, 0.8, 0.9, 0.95):
+        local = [(labels, ex) for (labels, confidence), ex in zip(model_out, examples) if confidence >= threshold]
+        exact = score([labels for labels, _ in local], [ex for _, ex in local])[0] if local else 0.0
+        print(f"{threshold:<12}{1 - len(local) / len(examples):>10.1%}{exact:>19.3f}")
+
+
+if __name__ == "__main__":
+    main()
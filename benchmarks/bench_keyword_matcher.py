@@ -0,0 +1,75 @@
+"""
+Keyword detection: nested substring loops vs the single-pass keyword matcher.
+
+The baseline is the detection the handlers used to do on every message: the
+role/domain loops of the old _basic_interest_extraction plus the level and
+intent checks from app.py and llm_chat.py, each an `any(term in message_lower
+...)` over its own list. The matcher finds all of them in one scan. Also
+shows the substring false positives that word boundaries remove.
+
+    python benchmarks/bench_keyword_matcher.py
+"""
+
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from keyword_matcher import (message_matcher, DOMAIN_KEYWORDS, ROLE_KEYWORDS, LEVEL_KEYWORDS,
+                             TOPIC_KEYWORDS, INTENT_KEYWORDS)
+
+VOCABULARIES = [DOMAIN_KEYWORDS, ROLE_KEYWORDS, LEVEL_KEYWORDS, TOPIC_KEYWORDS, INTENT_KEYWORDS]
+
+
+def substring_scan(message):
+    """The old approach: lowercase, then one `in` test per phrase per vocabulary entry"""
+    found = []
+    for vocabulary in VOCABULARIES:
+        message_lower = message.lower()
+        for name, terms in vocabulary.items():
+            if any(term in message_lower for term in terms):
+                found.append(name)
+    return found
+
+
+def per_message_us(fn, messages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            fn(message)
+    return (time.perf_counter() - start) / (repeat * len(messages)) * 1e6
+
+
+def main():
+    with open(os.path.join(ROOT, 'data', 'interest_eval.json'), 'r', encoding='utf-8') as f:
+        messages = [example['text'] for example in json.load(f)['examples']]
+
+    print(f"Vocabulary: {message_matcher.phrase_count} phrases\n")
+    print(f"{'message length':<18}{'substring loops':>17}{'matcher':>10}{'speedup':>9}")
+    for words in (0, 60, 250, 1000):
+        if words:
+            # Long messages: pad each message with a pasted paragraph
+            filler = " ".join(" ".join(messages).split()[:words])
+            batch = [message + " " + filler for message in messages[:50]]
+        else:
+            batch = messages
+        repeat = max(1, 4000 // len(batch) // (1 + words // 100))
+        length = sum(len(message) for message in batch) // len(batch)
+        old_us = per_message_us(substring_scan, batch, repeat)
+        new_us = per_message_us(message_matcher.scan, batch, repeat)
+        print(f"{str(length) + ' chars':<18}{old_us:>14.1f}us{new_us:>8.1f}us{old_us / new_us:>8.1f}x")
+
+    print("\nSubstring matches that word boundaries drop:")
+    for message in ("I said hello", "Is this a good email template?", "I paid my bills on time",
+                    "Should I study detail-oriented work?", "Tell me about mailing lists"):
+        old = set(substring_scan(message))
+        matches = message_matcher.scan(message)
+        new = {name for group in ('domain', 'role', 'level', 'topic', 'intent') for name in matches.names(group)}
+        print(f"  {message!r}: {sorted(old - new)}")
+
+
+if __name__ == "__main__":
+    main()
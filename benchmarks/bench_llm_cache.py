@@ -0,0 +1,102 @@
+"""
+LLM response cache: latency and API calls with and without caching.
+
+Replays interest-extraction style requests (fixed system prompt, temperature
+0.2) for a stream of user messages drawn from a skewed set of common openers
+against a local fake Groq server, through ``llm_client.complete``:
+
+    off        cache disabled
+    memory     in-memory LRU + TTL
+    disk-warm  fresh process memory, SQLite tier filled by a previous run
+
+    python benchmarks/bench_llm_cache.py --requests 300 --delay 0.15
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_groq_server import FakeGroqServer
+
+SYSTEM_PROMPT = "You are an AI specialized in identifying career interests. Return ONLY a JSON array."
+OPENERS = [
+    "hi", "hello", "I like AI", "I want to learn web development", "how do I become a data scientist",
+    "I'm interested in cloud computing", "what is agentic AI", "I want to build AI agents",
+    "tell me about cybersecurity", "I'm a beginner in programming", "how do I get into machine learning",
+    "I want to become a frontend developer", "what does a DevOps engineer do", "I like games",
+    "blockchain careers", "I'm an intermediate python developer", "ux design", "mobile apps",
+    "I want to switch careers into tech", "what should I learn first"
+]
+
+
+def make_workload(requests, seed=7):
+    rng = random.Random(seed)
+    # Zipf-like skew: a few openers dominate, with a tail of unique messages
+    weights = [1 / (rank + 1) for rank in range(len(OPENERS))]
+    workload = []
+    for i in range(requests):
+        if rng.random() < 0.2:
+            workload.append(f"unique message {i} about my background")
+        else:
+            workload.append(rng.choices(OPENERS, weights)[0])
+    return workload
+
+
+def run(label, workload, server):
+    import llm_client
+    server.reset_counters()
+    timings = []
+    for message in workload:
+        start = time.perf_counter()
+        llm_client.complete(
+            'interest_extraction',
+            messages=[{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": message}],
+            model="llama-3.3-70b-versatile",
+            temperature=0.2,
+            max_tokens=100
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    site = llm_client.response_cache.stats()['call_sites'].get('interest_extraction', {})
+    print(f"{label:<10} mean={statistics.mean(timings):7.1f}ms  p50={statistics.median(timings):7.1f}ms  "
+          f"api_calls={server.requests:>4}  hit_rate={site.get('hit_rate', 0.0):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--delay", type=float, default=0.15, help="Injected seconds per fake completion")
+    args = parser.parse_args()
+
+    server = FakeGroqServer(delay=args.delay, reply_text='["artificial intelligence"]').start()
+    os.environ["GROQ_API_KEY"] = "bench-key"
+    os.environ["GROQ_BASE_URL"] = server.base_url
+
+    import llm_client
+    from llm_cache import LLMResponseCache
+
+    workload = make_workload(args.requests)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "llm_cache.db")
+
+            llm_client.response_cache = LLMResponseCache(enabled=False)
+            run("off", workload, server)
+
+            llm_client.response_cache = LLMResponseCache(sqlite_path=db_path)
+            run("memory", workload, server)
+
+            # Simulate a restart: empty memory tier, same SQLite file
+            llm_client.response_cache = LLMResponseCache(sqlite_path=db_path)
+            run("disk-warm", workload, server)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
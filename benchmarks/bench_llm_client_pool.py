@@ -0,0 +1,74 @@
+"""
+Per-turn latency: new Groq client per request vs the shared pooled client.
+
+Starts a local fake Groq server and runs the same chat completion N times,
+first constructing ``Groq(api_key=...)`` per turn (the old behaviour) and then
+reusing ``llm_client.LLMClientManager``'s keep-alive pool.
+
+    python benchmarks/bench_llm_client_pool.py --turns 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq import Groq
+
+from fake_groq_server import FakeGroqServer
+from llm_client import LLMClientManager
+
+MESSAGES = [
+    {"role": "system", "content": "You are CareerPath.AI, a helpful career advisor."},
+    {"role": "user", "content": "I'm interested in agentic AI and I'm a beginner"}
+]
+
+
+def run_turns(get_client, turns):
+    timings = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        client = get_client()
+        client.chat.completions.create(messages=MESSAGES, model="llama-3.3-70b-versatile", max_tokens=50)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings, connections):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<22} mean={statistics.mean(timings):7.2f}ms  p50={statistics.median(timings):7.2f}ms  "
+          f"p95={p95:7.2f}ms  connections={connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    server = FakeGroqServer().start()
+    try:
+        # Old behaviour: a brand-new client (and connection pool) every turn
+        server.reset_counters()
+        per_request = run_turns(lambda: Groq(api_key="bench", base_url=server.base_url), args.turns)
+        report("client per request", per_request, server.connections)
+
+        # New behaviour: one shared keep-alive pool
+        manager = LLMClientManager(api_key="bench", base_url=server.base_url)
+        manager.get_client()
+        server.reset_counters()
+        pooled = run_turns(manager.get_client, args.turns)
+        report("shared pooled client", pooled, server.connections)
+        manager.close()
+
+        saved = statistics.mean(per_request) - statistics.mean(pooled)
+        print(f"\nSaved per turn: {saved:.2f}ms (local loopback; real TLS handshakes to api.groq.com cost far more)")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Groq calls against a faulty upstream: plain llm_client.complete (the SDK's
+own retries and timeout) vs llm_resilience (deadline, jittered retries,
+hedging, circuit breaker).
+
+Uses the fault injection of the local fake Groq server:
+
+  * latency tail: 5% of requests take 1.5s longer; p50/p95/p99 with and without hedging
+  * flaky: 20% of requests fail with a 503; success rate and latency
+  * hang: every request takes 5s; how long a worker is held with a 1s deadline
+  * outage: every request fails; time per call and upstream requests once the breaker opens
+
+    python benchmarks/bench_llm_resilience.py
+"""
+
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_groq_server import FakeGroqServer
+
+DELAY = 0.05
+CALLS = 200
+MESSAGES = [{"role": "user", "content": "What should I learn first for agentic AI?"}]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, int(round(fraction * len(ordered))) - 1)]
+
+
+def run(call, calls):
+    """Latencies of all calls (successful or not) and the number of failures"""
+    latencies, failures = [], 0
+    for _ in range(calls):
+        start = time.perf_counter()
+        try:
+            call()
+        except Exception:
+            failures += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, failures
+
+
+def report(label, latencies, failures, extra=""):
+    print(f"  {label:10} p50 {percentile(latencies, 0.5) * 1000:6.0f}ms  p95 {percentile(latencies, 0.95) * 1000:6.0f}ms  "
+          f"p99 {percentile(latencies, 0.99) * 1000:6.0f}ms  failed {failures:3}/{len(latencies)}{extra}")
+
+
+def main():
+    server = FakeGroqServer(delay=DELAY).start()
+    os.environ.update(GROQ_BASE_URL=server.base_url, GROQ_API_KEY=os.getenv('GROQ_API_KEY', 'bench-key'))
+
+    import llm_client
+    from llm_resilience import CircuitBreaker, ResilientCaller
+    from rate_limiter import RateLimiter
+
+    llm_client.rate_limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    plain = lambda **kwargs: llm_client.complete('bench', messages=MESSAGES, model="llama-3.3-70b-versatile",
+                                                 max_tokens=50, **kwargs)
+
+    def resilient(**options):
+        caller = ResilientCaller(retries=2, backoff_base=0.05, breaker=CircuitBreaker(failure_threshold=5, cooldown=5),
+                                 **options)
+        caller.hedge_min_samples = 20
+        call = lambda **kwargs: caller.complete('bench', messages=MESSAGES, model="llama-3.3-70b-versatile",
+                                                max_tokens=50, hedge=True, **kwargs)
+        return caller, call
+
+    try:
+        print(f"Latency tail: 5% of requests +1.5s ({CALLS} calls, base {DELAY * 1000:.0f}ms)")
+        server.slow_rate, server.slow_delay = 0.05, 1.5
+        report("plain", *run(plain, CALLS))
+        caller, call = resilient(hedge=True)
+        report("hedged", *run(call, CALLS), f"  hedges {caller.stats()['hedges']}, won {caller.stats()['hedge_wins']}")
+        server.slow_rate = 0.0
+
+        print("Flaky: 20% of requests fail with a 503")
+        server.error_rate = 0.2
+        no_retry = llm_client.get_groq_client().with_options(max_retries=0)
+        report("no retry", *run(lambda: plain(client=no_retry), CALLS))
+        report("sdk retry", *run(plain, CALLS))
+        caller, call = resilient(hedge=False)
+        report("resilient", *run(call, CALLS), f"  retries {caller.stats()['retries']}")
+        server.error_rate = 0.0
+
+        print("Hang: every request takes 5s; caller deadline 1s (5 calls)")
+        server.slow_rate, server.slow_delay = 1.0, 5.0
+        report("plain", *run(lambda: plain(timeout=10), 5))
+        caller, call = resilient(hedge=False)
+        report("resilient", *run(lambda: call(deadline=1.0), 5))
+        server.slow_rate = 0.0
+
+        print("Outage: every request fails (20 calls)")
+        server.outage = True
+        server.reset_counters()
+        report("sdk retry", *run(plain, 20), f"  upstream requests {server.requests}")
+        server.reset_counters()
+        caller, call = resilient(hedge=False)
+        report("resilient", *run(call, 20), f"  upstream requests {server.requests}")
+        print(f"  breaker {caller.breaker.stats()}")
+        server.outage = False
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
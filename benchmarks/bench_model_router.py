@@ -0,0 +1,90 @@
+"""
+Interest extraction on the large model for every call vs routed to the small
+model with escalation when its reply isn't a JSON list.
+
+A local fake Groq server answers the small model faster (SMALL_DELAY vs
+LARGE_DELAY) and returns prose instead of JSON for INVALID_SHARE of the
+small model's replies. Distinct messages go through LLMChatHandler's
+parser via model_router, once routed all-large and once small-first. The
+benchmark reports latency, escalations and tokens per tier.
+
+    python benchmarks/bench_model_router.py
+"""
+
+import json
+import os
+import sys
+import time
+import zlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_groq_server import FakeGroqServer
+
+CALLS = 200
+SMALL_MODEL = "llama-3.1-8b-instant"
+LARGE_MODEL = "llama-3.3-70b-versatile"
+SMALL_DELAY = 0.04
+LARGE_DELAY = 0.20
+INVALID_SHARE = 0.1
+TOPICS = ["ai agents", "web development", "data science", "cloud", "cybersecurity", "devops", "mobile apps"]
+
+
+def reply_for(body):
+    """JSON interests; the small model sometimes answers in prose"""
+    message = body["messages"][-1]["content"]
+    if body["model"] == SMALL_MODEL and zlib.crc32(message.encode()) % 100 < INVALID_SHARE * 100:
+        return "The user seems interested in AI agents and web development."
+    return json.dumps(["ai agents", "web development"])
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, int(round(fraction * len(ordered))) - 1)]
+
+
+def run(router, label):
+    from llm_cache import response_cache
+    from llm_chat import LLMChatHandler
+
+    response_cache.clear()
+    latencies = []
+    for i in range(CALLS):
+        message = f"I'm curious about {TOPICS[i % len(TOPICS)]} (#{i})"
+        start = time.perf_counter()
+        router.complete_parsed('interest_extraction', LLMChatHandler._parse_interest_list,
+                               messages=[{"role": "user", "content": message}], temperature=0.2, max_tokens=100)
+        latencies.append(time.perf_counter() - start)
+    tiers = router.stats()['tiers']
+    print(f"{label}: p50 {percentile(latencies, 0.5) * 1000:5.0f}ms  p95 {percentile(latencies, 0.95) * 1000:5.0f}ms  "
+          f"mean {sum(latencies) / len(latencies) * 1000:5.0f}ms")
+    for tier, stats in tiers.items():
+        if stats['calls']:
+            print(f"  {tier:5}: {stats['calls']:3} calls, {stats['escalations']:3} escalated, "
+                  f"{stats['prompt_tokens'] + stats['completion_tokens']:6} tokens, p95 {stats['p95_ms']}ms")
+
+
+def main():
+    server = FakeGroqServer(model_delays={SMALL_MODEL: SMALL_DELAY, LARGE_MODEL: LARGE_DELAY},
+                            reply_fn=reply_for).start()
+    os.environ.update(GROQ_BASE_URL=server.base_url, GROQ_API_KEY=os.getenv('GROQ_API_KEY', 'bench-key'))
+
+    import llm_client
+    from model_router import ModelRouter
+    from rate_limiter import RateLimiter
+
+    llm_client.rate_limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    models = {'small': SMALL_MODEL, 'large': LARGE_MODEL}
+    print(f"{CALLS} interest extractions; small {SMALL_DELAY * 1000:.0f}ms ({INVALID_SHARE:.0%} invalid replies), "
+          f"large {LARGE_DELAY * 1000:.0f}ms")
+    try:
+        run(ModelRouter(routes={'interest_extraction': 'large'}, models=models), "all large  ")
+        run(ModelRouter(routes={'interest_extraction': 'small'}, models=models), "small first")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Chat-turn latency: chat reply and roadmap update run serially vs concurrently.
+
+Points ``simple_server`` at a local fake Groq server with an injected delay per
+completion. The serial baseline calls ``generate_chat_reply`` and then
+``update_roadmap_with_llm`` the way ``process_chat`` used to; the concurrent
+run posts to ``/api/chat``, which overlaps both through ``llm_parallel``.
+
+    python benchmarks/bench_parallel_turn.py --turns 10 --delay 0.3
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_groq_server import FakeGroqServer
+
+
+def report(label, timings):
+    print(f"{label:<12} p50={statistics.median(timings):8.1f}ms  max={max(timings):8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.3, help="Injected seconds per fake completion")
+    args = parser.parse_args()
+
+    server = FakeGroqServer(delay=args.delay).start()
+    os.environ["GROQ_API_KEY"] = "bench-key"
+    os.environ["GROQ_BASE_URL"] = server.base_url
+
+    import simple_server
+
+    try:
+        serial = []
+        for turn in range(args.turns):
+            user_id = f"serial-{turn}"
+            simple_server.roadmaps[user_id] = simple_server.create_default_roadmap()
+            messages = [{"role": "user", "content": "I want to build AI agents"}]
+            start = time.perf_counter()
+            simple_server.generate_chat_reply(messages)
+            simple_server.update_roadmap_with_llm(user_id, "I want to build AI agents")
+            serial.append((time.perf_counter() - start) * 1000)
+
+        client = simple_server.app.test_client()
+        concurrent = []
+        for _ in range(args.turns):
+            start = time.perf_counter()
+            response = client.post("/api/chat", json={"message": "I want to build AI agents"})
+            response.get_json()
+            concurrent.append((time.perf_counter() - start) * 1000)
+
+        print(f"Injected delay per completion: {args.delay * 1000:.0f}ms, {args.turns} turns")
+        report("serial", serial)
+        report("concurrent", concurrent)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Groq admission control under a burst: one noisy user vs a few light users.
+
+The noisy user fires a burst of concurrent calls while light users send one
+call every few hundred ms, all through llm_client.complete against a local
+fake Groq server. Run once with an unlimited limiter and once with a
+requests/min budget, and compare the peak request rate the API sees, the
+light users' latency, and how quickly over-budget calls are shed (a 429
+instead of a blocked thread).
+
+    python benchmarks/bench_rate_limiter.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_groq_server import FakeGroqServer
+
+NOISY_CALLS = 40
+LIGHT_USERS = 4
+LIGHT_CALLS = 5
+LIGHT_INTERVAL = 0.8
+RPM = 600  # 10 calls/s
+BURST = 5
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, int(round(fraction * len(ordered))) - 1)]
+
+
+def run(limiter):
+    import llm_client
+    from rate_limiter import RateLimited, set_current_user
+
+    llm_client.rate_limiter = limiter
+    results = {'noisy': [], 'light': []}
+    shed = {'noisy': [], 'light': []}
+    finished = []
+    lock = threading.Lock()
+
+    def call(kind, user):
+        set_current_user(user)
+        start = time.perf_counter()
+        try:
+            llm_client.complete('bench', messages=[{"role": "user", "content": "hi"}],
+                                model="llama-3.3-70b-versatile", max_tokens=20, timeout=5)
+            with lock:
+                results[kind].append(time.perf_counter() - start)
+                finished.append(time.perf_counter())
+        except RateLimited:
+            with lock:
+                shed[kind].append(time.perf_counter() - start)
+
+    def light_user(index):
+        threads = []
+        for _ in range(LIGHT_CALLS):
+            thread = threading.Thread(target=call, args=('light', f'light-{index}'))
+            thread.start()
+            threads.append(thread)
+            time.sleep(LIGHT_INTERVAL)
+        for thread in threads:
+            thread.join()
+
+    threads = [threading.Thread(target=call, args=('noisy', 'noisy')) for _ in range(NOISY_CALLS)]
+    threads += [threading.Thread(target=light_user, args=(i,)) for i in range(LIGHT_USERS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    peak = max((sum(1 for t in finished if s <= t < s + 1) for s in finished), default=0)
+    print(f"  API calls {len(finished)} in {elapsed:.1f}s, peak {peak} calls/s")
+    for kind in ('noisy', 'light'):
+        done = results[kind]
+        print(f"  {kind:5}: {len(done):3} answered (p50 {percentile(done, 0.5) * 1000:6.0f}ms, "
+              f"p95 {percentile(done, 0.95) * 1000:6.0f}ms), {len(shed[kind]):3} shed "
+              f"(p95 {percentile(shed[kind], 0.95) * 1000:.1f}ms)")
+
+
+def main():
+    server = FakeGroqServer(delay=0.05).start()
+    os.environ.update(GROQ_BASE_URL=server.base_url, GROQ_API_KEY=os.getenv('GROQ_API_KEY', 'bench-key'))
+    from rate_limiter import RateLimiter, TokenBucket
+    try:
+        print("Unlimited:")
+        run(RateLimiter(requests_per_minute=0, tokens_per_minute=0, queue_size=1000, per_user_queue=1000))
+
+        print(f"Limited to {RPM} requests/min (burst {BURST}), queue 16, 4 per user, 3s max wait:")
+        limiter = RateLimiter(requests_per_minute=RPM, tokens_per_minute=0, queue_size=16, per_user_queue=4, max_wait=3)
+        limiter.requests = TokenBucket(RPM, capacity=BURST)
+        run(limiter)
+        print(f"  limiter stats: {limiter.stats()}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
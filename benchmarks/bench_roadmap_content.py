@@ -0,0 +1,78 @@
+"""
+Opening roadmap node details: content file latency cold vs warm, and for
+siblings prefetched in the background.
+
+The local fixture server adds a 100ms round trip to every request.
+RoadmapGenerator.get_node_details (GET /api/roadmap/node/<id>/content) is
+timed for:
+- a node whose content was never fetched (cold)
+- the same node again (warm, from the disk cache)
+- a sibling that was listed in the first request's prefetch batch
+
+    python benchmarks/bench_roadmap_content.py
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_roadmap_server import FakeRoadmapServer
+from roadmap_generator import RoadmapGenerator
+
+ROADMAP = 'ai-agents'
+DELAY = 0.1
+SAMPLES = 5
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    server = FakeRoadmapServer(delay=DELAY, nodes=2000).start()
+    try:
+        os.environ['ROADMAP_BASE_URL'] = server.base_url
+        gen = RoadmapGenerator(cache_dir=tempfile.mkdtemp())
+        gen.parser.prefetch_roadmaps([ROADMAP])
+        gen.get_trimmed_subtrees(ROADMAP)
+
+        # Sibling groups: open the first child of a parent, prefetch the others
+        pack = gen.parser.load_pack(ROADMAP)
+        families = sorted((pack.children(i) for i in range(pack.node_count)), key=len, reverse=True)[:SAMPLES]
+        parents = [[pack.node(i)['id'] for i in children[:8]] for children in families]
+
+        cold, warm, prefetched, batch = [], [], [], []
+        for siblings in parents:
+            opened, others = siblings[0], siblings[1:]
+            server.reset_counters()
+            cold.append(timed(lambda: gen.get_node_details(ROADMAP, opened, others)))
+            warm.append(timed(lambda: gen.get_node_details(ROADMAP, opened)))
+            # The prefetch batch runs on ROADMAP_CONTENT_WORKERS threads; wait for it
+            start = time.perf_counter()
+            while gen.parser._content_pending:
+                time.sleep(0.005)
+            batch.append((time.perf_counter() - start) * 1000 + cold[-1])
+            prefetched.append(timed(lambda: gen.get_node_details(ROADMAP, others[-1])))
+
+        print(f"Content files over a {DELAY * 1000:.0f}ms round trip, median of {len(cold)} nodes:")
+        print(f"  cold open:            {statistics.median(cold):7.1f}ms")
+        print(f"  warm open (disk):     {statistics.median(warm):7.1f}ms")
+        print(f"  prefetched sibling:   {statistics.median(prefetched):7.1f}ms")
+        sizes = [len(siblings) - 1 for siblings in parents]
+        print(f"  prefetch batches of {min(sizes)}-{max(sizes)} siblings done after "
+              f"{min(batch):.0f}-{max(batch):.0f}ms ({gen.parser.content_workers} workers; "
+              f"{min(sizes) * DELAY * 1000:.0f}-{max(sizes) * DELAY * 1000:.0f}ms if sequential)")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Trimmed roadmap payloads with on-demand expansion vs shipping whole roadmaps.
+
+Serves one synthetic 20k-node roadmap from the local fixture server, then
+compares the JSON size of the trimmed subtrees sent with a chat reply to the
+whole converted roadmap, times GET /api/roadmap/node/<id>/children pages
+(RoadmapGenerator.get_children_page) from the packed and the JSON cache, and
+walks every node through the pages to check the full depth stays reachable.
+
+    python benchmarks/bench_roadmap_expand.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_roadmap_server import FakeRoadmapServer
+from roadmap_generator import RoadmapGenerator
+
+ROADMAP = 'ai-agents'
+NODES = 20000
+
+
+def tree_bytes(roots):
+    """JSON size of a converted tree, each node counted once (iterative: the tree is deep)"""
+    seen, total = set(), 0
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        total += len(json.dumps({key: value for key, value in node.items() if key != 'children'}))
+        stack.extend(node['children'])
+    return total
+
+
+def walk_all(gen, subtrees):
+    """Expand every node page by page; returns (nodes reached, pages fetched)"""
+    seen, pages = set(), 0
+    stack = list(subtrees)
+    while stack:
+        node = stack.pop()
+        if node['id'] in seen:
+            continue
+        seen.add(node['id'])
+        stack.extend(node['children'])
+        cursor = node.get('next_cursor')
+        while cursor is not None:
+            page = gen.get_children_page(ROADMAP, node['id'], cursor, limit=50)
+            pages += 1
+            stack.extend(page['children'])
+            cursor = page['next_cursor']
+    return len(seen), pages
+
+
+def main():
+    server = FakeRoadmapServer(nodes=NODES).start()
+    try:
+        os.environ['ROADMAP_BASE_URL'] = server.base_url
+        cache_dir = tempfile.mkdtemp()
+        for use_packs in (True, False):
+            gen = RoadmapGenerator(cache_dir=cache_dir)
+            gen.parser.use_packs = use_packs
+            subtrees = gen.get_trimmed_subtrees(ROADMAP)
+            full = gen.parser.convert_to_roadmap_nodes(ROADMAP)
+            trimmed_bytes = len(json.dumps(subtrees))
+            full_bytes = tree_bytes(full['children']) if use_packs else None
+
+            # Page through the children of a node below the trimmed depth
+            node = subtrees[0]
+            while node['children']:
+                node = node['children'][0]
+            gen.get_children_page(ROADMAP, node['id'], node['next_cursor'])
+            start = time.perf_counter()
+            for _ in range(200):
+                gen.get_children_page(ROADMAP, node['id'], node['next_cursor'])
+            page_ms = (time.perf_counter() - start) / 200 * 1000
+
+            reached, pages = walk_all(gen, subtrees)
+            label = 'pack' if use_packs else 'JSON'
+            if full_bytes is not None:
+                print(f"Initial payload: {trimmed_bytes / 1024:.1f} KiB trimmed vs {full_bytes / 1024:.0f} KiB+ whole roadmap")
+            print(f"{label}: children page {page_ms:.3f}ms; walked {reached}/{NODES} nodes in {pages} pages")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Deterministic node IDs: repeat turns with the same (interests, level).
+
+Checks that repeated generation gives byte-identical roadmaps (same ETag),
+that merging the dynamic roadmap into a session roadmap turn after turn no
+longer appends duplicate categories, and times the memoized customization
+against building the roadmap from scratch.
+
+    python benchmarks/bench_roadmap_ids.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_roadmap_server import FakeRoadmapServer
+
+TURNS = 10
+EMPTY_ROADMAP = {'id': 'root', 'title': 'My Career Roadmap', 'type': 'ROOT', 'content': 'Your roadmap', 'children': []}
+
+
+def main():
+    server = FakeRoadmapServer(nodes=2000).start()
+    try:
+        os.environ['ROADMAP_BASE_URL'] = server.base_url
+        os.chdir(tempfile.mkdtemp())
+        import roadmap_knowledge_customizer as customizer
+        from roadmap_ids import roadmap_etag
+        from roadmap_integration import update_roadmap_with_dynamic_content
+
+        etags = {roadmap_etag(customizer.update_roadmap_with_knowledge_level(EMPTY_ROADMAP, ['agentic-ai'], 'intermediate'))
+                 for _ in range(TURNS)}
+        print(f"Agentic AI roadmap, {TURNS} turns: {len(etags)} distinct ETag(s)")
+
+        session_roadmap = json.loads(json.dumps(EMPTY_ROADMAP))
+        dynamic_etags = set()
+        for _ in range(TURNS):
+            session_roadmap = update_roadmap_with_dynamic_content(session_roadmap, ['AI', 'Web Development'])
+            dynamic_etags.add(roadmap_etag(session_roadmap))
+        print(f"Dynamic roadmap merged {TURNS} times: {len(session_roadmap['children'])} categories, "
+              f"{len(dynamic_etags)} distinct ETag(s)")
+
+        start = time.perf_counter()
+        for _ in range(200):
+            customizer._customize_roadmap(EMPTY_ROADMAP, ['agentic-ai'], 'advanced')
+        build_us = (time.perf_counter() - start) / 200 * 1e6
+        customizer.update_roadmap_with_knowledge_level(EMPTY_ROADMAP, ['agentic-ai'], 'advanced')
+        start = time.perf_counter()
+        for _ in range(200):
+            customizer.update_roadmap_with_knowledge_level(EMPTY_ROADMAP, ['agentic-ai'], 'advanced')
+        memo_us = (time.perf_counter() - start) / 200 * 1e6
+        print(f"Customized roadmap: built {build_us:.0f}µs, memoized {memo_us:.0f}µs per turn")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
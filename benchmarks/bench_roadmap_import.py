@@ -0,0 +1,75 @@
+"""
+Offline import throughput (roadmap_import.py) on a synthetic developer-roadmap
+tarball, with one worker process vs several.
+
+The archive mimics the repository layout: src/data/roadmaps/<name>/<name>.json
+plus content/<slug>@<id>.md files, alongside unrelated files that the
+importer skips.
+
+    python benchmarks/bench_roadmap_import.py
+"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_roadmap_tree import synthetic_roadmap
+from roadmap_import import import_roadmaps
+from roadmap_parser import RoadmapParser
+
+ROADMAPS = 24
+NODES = 5000
+CONTENT_FILES = 300
+
+
+def add_file(archive, name, text):
+    data = text.encode('utf-8')
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    archive.addfile(info, io.BytesIO(data))
+
+
+def build_archive(path):
+    with tarfile.open(path, 'w:gz') as archive:
+        add_file(archive, 'developer-roadmap-master/README.md', "# developer-roadmap\n")
+        for r in range(ROADMAPS):
+            name = f"roadmap-{r}"
+            base = f"developer-roadmap-master/src/data/roadmaps/{name}"
+            add_file(archive, f"{base}/{name}.json", json.dumps(synthetic_roadmap(NODES, seed=r)))
+            add_file(archive, f"{base}/{name}.md", "---\ntitle: roadmap\n---\n")
+            for c in range(CONTENT_FILES):
+                add_file(archive, f"{base}/content/topic-{c}@n{c}.md", f"# Topic n{c}\n\n" + "Lorem ipsum dolor sit amet. " * 40)
+
+
+def main():
+    scratch = tempfile.mkdtemp()
+    try:
+        archive_path = os.path.join(scratch, 'developer-roadmap.tar.gz')
+        build_archive(archive_path)
+        print(f"Archive: {ROADMAPS} roadmaps x {NODES} nodes + {CONTENT_FILES} content files each, "
+              f"{os.path.getsize(archive_path) / 1e6:.1f} MB compressed\n")
+        print(f"{'workers':>8}{'seconds':>9}{'roadmaps/s':>12}{'nodes/s':>10}{'MB/s':>7}")
+        for workers in (1, 4):
+            cache_dir = os.path.join(scratch, f"cache-{workers}")
+            stats = import_roadmaps(archive_path, cache_dir, workers=workers)['stats']
+            print(f"{workers:>8}{stats['seconds']:>9.2f}{stats['roadmaps_per_second']:>12}"
+                  f"{stats['nodes_per_second']:>10}{stats['mb_per_second']:>7}")
+
+        parser = RoadmapParser(cache_dir=cache_dir, base_url='http://127.0.0.1:9/')
+        names = parser.fetch_all_available_roadmaps()
+        content = parser.fetch_content_file(names[0], 'topic-7@n7')
+        print(f"\nManifest lists {len(names)} roadmaps; content served from the pack: {content.splitlines()[0]!r}")
+    finally:
+        shutil.rmtree(scratch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+RoadmapGenerator.generate_roadmap_for_interests with and without the
+parsed-roadmap memo.
+
+Writes synthetic 2k-node roadmaps (the size of the larger developer-roadmap
+JSONs) into a temporary disk cache, then times repeated generation for the
+same interests: uncached (memo cleared before every call), memoized, and
+right after one roadmap file changes on disk.
+
+    python benchmarks/bench_roadmap_memo.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_roadmap_tree import synthetic_roadmap
+from roadmap_generator import RoadmapGenerator
+
+INTERESTS = ['ai', 'web development']
+NODES = 2000
+CALLS = 50
+
+
+def timed_calls(generator, clear):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        if clear:
+            generator.subtree_cache.clear()
+        generator.generate_roadmap_for_interests(INTERESTS)
+    return (time.perf_counter() - start) / CALLS * 1000
+
+
+def main():
+    cache_dir = tempfile.mkdtemp()
+    generator = RoadmapGenerator(cache_dir=cache_dir)
+    roadmaps = generator.match_interests_to_roadmaps(INTERESTS)[:3]
+    for seed, name in enumerate(roadmaps):
+        with open(os.path.join(cache_dir, f"{name}.json"), 'w') as f:
+            json.dump(synthetic_roadmap(NODES, seed=seed), f)
+
+    uncached = timed_calls(generator, clear=True)
+    generator.subtree_cache.clear()
+    generator.generate_roadmap_for_interests(INTERESTS)
+    memoized = timed_calls(generator, clear=False)
+
+    # A refreshed disk cache gets a new version key on the next call
+    path = os.path.join(cache_dir, f"{roadmaps[0]}.json")
+    os.utime(path, ns=(time.time_ns(), time.time_ns()))
+    start = time.perf_counter()
+    generator.generate_roadmap_for_interests(INTERESTS)
+    after_change = (time.perf_counter() - start) * 1000
+
+    print(f"Roadmaps: {', '.join(roadmaps)} ({NODES} nodes each)")
+    print(f"uncached:            {uncached:8.2f}ms/call")
+    print(f"memoized:            {memoized:8.2f}ms/call ({uncached / memoized:.0f}x)")
+    print(f"after a file change: {after_change:8.2f}ms (one roadmap re-parsed)")
+    print(f"memo stats: {generator.cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Worker startup and memory: JSON roadmap cache vs packed, memory-mapped cache.
+
+Fills a cache with four 20k-node roadmaps from the local fixture server,
+builds their packs once, then starts fresh worker processes that load the
+first two levels of every roadmap (what RoadmapGenerator needs) from either
+format. Reports time to ready and per-worker RSS, split into private
+(anonymous) memory and file-backed pages, which every worker mapping the
+same pack shares through the page cache.
+
+    python benchmarks/bench_roadmap_pack.py
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_roadmap_server import FakeRoadmapServer
+from roadmap_parser import RoadmapParser
+
+ROADMAPS = ['ai-agents', 'frontend', 'backend', 'python']
+NODES = 20000
+WORKERS = 4
+
+
+def rss_kib():
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if name in ('VmRSS', 'RssAnon', 'RssFile'):
+                fields[name] = int(value.split()[0])
+    return fields
+
+
+def worker(cache_dir, base_url, use_packs, max_depth, results):
+    parser = RoadmapParser(cache_dir=cache_dir, base_url=base_url)
+    parser.use_packs = use_packs
+    before = rss_kib()
+    start = time.perf_counter()
+    trees = [parser.convert_to_roadmap_nodes(name, max_depth, 5 if max_depth else None) for name in ROADMAPS]
+    elapsed = time.perf_counter() - start
+    after = rss_kib()
+    results.put((elapsed, {key: after[key] - before[key] for key in after}, len(trees)))
+
+
+def run(cache_dir, base_url, use_packs, max_depth):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(cache_dir, base_url, use_packs, max_depth, results))
+                 for _ in range(WORKERS)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = sum(o[0] for o in outcomes) / len(outcomes)
+    rss = {key: sum(o[1][key] for o in outcomes) / len(outcomes) for key in outcomes[0][1]}
+    return elapsed, rss
+
+
+def main():
+    server = FakeRoadmapServer(nodes=NODES).start()
+    try:
+        cache_dir = tempfile.mkdtemp()
+        parser = RoadmapParser(cache_dir=cache_dir, base_url=server.base_url)
+        for name in ROADMAPS:
+            parser.load_pack(name)
+        json_bytes = sum(os.path.getsize(os.path.join(cache_dir, f"{n}.json")) for n in ROADMAPS)
+        pack_bytes = sum(os.path.getsize(os.path.join(cache_dir, f"{n}.pack")) for n in ROADMAPS)
+        print(f"{len(ROADMAPS)} roadmaps x {NODES} nodes: JSON {json_bytes / 1e6:.1f} MB, packs {pack_bytes / 1e6:.1f} MB")
+        print(f"{WORKERS} fresh worker processes each; per-worker averages\n")
+        print(f"{'load':<26}{'ready':>9}{'RSS':>10}{'private':>10}{'shared file':>13}")
+        for label, max_depth in (("first 2 levels", 2), ("whole roadmaps", None)):
+            for fmt, use_packs in (("JSON", False), ("pack", True)):
+                elapsed, rss = run(cache_dir, server.base_url, use_packs, max_depth)
+                print(f"{label + ', ' + fmt:<26}{elapsed * 1000:>7.0f}ms{rss['VmRSS'] / 1024:>8.1f}MB"
+                      f"{rss['RssAnon'] / 1024:>8.1f}MB{rss['RssFile'] / 1024:>11.1f}MB")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Roadmap-update token cost: full-roadmap rewrite vs patch protocol.
+
+For roadmaps of growing size, compares the old protocol (whole roadmap JSON in
+the prompt, whole updated roadmap in the reply) with ``roadmap_patch`` (one
+summary line per node in the prompt, only the new nodes' ops in the reply).
+Token counts are estimated at ~4 characters per token; the reply in both
+cases adds the same two new nodes with ~150-word details.
+
+Then runs one real round trip per protocol through ``simple_server`` against
+the fake Groq server and prints the tracked usage.
+
+    python benchmarks/bench_roadmap_patch.py --sizes 10 50 200 500
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_groq_server import FakeGroqServer
+from roadmap_patch import apply_patch, build_patch_prompt, parse_patch
+
+DETAIL = " ".join(["Agents plan, call tools and check their own work."] * 18)
+
+
+def make_roadmap(size):
+    nodes = [{"id": "root", "label": "Technology Careers", "type": "category"}]
+    details = {}
+    for i in range(1, size):
+        parent = nodes[(i - 1) // 4]["id"]
+        node_id = f"topic_{i}"
+        nodes.append({"id": node_id, "label": f"Topic number {i}", "type": "topic", "parent": parent})
+        details[node_id] = {"content": DETAIL, "resources": ["Coursera", "edX", "Kaggle Learn"]}
+    return {"nodes": nodes, "nodeDetails": details}
+
+
+def new_ops():
+    return [
+        {"op": "add_node", "id": "ai_agents", "label": "AI Agents", "type": "topic", "parent": "root"},
+        {"op": "set_details", "id": "ai_agents", "content": DETAIL, "resources": ["DeepLearning.AI"]},
+        {"op": "add_node", "id": "ai_agents_tools", "label": "Tool Calling", "type": "subtopic", "parent": "ai_agents"},
+        {"op": "set_details", "id": "ai_agents_tools", "content": DETAIL, "resources": ["Groq docs"]}
+    ]
+
+
+def old_prompt(message, roadmap):
+    return f"""
+    As a career advisor AI, analyze this user message and update their career roadmap.
+    User message: "{message}"
+    Current roadmap: {json.dumps(roadmap)}
+    Return ONLY the complete updated roadmap JSON without any explanation.
+    """
+
+
+def tokens(text):
+    return len(text) // 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 500])
+    args = parser.parse_args()
+
+    message = "I want to build AI agents"
+    print(f"{'nodes':>6}  {'full: prompt':>13} {'reply':>7}   {'patch: prompt':>14} {'reply':>7}   {'saved':>6}")
+    for size in args.sizes:
+        roadmap = make_roadmap(size)
+        patched, added = apply_patch(roadmap, new_ops())
+        assert len(added) == 2
+
+        full_in, full_out = tokens(old_prompt(message, roadmap)), tokens(json.dumps(patched))
+        patch_in, patch_out = tokens(build_patch_prompt(message, roadmap)), tokens(json.dumps({"ops": new_ops()}))
+        saved = 1 - (patch_in + patch_out) / (full_in + full_out)
+        print(f"{size:>6}  {full_in:>13} {full_out:>7}   {patch_in:>14} {patch_out:>7}   {saved:>6.0%}")
+
+    # One real round trip through simple_server with usage tracking
+    server = FakeGroqServer(reply_text=json.dumps({"ops": new_ops()})).start()
+    os.environ["GROQ_API_KEY"] = "bench-key"
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    try:
+        import simple_server
+        from llm_client import token_usage
+        simple_server.roadmaps["bench"] = make_roadmap(200)
+        simple_server.update_roadmap_with_llm("bench", message)
+        assert parse_patch(server.reply_text)
+        print(f"\nsimple_server on a 200-node roadmap: {len(simple_server.roadmaps['bench']['nodes'])} nodes after patch, "
+              f"usage {token_usage.snapshot()['roadmap_patch']}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Cold-start roadmap fetching: serial downloads vs RoadmapParser.prefetch_roadmaps.
+
+Runs against a local fixture server that adds a fixed delay per request (a
+network round trip to GitHub). Measures:
+
+  * boot pre-cache of the four common roadmaps (initialize_roadmap_cache)
+  * a first generate_roadmap_for_interests call for three uncached roadmaps
+  * a prefetch where one roadmap stalls, bounded by ROADMAP_FETCH_TIMEOUT
+
+    python benchmarks/bench_roadmap_prefetch.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_roadmap_server import FakeRoadmapServer
+from roadmap_generator import RoadmapGenerator
+from roadmap_parser import RoadmapParser
+
+DELAY = 0.15
+COMMON_ROADMAPS = ['ai-agents', 'frontend', 'backend', 'python']
+
+
+def serial_fetch(base_url, names):
+    """The previous boot path: one blocking requests.get per roadmap, no shared session"""
+    for name in names:
+        response = requests.get(f"{base_url}{name}/{name}.json")
+        response.raise_for_status()
+        response.json()
+
+
+def main():
+    server = FakeRoadmapServer(delay=DELAY, stalled={'stalled-roadmap'}).start()
+    print(f"Fixture server delay: {DELAY * 1000:.0f}ms per request\n")
+    try:
+        start = time.perf_counter()
+        serial_fetch(server.base_url, COMMON_ROADMAPS)
+        serial = time.perf_counter() - start
+
+        parser = RoadmapParser(cache_dir=tempfile.mkdtemp(), base_url=server.base_url)
+        start = time.perf_counter()
+        parser.prefetch_roadmaps(COMMON_ROADMAPS)
+        concurrent = time.perf_counter() - start
+        print(f"boot pre-cache (4 roadmaps):   serial {serial * 1000:6.0f}ms   prefetch {concurrent * 1000:6.0f}ms")
+
+        generator = RoadmapGenerator(cache_dir=tempfile.mkdtemp())
+        generator.parser = RoadmapParser(cache_dir=generator.parser.cache_dir, base_url=server.base_url)
+        names = generator.match_interests_to_roadmaps(['ai'])[:3]
+        start = time.perf_counter()
+        serial_fetch(server.base_url, names)
+        serial = time.perf_counter() - start
+        start = time.perf_counter()
+        generator.generate_roadmap_for_interests(['ai'])
+        concurrent = time.perf_counter() - start
+        print(f"first roadmap generation (3):  serial {serial * 1000:6.0f}ms   prefetch {concurrent * 1000:6.0f}ms (incl. parsing)")
+
+        server.reset_counters()
+        parser = RoadmapParser(cache_dir=tempfile.mkdtemp(), base_url=server.base_url, timeout=0.5)
+        start = time.perf_counter()
+        failed = parser.prefetch_roadmaps(['frontend', 'stalled-roadmap', 'backend'])
+        elapsed = time.perf_counter() - start
+        print(f"prefetch with a stalled roadmap (timeout 0.5s): {elapsed * 1000:.0f}ms, failed: {sorted(failed)}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Roadmap disk cache revalidation: bytes transferred and latency.
+
+Against a local stand-in that counts response bytes and honours
+If-None-Match, compares refreshing four cached roadmaps by downloading them
+again with revalidating them via conditional GET (304s). It then checks that
+a stale entry inside the stale-while-revalidate window is served at disk speed
+while the refresh runs in the background, and that a changed upstream roadmap
+is picked up.
+
+    python benchmarks/bench_roadmap_revalidation.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_roadmap_server import FakeRoadmapServer
+from roadmap_parser import RoadmapParser
+
+DELAY = 0.15
+ROADMAPS = ['ai-agents', 'frontend', 'backend', 'python']
+
+
+def fetch_all(parser, **policy):
+    start = time.perf_counter()
+    data = [parser.fetch_roadmap_json(name, **policy) for name in ROADMAPS]
+    return data, (time.perf_counter() - start) * 1000
+
+
+def main():
+    server = FakeRoadmapServer(delay=DELAY, nodes=2000).start()
+    try:
+        cache_dir = tempfile.mkdtemp()
+        parser = RoadmapParser(cache_dir=cache_dir, base_url=server.base_url)
+
+        fetch_all(parser)
+        full_bytes = server.bytes_sent
+        print(f"cold fetch:              {server.requests} requests, {full_bytes / 1024:8.1f} KiB")
+
+        # Expired with no SWR window: synchronous conditional GET
+        server.reset_counters()
+        _, elapsed = fetch_all(parser, max_age=0, stale_while_revalidate=0)
+        assert server.not_modified == len(ROADMAPS)
+        print(f"revalidate (expired):    {server.requests} requests, {server.bytes_sent / 1024:8.1f} KiB "
+              f"({server.not_modified} x 304, {elapsed:.0f}ms) vs {full_bytes / 1024:.1f} KiB to re-download")
+
+        # Stale within the SWR window: served from disk, refreshed in the background
+        server.reset_counters()
+        _, elapsed = fetch_all(parser, max_age=0, stale_while_revalidate=3600)
+        deadline = time.time() + 5
+        while server.requests < len(ROADMAPS) and time.time() < deadline:
+            time.sleep(0.01)
+        print(f"stale-while-revalidate:  served in {elapsed:.1f}ms; {server.requests} background refreshes "
+              f"(each round trip {DELAY * 1000:.0f}ms)")
+
+        # Upstream change is picked up on the next revalidation
+        server.reset_counters()
+        before = parser.fetch_roadmap_json('frontend', max_age=3600)
+        server.update_roadmap('frontend')
+        after = parser.fetch_roadmap_json('frontend', max_age=0, stale_while_revalidate=0)
+        assert before != after
+        print(f"upstream change:         1 request, {server.bytes_sent / 1024:8.1f} KiB (new version stored)")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
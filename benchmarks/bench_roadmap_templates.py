@@ -0,0 +1,84 @@
+"""
+Per-turn roadmap customization: rebuilding vs shared templates and overlays.
+
+Times, per chat turn:
+  - building an agentic AI roadmap from literals vs returning the level's
+    precomputed template
+  - deep-copying a large AI roadmap (json round trip, what the old path did
+    before customizing it) vs applying the level overlay to it, which copies
+    only the nodes on changed paths
+and counts how many nodes of the overlaid roadmap are still shared with
+the input.
+
+    python benchmarks/bench_roadmap_templates.py
+"""
+
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import roadmap_knowledge_customizer as customizer
+from roadmap_overlay import apply_overlay, freeze
+
+TURNS = 2000
+FANOUT = 6
+DEPTH = 4
+
+
+def build_ai_roadmap():
+    """Synthetic AI roadmap with FANOUT**DEPTH leaves; one branch has an agents node"""
+    counter = [0]
+
+    def make(depth, title):
+        counter[0] += 1
+        node = {'id': f'n{counter[0]}', 'title': title, 'type': 'TOPIC', 'content': 'x' * 80, 'children': []}
+        if depth < DEPTH:
+            node['children'] = [make(depth + 1, f'Topic {depth}.{i}') for i in range(FANOUT)]
+        return node
+
+    root = make(0, 'My Career Roadmap')
+    root['children'][0]['title'] = 'AI Agents'
+    root['children'][1]['title'] = 'AI Research Papers'
+    return root, counter[0]
+
+
+def count_nodes(node):
+    return 1 + sum(count_nodes(child) for child in node.get('children', ()))
+
+
+def shared_nodes(node, original):
+    if node is original:
+        return count_nodes(node)
+    return sum(shared_nodes(child, other) for child, other in zip(node.get('children', ()), original.get('children', ())))
+
+
+def per_turn_us(fn):
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        fn()
+    return (time.perf_counter() - start) / TURNS * 1e6
+
+
+def main():
+    rebuild_us = per_turn_us(lambda: customizer.generate_agentic_ai_roadmap('advanced'))
+    template_us = per_turn_us(lambda: customizer.update_roadmap_with_knowledge_level({}, ['agentic-ai'], 'advanced'))
+    print(f"Agentic AI roadmap: rebuilt {rebuild_us:.1f}µs, template {template_us:.2f}µs per turn")
+
+    roadmap, nodes = build_ai_roadmap()
+    frozen = freeze(roadmap)
+    # Both paths scan every title for the level's changes; they differ in how they're applied
+    overlay, additions = {}, {}
+    customizer.collect_ai_level_overlay(frozen, 'advanced', overlay, additions)
+    copy_us = per_turn_us(lambda: json.loads(json.dumps(roadmap)))
+    overlay_us = per_turn_us(lambda: apply_overlay(frozen, overlay, additions))
+    result = apply_overlay(frozen, overlay, additions)
+    print(f"AI roadmap ({nodes} nodes): deep copy {copy_us:.0f}µs, overlay {overlay_us:.0f}µs per turn; "
+          f"{shared_nodes(result, frozen)}/{count_nodes(result)} nodes shared with the input")
+
+
+if __name__ == "__main__":
+    main()
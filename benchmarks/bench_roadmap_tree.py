@@ -0,0 +1,77 @@
+"""
+RoadmapParser tree construction on synthetic roadmap graphs of 1k-100k nodes.
+
+Each graph is a random tree (like the developer-roadmap JSONs) plus 5% extra
+cross edges, 1% duplicate edges and a few cycles. The previous root detection
+(for every node, scan every node's children) is timed up to 5k nodes; beyond
+that it takes minutes.
+
+    python benchmarks/bench_roadmap_tree.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from roadmap_parser import RoadmapParser
+
+OLD_MAX_NODES = 5000
+
+
+def synthetic_roadmap(n, seed=0):
+    rng = random.Random(seed)
+    ids = [f"n{i}" for i in range(n)]
+    nodes = [{'id': node_id, 'type': 'text', 'data': {'text': f"Topic {node_id}"}} for node_id in ids]
+    edges = [{'source': ids[rng.randrange(max(0, i - 50), i)], 'target': ids[i]} for i in range(1, n)]
+    for _ in range(n // 20):
+        a, b = sorted(rng.sample(range(n), 2))
+        edges.append({'source': ids[a], 'target': ids[b]})
+    edges.extend(rng.sample(edges, n // 100))
+    for _ in range(5):
+        # Edge back up the tree closes a cycle
+        a = rng.randrange(1, n)
+        edges.append({'source': ids[a], 'target': ids[rng.randrange(0, a)]})
+    return {'nodes': nodes, 'edges': edges}
+
+
+def old_root_detection(json_data):
+    """The previous algorithm: quadratic root scan (and no cycle handling)"""
+    node_map = {node['id']: {'id': node['id'], 'children': []} for node in json_data['nodes']}
+    for connection in json_data['edges']:
+        if connection['source'] in node_map and connection['target'] in node_map:
+            node_map[connection['source']]['children'].append(node_map[connection['target']])
+    root_nodes = []
+    for node_id, node in node_map.items():
+        is_child = False
+        for potential_parent in node_map.values():
+            if any(child['id'] == node_id for child in potential_parent['children']):
+                is_child = True
+                break
+        if not is_child:
+            root_nodes.append(node)
+    return root_nodes
+
+
+def main():
+    parser = RoadmapParser(cache_dir=tempfile.mkdtemp())
+    print(f"{'nodes':>8}{'edges':>9}{'before':>12}{'after':>10}{'after us/node':>15}")
+    for n in (1000, 2000, 5000, 10000, 50000, 100000):
+        data = synthetic_roadmap(n)
+        if n <= OLD_MAX_NODES:
+            start = time.perf_counter()
+            old_root_detection(data)
+            before = f"{(time.perf_counter() - start) * 1000:.0f}ms"
+        else:
+            before = "-"
+        start = time.perf_counter()
+        parser.build_roadmap_tree(data, 'synthetic')
+        elapsed = time.perf_counter() - start
+        print(f"{n:>8}{len(data['edges']):>9}{before:>12}{elapsed * 1000:>8.0f}ms{elapsed / n * 1e6:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Bytes on the wire per chat turn: signed cookie session vs server-side sessions.
+
+Replays the session pattern of ``app.py``'s ``/api/chat`` (conversation
+history, interests, knowledge levels and a roadmap tree kept in ``session``)
+on a minimal Flask app, once with Flask's default cookie session and once per
+server-side backend. For each turn it counts the Cookie request header and
+Set-Cookie response header bytes, and flags cookies past the ~4KB browser limit.
+
+    python benchmarks/bench_session_bytes.py --turns 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify, request, session
+
+from session_store import MemorySessionBackend, SQLiteSessionBackend, init_session_store
+
+COOKIE_LIMIT = 4093
+TOPICS = ["Python", "prompt engineering", "tool calling", "vector databases", "RAG", "evaluation",
+          "LangGraph", "memory", "planning", "guardrails", "fine-tuning", "observability"]
+
+
+def make_reply(turn):
+    """A ~700 character bullet reply that differs per turn (so it compresses like real text)"""
+    rng = random.Random(turn)
+    lines = []
+    for _ in range(8):
+        first, second = rng.sample(TOPICS, 2)
+        lines.append(f"- Week {rng.randint(1, 12)}: pair {first} with {second}; "
+                     f"ship a demo #{rng.randint(100, 999)} and log what broke.")
+    return "\n".join(lines)
+
+
+def make_app(backend=None):
+    app = Flask(__name__)
+    app.secret_key = 'bench'
+    if backend is not None:
+        init_session_store(app, backend)
+
+    @app.route('/api/chat', methods=['POST'])
+    def chat():
+        message = request.get_json()['message']
+        session.setdefault('conversation', [])
+        session.setdefault('interests', [])
+        session.setdefault('knowledge_levels', {})
+        session['conversation'].append({"role": "user", "content": message})
+        reply = make_reply(len(session['conversation']))
+        session['conversation'].append({"role": "assistant", "content": reply})
+        if 'agentic-ai' not in session['interests']:
+            session['interests'].append('agentic-ai')
+        session['knowledge_levels']['agentic-ai'] = 'beginner'
+        turn = len(session['conversation']) // 2
+        session['roadmap'] = {
+            'id': 'root', 'title': 'My Roadmap', 'type': 'ROOT',
+            'children': [{'id': f'topic-{i}', 'title': f'Topic {i}', 'type': 'TOPIC',
+                          'content': 'Learn the fundamentals and build a project.', 'children': []}
+                         for i in range(turn * 2)]
+        }
+        # Mirror app.py: nested appends alone don't mark the cookie session dirty
+        session.modified = True
+        return jsonify({'response': reply, 'roadmap': session['roadmap']})
+
+    return app
+
+
+def run(label, app, turns):
+    client = app.test_client()
+    total = 0
+    rows = []
+    start = time.perf_counter()
+    for turn in range(1, turns + 1):
+        cookie = client.get_cookie('session')
+        sent = len(f"session={cookie.value}") if cookie else 0
+        response = client.post('/api/chat', json={'message': f"Turn {turn}: I want to learn agentic AI"})
+        received = sum(len(value) for value in response.headers.getlist('Set-Cookie'))
+        rows.append((turn, sent, received))
+        total += sent + received
+    elapsed = (time.perf_counter() - start) * 1000
+
+    over_limit = [turn for turn, _, received in rows if received > COOKIE_LIMIT]
+    print(f"\n{label}: {total} cookie bytes over {turns} turns "
+          f"({total / turns:.0f} B/turn avg, {elapsed / turns:.2f}ms/turn)")
+    for turn, sent, received in rows:
+        print(f"  turn {turn:>2}: Cookie {sent:>6} B   Set-Cookie {received:>6} B"
+              f"{'   <-- over browser cookie limit' if received > COOKIE_LIMIT else ''}")
+    if over_limit:
+        print(f"  browsers would drop the session cookie from turn {over_limit[0]} on")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    run("cookie session", make_app(), args.turns)
+    run("server-side (memory)", make_app(MemorySessionBackend()), args.turns)
+    with tempfile.TemporaryDirectory() as tmp:
+        run("server-side (sqlite)", make_app(SQLiteSessionBackend(os.path.join(tmp, 'sessions.db'))), args.turns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Duplicate work when many users ask for the same thing at once, with and
+without single-flight coalescing.
+
+A burst of threads asks, all at the same moment, for:
+
+  * the trimmed subtrees of a roadmap that isn't cached yet (download from a
+    local fixture server, parse, convert), and
+  * the same cacheable first-turn chat completion (local fake Groq server)
+
+and the benchmark counts upstream requests, roadmap conversions and the
+burst's wall time. "Without" swaps every SingleFlight group for one that
+just calls through.
+
+    python benchmarks/bench_singleflight.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_groq_server import FakeGroqServer
+from fake_roadmap_server import FakeRoadmapServer
+
+THREADS = 24
+ROADMAP_DELAY = 0.15
+ROADMAP_NODES = 2000
+GROQ_DELAY = 0.3
+
+
+class CallThrough:
+    """Stand-in for SingleFlight that runs every call"""
+
+    def do(self, key, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def burst(fn):
+    """Run `fn` in THREADS threads released together; returns the wall time"""
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def worker():
+        barrier.wait()
+        try:
+            fn()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return time.perf_counter() - start
+
+
+def roadmap_burst(server, coalesce):
+    from roadmap_generator import RoadmapGenerator
+    from roadmap_parser import RoadmapParser
+
+    generator = RoadmapGenerator(cache_dir=tempfile.mkdtemp())
+    generator.parser = RoadmapParser(cache_dir=generator.parser.cache_dir, base_url=server.base_url)
+    if not coalesce:
+        generator.flights = generator.parser._flights = CallThrough()
+    conversions = []
+    convert = generator.parser.convert_to_roadmap_nodes
+
+    def counted_convert(*args, **kwargs):
+        conversions.append(1)
+        return convert(*args, **kwargs)
+
+    generator.parser.convert_to_roadmap_nodes = counted_convert
+    server.reset_counters()
+    elapsed = burst(lambda: generator.get_trimmed_subtrees('ai-agents'))
+    print(f"  roadmap: {elapsed * 1000:6.0f}ms, {server.requests} downloads, {len(conversions):2} conversions")
+    if coalesce:
+        print(f"  roadmap generator flights: {generator.flights.stats()}")
+
+
+def llm_burst(server, coalesce):
+    import llm_client
+    from llm_cache import response_cache
+    from rate_limiter import RateLimiter
+    from singleflight import SingleFlight
+
+    llm_client.rate_limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0, queue_size=1000,
+                                          per_user_queue=1000)
+    llm_client._flights = SingleFlight('llm_client') if coalesce else CallThrough()
+    response_cache.clear()
+    before = server.requests
+    messages = [{"role": "system", "content": "You are CareerPath.AI."},
+                {"role": "user", "content": "Hi! I want to get into AI agents."}]
+    elapsed = burst(lambda: llm_client.complete('chat_first_turn', messages=messages, model="llama-3.3-70b-versatile",
+                                                temperature=0.7, max_tokens=200, timeout=10))
+    print(f"  chat:    {elapsed * 1000:6.0f}ms, {server.requests - before} API calls")
+
+
+def main():
+    roadmap_server = FakeRoadmapServer(delay=ROADMAP_DELAY, nodes=ROADMAP_NODES).start()
+    groq_server = FakeGroqServer(delay=GROQ_DELAY).start()
+    os.environ.update(GROQ_BASE_URL=groq_server.base_url, GROQ_API_KEY=os.getenv('GROQ_API_KEY', 'bench-key'))
+    print(f"{THREADS} concurrent identical requests, cold caches "
+          f"(roadmap host {ROADMAP_DELAY * 1000:.0f}ms, Groq {GROQ_DELAY * 1000:.0f}ms)")
+    try:
+        for coalesce in (False, True):
+            print("With single-flight:" if coalesce else "Without single-flight:")
+            roadmap_burst(roadmap_server, coalesce)
+            llm_burst(groq_server, coalesce)
+        from singleflight import singleflight_stats
+        print(f"singleflight stats: {singleflight_stats()}")
+    finally:
+        roadmap_server.stop()
+        groq_server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Time-to-first-byte for /api/chat: buffered JSON reply vs SSE streaming.
+
+Points ``simple_server`` at a local fake Groq server that generates tokens at
+a fixed rate and posts the same chat message N times in each mode through the
+Flask test client. TTFB is the time until the first body chunk (JSON mode) or
+the first ``token`` event (stream mode) reaches the caller.
+
+    python benchmarks/bench_sse_ttfb.py --turns 20 --token-delay 0.01
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_groq_server import FakeGroqServer
+
+REPLY = " ".join(["Start with Python, then learn the basics of LLM APIs and tool calling."] * 8)
+
+
+def run_turn(client, stream):
+    start = time.perf_counter()
+    headers = {"Accept": "text/event-stream"} if stream else {}
+    response = client.post("/api/chat", json={"message": "I want to build AI agents"},
+                           headers=headers, buffered=False)
+    ttfb = None
+    body = []
+    for chunk in response.response:
+        if ttfb is None and (not stream or b"event: token" in chunk):
+            ttfb = (time.perf_counter() - start) * 1000
+        body.append(chunk)
+    response.close()
+    total = (time.perf_counter() - start) * 1000
+    if stream and b"event: done" not in b"".join(body):
+        raise RuntimeError("stream ended without a done event")
+    if not stream:
+        json.loads(b"".join(body))
+    return ttfb, total
+
+
+def report(label, results):
+    ttfb = sorted(r[0] for r in results)
+    total = sorted(r[1] for r in results)
+    print(f"{label:<10} TTFB p50={statistics.median(ttfb):8.1f}ms  max={ttfb[-1]:8.1f}ms   "
+          f"total p50={statistics.median(total):8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.05, help="Fake server delay before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Fake server seconds per token")
+    args = parser.parse_args()
+
+    server = FakeGroqServer(delay=args.delay, token_delay=args.token_delay, reply_text=REPLY).start()
+    os.environ["GROQ_API_KEY"] = "bench-key"
+    os.environ["GROQ_BASE_URL"] = server.base_url
+
+    import simple_server
+    client = simple_server.app.test_client()
+
+    try:
+        for label, stream in (("json", False), ("sse", True)):
+            results = [run_turn(client, stream) for _ in range(args.turns)]
+            report(label, results)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
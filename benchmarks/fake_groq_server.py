@@ -0,0 +1,244 @@
+"""
+Local stand-in for the Groq chat completions API, used by the benchmarks.
+
+Serves ``POST /openai/v1/chat/completions`` with an OpenAI-compatible JSON
+body over HTTP/1.1 keep-alive, so the real ``groq`` SDK can be pointed at it
+via ``base_url``. Counts accepted TCP connections and requests so benchmarks
+can show how many handshakes a code path pays for.
+
+``delay`` models queueing/prompt processing before the first token and
+``token_delay`` models per-token generation time. Non-streamed requests pay
+for the whole reply before any byte is sent; ``"stream": true`` requests get
+one ``chat.completion.chunk`` SSE event per token followed by ``[DONE]``.
+
+``model_delays`` overrides ``delay`` per model and ``reply_fn(body)``
+replaces the canned reply of non-streamed requests, e.g. to answer
+differently per model.
+
+Faults can be injected for resilience tests: ``error_rate`` answers that
+share of requests with ``error_status`` (503 by default), ``slow_rate``
+adds ``slow_delay`` to that share (a latency tail), and setting ``outage``
+fails every request until it is cleared.
+
+Run standalone:
+    python benchmarks/fake_groq_server.py --port 8765 --delay 0.05 --token-delay 0.01
+"""
+
+import argparse
+import json
+import random
+import re
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    """Handles chat completion requests with a canned reply"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; without TCP_NODELAY the
+        # delayed-ACK/Nagle interaction adds ~40ms to every keep-alive request
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.record_connection()
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.server.record_request()
+
+        fault = self.server.pick_fault()
+        if fault == "error":
+            self._send_error(self.server.error_status)
+            return
+        delay = self.server.model_delays.get(body.get("model"), self.server.delay)
+        if delay:
+            time.sleep(delay)
+        if fault == "slow":
+            time.sleep(self.server.slow_delay)
+
+        if body.get("stream"):
+            self._stream_reply(body)
+            return
+
+        reply = self.server.reply_fn(body) if self.server.reply_fn else self.server.reply_text
+        if self.server.token_delay:
+            time.sleep(self.server.token_delay * len(_split_tokens(reply)))
+        payload = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": sum(len(m.get("content", "")) // 4 for m in body.get("messages", [])),
+                "completion_tokens": len(reply) // 4,
+                "total_tokens": 0
+            }
+        }
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int):
+        data = json.dumps({"error": {"message": "injected fault", "type": "server_error"}}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_reply(self, body):
+        """Send the reply one token per SSE chunk using chunked transfer encoding"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        created = int(time.time())
+        for token in _split_tokens(self.server.reply_text):
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model", "fake-model"),
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+        # Like Groq, the last chunk carries the usage under x_groq
+        final = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": body.get("model", "fake-model"),
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"id": "req-fake", "usage": {
+                "prompt_tokens": sum(len(m.get("content", "")) // 4 for m in body.get("messages", [])),
+                "completion_tokens": len(self.server.reply_text) // 4,
+                "total_tokens": 0
+            }}
+        }
+        self._write_chunk(f"data: {json.dumps(final)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text: str):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def _split_tokens(text: str) -> List[str]:
+    """Rough word-level tokenization that keeps the whitespace"""
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    """Threaded fake Groq server with connection/request counters"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, delay: float = 0.0,
+                 reply_text: str = "Hello! I'm a stand-in for the Groq API.",
+                 token_delay: float = 0.0, error_rate: float = 0.0, error_status: int = 503,
+                 slow_rate: float = 0.0, slow_delay: float = 1.0, seed: int = 0,
+                 model_delays: Optional[Dict[str, float]] = None,
+                 reply_fn: Optional[Callable[[dict], str]] = None):
+        super().__init__(("127.0.0.1", port), FakeGroqHandler)
+        self.delay = delay
+        self.token_delay = token_delay
+        self.reply_text = reply_text
+        self.model_delays = model_delays or {}
+        self.reply_fn = reply_fn
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.outage = False
+        self.connections = 0
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._counter_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record_connection(self):
+        with self._counter_lock:
+            self.connections += 1
+
+    def record_request(self):
+        with self._counter_lock:
+            self.requests += 1
+
+    def pick_fault(self) -> Optional[str]:
+        """"error", "slow" or None for the next request"""
+        with self._counter_lock:
+            roll = self._random.random()
+            if self.outage or roll < self.error_rate:
+                self.errors += 1
+                return "error"
+            if roll < self.error_rate + self.slow_rate:
+                return "slow"
+            return None
+
+    def handle_error(self, request, client_address):
+        # Clients that give up on slow requests close the socket mid-reply
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def reset_counters(self):
+        with self._counter_lock:
+            self.connections = 0
+            self.requests = 0
+            self.errors = 0
+
+    def start(self) -> "FakeGroqServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local fake Groq API server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before replying")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds per generated token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of requests delayed by --slow-delay")
+    parser.add_argument("--slow-delay", type=float, default=1.0, help="Extra seconds for slow requests")
+    args = parser.parse_args()
+
+    server = FakeGroqServer(port=args.port, delay=args.delay, token_delay=args.token_delay,
+                            error_rate=args.error_rate, slow_rate=args.slow_rate, slow_delay=args.slow_delay)
+    print(f"Fake Groq server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
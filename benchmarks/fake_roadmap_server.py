@@ -0,0 +1,170 @@
+"""
+Local stand-in for raw.githubusercontent.com serving developer-roadmap data,
+used by the roadmap fetching benchmarks.
+
+Serves ``GET /<name>/<name>.json`` (a synthetic roadmap graph) and
+``GET /<name>/content/<file>.md`` under the same layout as the upstream
+repository, so ``RoadmapParser`` can be pointed at it via ``ROADMAP_BASE_URL``
+or its ``base_url`` attribute. ``delay`` models the network round trip;
+names in ``stalled`` hang for ``stall_delay`` to exercise timeouts.
+
+Responses carry an ETag and Last-Modified; a matching ``If-None-Match``
+gets an empty 304. ``bytes_sent`` counts response body bytes so benchmarks
+can show what revalidation saves, and ``update_roadmap`` publishes a new
+version of a roadmap.
+
+Run standalone:
+    python benchmarks/fake_roadmap_server.py --port 8766 --delay 0.15
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_roadmap_tree import synthetic_roadmap
+
+
+class FakeRoadmapHandler(BaseHTTPRequestHandler):
+    """Serves roadmap JSON and content files from memory"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.record_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.record_request()
+        parts = self.path.strip("/").split("/")
+        name = parts[0] if parts else ""
+
+        if name in self.server.stalled:
+            time.sleep(self.server.stall_delay)
+        elif self.server.delay:
+            time.sleep(self.server.delay)
+
+        if len(parts) == 2 and parts[1] == f"{name}.json":
+            self._send_versioned(self.server.roadmap_body(name), "application/json")
+        elif len(parts) == 3 and parts[1] == "content" and parts[2].endswith(".md"):
+            text = f"# {parts[2][:-3]}\n\nContent for {parts[2][:-3]} in the {name} roadmap.\n"
+            self._send_versioned(text.encode("utf-8"), "text/markdown")
+        else:
+            self._send(404, b"Not Found", "text/plain")
+
+    def _send_versioned(self, body: bytes, content_type: str):
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.record_not_modified()
+            self._send(304, b"", content_type, {"ETag": etag})
+            return
+        self._send(200, body, content_type, {"ETag": etag, "Last-Modified": self.server.last_modified})
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.record_bytes(len(body))
+
+
+class FakeRoadmapServer(ThreadingHTTPServer):
+    """Threaded fake roadmap host with connection/request counters"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, delay: float = 0.0, nodes: int = 500,
+                 stalled: Iterable[str] = (), stall_delay: float = 30.0):
+        super().__init__(("127.0.0.1", port), FakeRoadmapHandler)
+        self.delay = delay
+        self.nodes = nodes
+        self.stalled = set(stalled)
+        self.stall_delay = stall_delay
+        self.connections = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.last_modified = formatdate(usegmt=True)
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        # Same shape as the upstream base URL (trailing slash, roadmap dirs below it)
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def roadmap_body(self, name: str) -> bytes:
+        with self._lock:
+            if name not in self._bodies:
+                self._bodies[name] = json.dumps(synthetic_roadmap(self.nodes, seed=len(self._bodies))).encode("utf-8")
+            return self._bodies[name]
+
+    def update_roadmap(self, name: str, seed: int = 1000):
+        """Publish a new version of a roadmap (new body, ETag and Last-Modified)"""
+        with self._lock:
+            self._bodies[name] = json.dumps(synthetic_roadmap(self.nodes, seed=seed)).encode("utf-8")
+            self.last_modified = formatdate(usegmt=True)
+
+    def record_bytes(self, count: int):
+        with self._lock:
+            self.bytes_sent += count
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def reset_counters(self):
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+            self.not_modified = 0
+            self.bytes_sent = 0
+
+    def start(self) -> "FakeRoadmapServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local fake developer-roadmap host")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before replying")
+    parser.add_argument("--nodes", type=int, default=500, help="Nodes per synthetic roadmap")
+    args = parser.parse_args()
+
+    server = FakeRoadmapServer(port=args.port, delay=args.delay, nodes=args.nodes)
+    print(f"Fake roadmap server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
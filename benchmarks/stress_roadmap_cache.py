@@ -0,0 +1,117 @@
+"""
+Multi-process stress test for the roadmap disk cache.
+
+Several worker processes (like gunicorn workers sharing ``roadmap_cache/``)
+read the same roadmaps in a tight loop. The entries expire every few
+milliseconds and the fixture server keeps publishing new versions, so
+downloads, revalidations and reads constantly overlap. Every read has to
+parse as complete JSON.
+
+The first run uses the old in-place writes (``open(path, 'w')`` then
+``json.load``) to show the failure mode. The second uses RoadmapParser.
+
+    python benchmarks/stress_roadmap_cache.py
+
+ext4 flushes file data when a rename replaces an existing file
+(auto_da_alloc), which costs tens of milliseconds per cache write on some
+disks. Set TMPDIR=/dev/shm to measure the locking itself rather than the
+disk.
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_roadmap_server import FakeRoadmapServer
+from roadmap_parser import RoadmapParser
+
+WORKERS = 6
+DURATION = 3.0
+ROADMAPS = ['frontend', 'backend']
+
+
+def legacy_worker(cache_dir, base_url, results):
+    """The previous code path: in-place write, then json.load of whatever is there"""
+    import requests
+    reads = errors = 0
+    deadline = time.time() + DURATION
+    while time.time() < deadline:
+        for name in ROADMAPS:
+            path = os.path.join(cache_dir, f"{name}.json")
+            try:
+                if reads % 5 == 0 or not os.path.exists(path):
+                    data = requests.get(f"{base_url}{name}/{name}.json").json()
+                    with open(path, 'w') as f:
+                        json.dump(data, f)
+                with open(path, 'r') as f:
+                    json.load(f)
+            except ValueError:
+                errors += 1
+            reads += 1
+    results.put((reads, errors))
+
+
+def parser_worker(cache_dir, base_url, results):
+    parser = RoadmapParser(cache_dir=cache_dir, base_url=base_url)
+    reads = errors = 0
+    deadline = time.time() + DURATION
+    while time.time() < deadline:
+        for name in ROADMAPS:
+            try:
+                data = parser.fetch_roadmap_json(name, max_age=0.005, stale_while_revalidate=0)
+                if not isinstance(data.get('nodes'), list):
+                    errors += 1
+            except ValueError:
+                errors += 1
+            reads += 1
+    results.put((reads, errors))
+
+
+def run(worker, server):
+    cache_dir = tempfile.mkdtemp()
+    results = multiprocessing.Queue()
+    server.reset_counters()
+    stop = threading.Event()
+
+    def publish():
+        seed = 0
+        while not stop.wait(0.05):
+            seed += 1
+            server.update_roadmap(ROADMAPS[seed % len(ROADMAPS)], seed=seed)
+
+    publisher = threading.Thread(target=publish, daemon=True)
+    publisher.start()
+    processes = [multiprocessing.Process(target=worker, args=(cache_dir, server.base_url, results)) for _ in range(WORKERS)]
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    stop.set()
+    reads = sum(r for r, _ in totals)
+    errors = sum(e for _, e in totals)
+    return reads, errors, server.requests, server.not_modified
+
+
+def main():
+    server = FakeRoadmapServer(nodes=2000).start()
+    try:
+        print(f"{WORKERS} processes x {DURATION:.0f}s, {len(ROADMAPS)} roadmaps, new upstream version every 50ms\n")
+        for label, worker in (("in-place writes", legacy_worker), ("RoadmapParser", parser_worker)):
+            reads, errors, requests_made, not_modified = run(worker, server)
+            print(f"{label:<16} reads {reads:6d}  corrupt reads {errors:5d}  "
+                  f"upstream requests {requests_made:5d} ({not_modified} x 304)")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Token-budgeted conversation context with a rolling summary of older turns.
+
+Chat prompts used to include the whole conversation, so prompt tokens (and
+latency) grew with every turn. `ContextManager.pack` keeps the prompt under
+a token budget: the pinned system messages, a summary of the older turns,
+then as many recent messages as fit. When the recent messages outgrow the
+budget, the oldest ones are folded into the summary, enough at once that
+folding doesn't happen on every turn.
+
+Per-conversation state (token counts, summary) is a small JSON-serializable
+dict the caller keeps next to the history, e.g. in the session, so each
+message is counted once. The history must be append-only, apart from
+dropping its latest messages; if it shrinks below the summarized part, the
+state is rebuilt.
+
+Tokens are estimated from character counts (token_estimate.py), which is
+close enough for budgeting and needs no tokenizer.
+
+Environment:
+    CONTEXT_TOKEN_BUDGET          prompt budget in tokens (default 3000)
+    CONTEXT_SUMMARY_MAX_TOKENS    summary size cap (default 400)
+    CONTEXT_SUMMARY_MODE          extractive (default) or llm
+    CONTEXT_SUMMARY_MODEL         model for llm summaries (default: the small tier of model_router)
+    CONTEXT_STATS_WINDOW          turns kept for the p50/p95 report (default 1000)
+"""
+
+import os
+import re
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from model_router import router
+from token_estimate import MESSAGE_OVERHEAD_TOKENS, Message, estimate_tokens, message_tokens
+
+# After folding, recent messages take at most this share of the room left for them
+FOLD_TARGET = 0.5
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+Summarizer = Callable[[str, List[Message], int], str]
+
+
+def _first_sentence(text: str, limit: int = 200) -> str:
+    text = ' '.join(text.split())
+    sentence = re.split(r'(?<=[.!?])\s', text, maxsplit=1)[0]
+    return sentence if len(sentence) <= limit else sentence[:limit - 3].rstrip() + '...'
+
+
+def extractive_summary(previous: str, messages: List[Message], max_tokens: int) -> str:
+    """
+    Previous summary plus one line per folded message (its first sentence);
+    the oldest lines are dropped once the summary exceeds `max_tokens`
+    """
+    lines = previous.splitlines() if previous else []
+    for message in messages:
+        content = message.get('content') or ''
+        if content.strip():
+            lines.append(f"- {message.get('role', 'user').title()}: {_first_sentence(content)}")
+    while len(lines) > 1 and estimate_tokens('\n'.join(lines)) > max_tokens:
+        lines.pop(0)
+    return '\n'.join(lines)
+
+
+def llm_summarizer(model: Optional[str] = None) -> Summarizer:
+    """Summarizer that asks a (small) model to fold turns into the summary; extractive on failure"""
+    model = model or os.getenv('CONTEXT_SUMMARY_MODEL') or None
+
+    def summarize(previous: str, messages: List[Message], max_tokens: int) -> str:
+        transcript = '\n'.join(f"{m.get('role', 'user').upper()}: {m.get('content', '')}" for m in messages)
+        prompt = (
+            "Update the running summary of a career-guidance conversation. Keep the user's interests, "
+            "experience level, goals and any decisions or recommendations; drop small talk. "
+            f"Reply with the updated summary only, at most {max_tokens * 3 // 4} words.\n\n"
+            f"Current summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"
+        )
+        try:
+            # Routed to the small tier unless a model is pinned
+            response = router.complete(
+                'context_summary',
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                max_tokens=max_tokens
+            )
+            summary = (response.choices[0].message.content or '').strip()
+            if summary:
+                return summary
+        except Exception as e:
+            print(f"⚠️ Context summary failed, using an extractive summary: {e}")
+        return extractive_summary(previous, messages, max_tokens)
+
+    return summarize
+
+
+def _percentile(values: List[int], fraction: float) -> int:
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))]
+
+
+class ContextStats:
+    """Prompt sizes with and without packing over the last `window` turns"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._turns: deque = deque(maxlen=window)
+        self._folds = 0
+
+    def record(self, full_tokens: int, packed_tokens: int, folded: bool) -> None:
+        with self._lock:
+            self._turns.append((full_tokens, packed_tokens))
+            self._folds += int(folded)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            full = [turn[0] for turn in self._turns]
+            packed = [turn[1] for turn in self._turns]
+            folds = self._folds
+        return {
+            'turns': len(full),
+            'summaries': folds,
+            'prompt_tokens_p50_full': _percentile(full, 0.5),
+            'prompt_tokens_p95_full': _percentile(full, 0.95),
+            'prompt_tokens_p50_packed': _percentile(packed, 0.5),
+            'prompt_tokens_p95_packed': _percentile(packed, 0.95),
+        }
+
+
+class ContextManager:
+    """Packs conversation history into a token budget"""
+
+    def __init__(self, budget: Optional[int] = None, summary_max_tokens: Optional[int] = None,
+                 summarizer: Optional[Summarizer] = None, stats: Optional[ContextStats] = None):
+        """
+        Args:
+            budget: Prompt budget in tokens (default CONTEXT_TOKEN_BUDGET)
+            summary_max_tokens: Summary size cap (default CONTEXT_SUMMARY_MAX_TOKENS)
+            summarizer: fn(previous summary, folded messages, max tokens) -> summary;
+                defaults to CONTEXT_SUMMARY_MODE
+            stats: Where prompt sizes are recorded
+        """
+        self.budget = budget or int(os.getenv('CONTEXT_TOKEN_BUDGET', 3000))
+        self.summary_max_tokens = summary_max_tokens or int(os.getenv('CONTEXT_SUMMARY_MAX_TOKENS', 400))
+        if summarizer is None:
+            mode = os.getenv('CONTEXT_SUMMARY_MODE', 'extractive').lower()
+            summarizer = llm_summarizer() if mode == 'llm' else extractive_summary
+        self.summarizer = summarizer
+        self.stats = stats if stats is not None else ContextStats()
+
+    def pack(self, history: List[Message], state: Optional[Dict[str, Any]] = None,
+             system: Optional[List[Message]] = None, tail: Optional[List[Message]] = None,
+             reserve: int = 0) -> List[Message]:
+        """
+        Messages for the next call: `system`, the summary, the recent part of
+        `history` that fits, then `tail`.
+
+        Args:
+            history: The conversation so far (user/assistant messages, append-only)
+            state: This conversation's context state, updated in place (a
+                throwaway state is used when omitted)
+            system: Messages always sent first (system prompts)
+            tail: Messages always sent last (per-turn instructions)
+            reserve: Tokens to leave free, e.g. for the reply
+
+        The latest message is always included, even if it alone exceeds the budget.
+        """
+        system, tail = system or [], tail or []
+        state = state if state is not None else {}
+        # counts covers history[summarized:]; folded messages only keep their total
+        summarized = state.get('summarized', 0)
+        counts = state.get('counts', [])
+        if summarized > len(history):
+            summarized, counts = 0, []
+            state.update(summary='', summarized=0, summarized_tokens=0)
+        # Messages dropped from the end (e.g. a turn that was shed) are uncounted
+        del counts[len(history) - summarized:]
+        # Only messages added since the last call are counted
+        counts.extend(message_tokens(message) for message in history[summarized + len(counts):])
+        summary = state.get('summary', '')
+
+        pinned = sum(message_tokens(m) for m in system) + sum(message_tokens(m) for m in tail) + reserve
+        room = self.budget - pinned - self.summary_max_tokens - MESSAGE_OVERHEAD_TOKENS
+        recent_tokens = sum(counts)
+        full_tokens = pinned - reserve + state.get('summarized_tokens', 0) + recent_tokens
+
+        folded = 0
+        if recent_tokens > room:
+            # Fold the oldest messages until the rest is well under the room left
+            while folded < len(counts) - 1 and recent_tokens > room * FOLD_TARGET:
+                recent_tokens -= counts[folded]
+                folded += 1
+            if folded:
+                summary = self.summarizer(summary, history[summarized:summarized + folded], self.summary_max_tokens)
+                state['summary'] = summary
+                state['summarized_tokens'] = state.get('summarized_tokens', 0) + sum(counts[:folded])
+                summarized += folded
+                counts = counts[folded:]
+        state['summarized'], state['counts'] = summarized, counts
+
+        messages = list(system)
+        if summary:
+            messages.append({"role": "system", "content": SUMMARY_PREFIX + summary})
+        messages.extend(history[summarized:])
+        messages.extend(tail)
+
+        self.stats.record(full_tokens, sum(message_tokens(m) for m in messages), bool(folded))
+        return messages
+
+
+# Process-wide prompt size report, shared by every entry point
+context_stats = ContextStats(window=int(os.getenv('CONTEXT_STATS_WINDOW', 1000)))
+
+# Process-wide manager configured from the environment
+context_manager = ContextManager(stats=context_stats)
@@ -1,12 +1,15 @@
 import os
 from flask import Flask, jsonify, request, session
-from groq import Groq
 from dotenv import load_dotenv
 import json
+from model_router import router
+from rate_limiter import RateLimited, rate_limited_response
+from session_store import init_session_store
 
 # Create a simple app for direct API testing
 app = Flask(__name__)
 app.secret_key = 'direct_api_test_key'
+init_session_store(app)
 
 # Load environment variables
 load_dotenv()
@@ -152,9 +155,6 @@ def direct_chat():
         if not api_key:
             return jsonify({'error': 'API key not found'})
         
-        # Initialize Groq client
-        client = Groq(api_key=api_key)
-        
         # Prepare messages for API call
         messages = [
             {"role": "system", "content": "You are CareerPath.AI, a helpful career advisor who creates personalized learning roadmaps."}
@@ -166,10 +166,10 @@ def direct_chat():
         print(f"Sending {len(messages)} messages to Groq API")
         print(f"Messages: {json.dumps(messages, indent=2)}")
         
-        # Make API call
-        response = client.chat.completions.create(
+        # Make API call (rate limiter, resilience and usage accounting via the router)
+        response = router.complete(
+            'chat',
             messages=messages,
-            model="llama3-70b-8192",
             temperature=0.7,
             max_tokens=500
         )
@@ -186,6 +186,12 @@ def direct_chat():
             'roadmap': sample_roadmap
         })
         
+    except RateLimited as limited:
+        # Shed under load: let the client retry the same message
+        print(f"⚠️ {limited}")
+        session['conversation'] = session['conversation'][:-1]
+        return rate_limited_response(limited, roadmap=sample_roadmap)
+        
     except Exception as e:
         import traceback
         print(f"Error in direct chat endpoint: {str(e)}")
@@ -1,28 +1,37 @@
 from flask import Flask, send_from_directory, request, jsonify
 import os
+import copy
 import json
 import uuid
 from dotenv import load_dotenv
-import groq
 import traceback
+from llm_client import llm_clients, token_usage
+from roadmap_patch import build_patch_prompt, parse_patch, apply_patch
+from sse import wants_event_stream, sse_response, format_sse, StreamTimer
+from llm_parallel import ParallelCalls, CHAT_DEADLINE, ROADMAP_DEADLINE
+from keyword_matcher import message_matcher
+from context_manager import context_manager
+from rate_limiter import RateLimited, rate_limiter, rate_limited_response, set_current_user
+from llm_resilience import CircuitOpen, resilience
+from model_router import model_for, router
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__, static_folder='static')
 
-# Initialize Groq client if API key is available
-groq_client = None
-groq_api_key = os.getenv("GROQ_API_KEY")
-if groq_api_key:
-    groq_client = groq.Client(api_key=groq_api_key)
-    print("Groq API client initialized successfully")
+# The shared, pooled Groq client is fetched from llm_clients at each use
+# (never kept in a global) so forked workers get their own connection pool
+if llm_clients.is_configured():
+    print("Groq API client configured")
 else:
     print("Warning: GROQ_API_KEY not found in environment variables")
 
 # In-memory storage for user roadmaps and chat history
 roadmaps = {}
 chat_history = {}
+# Per-user context state (token counts, summary of older turns)
+context_states = {}
 
 # Routes
 @app.route('/')
@@ -39,14 +48,22 @@ def get_roadmap():
     
     return jsonify(roadmaps[user_id])
 
+@app.route('/api/usage', methods=['GET'])
+def get_token_usage():
+    # Token usage per LLM call site since this worker started
+    return jsonify(token_usage.snapshot())
+
 @app.route('/api/chat', methods=['POST'])
 def process_chat():
+    timer = StreamTimer()
     data = request.json
     if not data or 'message' not in data:
         return jsonify({'error': 'Message is required'}), 400
     
     user_message = data['message']
     user_id = request.cookies.get('user_id', str(uuid.uuid4()))
+    # LLM calls wait for rate limiter capacity in a queue shared fairly between users
+    set_current_user(user_id)
     
     print(f"Processing message from user {user_id}: {user_message}")
     
@@ -69,109 +86,27 @@ def process_chat():
     # Process the message and update the roadmap
     try:
         # If Groq client is available, use LLM to generate response and update roadmap
-        if groq_client:
-            print("Using Groq API for response generation")
-            # First, generate the AI response
-            chat_response = groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=chat_history[user_id],
-                temperature=0.7,
-                max_tokens=800
-            )
-            
-            ai_response = chat_response.choices[0].message.content
-            chat_history[user_id].append({"role": "assistant", "content": ai_response})
-            print(f"Generated AI response: {ai_response[:100]}...")
-            
-            # Now, ask the LLM to update the roadmap based on the user message
-            roadmap_update_prompt = f"""
-            As a career advisor AI, analyze this user message and UPDATE the existing career roadmap by ADDING new nodes.
-            
-            User message: "{user_message}"
-            
-            Current roadmap: {json.dumps(roadmaps[user_id])}
-            
-            CRITICAL INSTRUCTIONS:
-            1. NEVER replace or remove existing nodes, ONLY ADD NEW ONES
-            2. Make sure new nodes connect to the EXISTING structure
-            3. Each node must have: id, label, type, and parent fields
-            4. Node types: root, category, topic, subtopic, resource
-            5. Add EXTREMELY DETAILED content for each new node in nodeDetails including:
-               - Detailed description (150+ words)
-               - Required skills
-               - Career progression paths
-               - Salary expectations
-               - Real course links (Coursera, edX, Udemy, etc.)
-               - Sample projects to practice
-               - Books or resources to read
-            6. Focus on depth rather than breadth
-            7. Ensure proper parent-child connections to make a coherent tree
-            8. Use highly specific node IDs to avoid collisions (e.g., 'web_dev_frontend_react')
-            
-            Return ONLY the complete updated roadmap JSON without any explanation.
-            """
-            
-            print("Generating roadmap update...")
-            # Get roadmap update from LLM
-            roadmap_update = groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "system", "content": roadmap_update_prompt}],
-                temperature=0.5,
-                max_tokens=2000
-            )
+        if llm_clients.is_configured():
+            # Stream tokens as Server-Sent Events when the client asks for it
+            if wants_event_stream(request, data):
+                # Shed before the stream starts, while a 429 can still be sent
+                rate_limiter.check()
+                return sse_response(stream_chat_turn(user_id, user_message, current_node_ids, timer))
             
-            # Try to parse the roadmap from the LLM response
-            try:
-                roadmap_text = roadmap_update.choices[0].message.content
-                print(f"Received roadmap update: {roadmap_text[:100]}...")
-                
-                # Extract JSON from possible markdown formatting
-                if "```json" in roadmap_text:
-                    roadmap_text = roadmap_text.split("```json")[1].split("```")[0].strip()
-                elif "```" in roadmap_text:
-                    roadmap_text = roadmap_text.split("```")[1].split("```")[0].strip()
-                
-                # Parse the updated roadmap
-                updated_roadmap = json.loads(roadmap_text)
+            print("Using Groq API for response generation")
+            # The chat reply and the roadmap update are independent, so run them side by side
+            with ParallelCalls() as calls:
+                calls.submit('roadmap', update_roadmap_with_llm, roadmaps[user_id], user_message, deadline=ROADMAP_DEADLINE)
+                calls.submit('chat', generate_chat_reply, packed_history(user_id), deadline=CHAT_DEADLINE)
                 
-                # Ensure we're not losing existing nodes
-                # Get existing node IDs for comparison
-                existing_node_ids = {node["id"] for node in roadmaps[user_id]["nodes"]}
-                updated_node_ids = {node["id"] for node in updated_roadmap["nodes"]}
+                ai_response = calls.result('chat')
+                chat_history[user_id].append({"role": "assistant", "content": ai_response})
+                print(f"Generated AI response: {ai_response[:100]}...")
                 
-                # If any existing nodes are missing, something went wrong
-                if not existing_node_ids.issubset(updated_node_ids):
-                    print("Warning: Some existing nodes are missing in the update!")
-                    print(f"Missing nodes: {existing_node_ids - updated_node_ids}")
-                    
-                    # Fallback: manually merge the roadmaps rather than replacing
-                    merged_nodes = roadmaps[user_id]["nodes"].copy()
-                    merged_node_details = roadmaps[user_id]["nodeDetails"].copy()
-                    
-                    # Add only new nodes from the update
-                    new_nodes = [node for node in updated_roadmap["nodes"] if node["id"] not in existing_node_ids]
-                    merged_nodes.extend(new_nodes)
-                    
-                    # Add new node details
-                    for node_id, details in updated_roadmap["nodeDetails"].items():
-                        if node_id not in merged_node_details:
-                            merged_node_details[node_id] = details
-                    
-                    # Create properly merged roadmap
-                    roadmaps[user_id] = {
-                        "nodes": merged_nodes,
-                        "nodeDetails": merged_node_details
-                    }
-                    print(f"Manually merged {len(new_nodes)} new nodes into the roadmap")
-                else:
-                    # The update looks good, use it
+                # Only an update that arrives in time is applied; a late or failed one keeps the current roadmap
+                updated_roadmap = calls.result('roadmap', default=None)
+                if updated_roadmap is not None:
                     roadmaps[user_id] = updated_roadmap
-                    print("Roadmap updated successfully")
-            except Exception as e:
-                print(f"Error updating roadmap from LLM response: {e}")
-                print(f"LLM response: {roadmap_text}")
-                # If parsing fails, use fallback update
-                roadmaps[user_id] = update_roadmap_heuristic(roadmaps[user_id], user_message)
         else:
             print("No Groq API key found, using fallback response generation")
             # Fallback for when Groq API is not available
@@ -189,11 +124,144 @@ def process_chat():
             "newNodes": new_node_ids
         })
     
+    except CircuitOpen as unavailable:
+        # Groq is unhealthy: answer from the heuristics at once instead of waiting on it
+        print(f"⚠️ {unavailable}, using fallback response generation")
+        ai_response = "I'm analyzing your career interests. Let me update your roadmap with some relevant paths."
+        chat_history[user_id].append({"role": "assistant", "content": ai_response})
+        # The 'roadmap' worker may still be reading roadmaps[user_id]; edit a copy
+        roadmaps[user_id] = update_roadmap_heuristic(copy.deepcopy(roadmaps[user_id]), user_message)
+        return jsonify({
+            "response": ai_response,
+            "roadmap": roadmaps[user_id],
+            "newNodes": [node["id"] for node in roadmaps[user_id]["nodes"] if node["id"] not in current_node_ids]
+        })
+    
+    except RateLimited as limited:
+        # Shed under load: answer at once and let the client retry the same message
+        print(f"⚠️ {limited}")
+        chat_history[user_id].pop()
+        return rate_limited_response(limited, roadmap=roadmaps[user_id])
+    
     except Exception as e:
         print(f"Error processing chat: {e}")
         print(traceback.format_exc())
         return jsonify({"error": str(e), "response": "I'm sorry, I encountered an error. Please try again."}), 500
 
+def packed_history(user_id):
+    """The user's chat history packed into the prompt token budget (older turns summarized)"""
+    history = chat_history[user_id]
+    return context_manager.pack(history[1:], context_states.setdefault(user_id, {}), system=history[:1], reserve=800)
+
+def generate_chat_reply(messages):
+    """Get the assistant's chat reply for the conversation so far"""
+    chat_response = router.complete(
+        'chat',
+        client=llm_clients.get_client(),
+        deadline=CHAT_DEADLINE,
+        hedge=True,
+        messages=messages,
+        temperature=0.7,
+        max_tokens=800
+    )
+    return chat_response.choices[0].message.content
+
+def stream_chat_turn(user_id, user_message, current_node_ids, timer):
+    """Stream the chat reply as SSE token events, then send the updated roadmap as the terminal event"""
+    # Closing the generator (client disconnected) exits the block and cancels the roadmap call
+    with ParallelCalls() as calls:
+        try:
+            calls.submit('roadmap', update_roadmap_with_llm, roadmaps[user_id], user_message, deadline=ROADMAP_DEADLINE)
+            
+            parts = []
+            try:
+                # Behind the circuit breaker, with a deadline for the first token
+                for delta in resilience.stream(
+                    'chat',
+                    llm_clients.get_client(),
+                    timer,
+                    deadline=CHAT_DEADLINE,
+                    model=model_for('chat'),
+                    messages=packed_history(user_id),
+                    temperature=0.7,
+                    max_tokens=800
+                ):
+                    parts.append(delta)
+                    yield format_sse('token', {'text': delta})
+            except CircuitOpen as unavailable:
+                # Groq is unhealthy: answer at once (the roadmap call falls back to the heuristics too)
+                print(f"⚠️ {unavailable}, using the fallback response")
+                parts = ["I'm analyzing your career interests. Let me update your roadmap with some relevant paths."]
+                timer.mark_token()
+                yield format_sse('token', {'text': parts[0]})
+            
+            ai_response = "".join(parts)
+            chat_history[user_id].append({"role": "assistant", "content": ai_response})
+            print(f"Streamed AI response: {ai_response[:100]}...")
+            
+            updated_roadmap = calls.result('roadmap', default=None)
+            if updated_roadmap is not None:
+                roadmaps[user_id] = updated_roadmap
+            new_node_ids = [node["id"] for node in roadmaps[user_id]["nodes"] if node["id"] not in current_node_ids]
+            
+            metrics = timer.metrics()
+            print(f"Streamed reply: TTFB {metrics['ttfb_ms']}ms, total {metrics['total_ms']}ms")
+            yield format_sse('done', {
+                "response": ai_response,
+                "roadmap": roadmaps[user_id],
+                "newNodes": new_node_ids,
+                "metrics": metrics
+            })
+        except Exception as e:
+            print(f"Error streaming chat: {e}")
+            print(traceback.format_exc())
+            yield format_sse('error', {"message": "I'm sorry, I encountered an error. Please try again."})
+
+def update_roadmap_with_llm(roadmap, user_message):
+    """
+    Ask the LLM for new nodes (as a patch) and return the updated roadmap.
+
+    Runs in a worker thread and may outlive its deadline, so it never writes
+    roadmaps[...]: the caller applies the result only if it arrives in time.
+    """
+    roadmap_text = ""
+    roadmap_update_prompt = build_patch_prompt(user_message, roadmap, guidance="""
+    CRITICAL INSTRUCTIONS:
+    1. Add 1-3 new nodes that connect to the EXISTING structure
+    2. Focus on depth rather than breadth
+    3. Use highly specific node IDs to avoid collisions (e.g., 'web_dev_frontend_react')
+    4. Give every new node a set_details op with EXTREMELY DETAILED content (150+ words) covering
+       required skills, career progression, salary expectations, sample projects and books,
+       and real course links (Coursera, edX, Udemy, etc.) as resources
+    """)
+    
+    print("Generating roadmap update...")
+    # Validate the patch and apply it; existing nodes are never touched
+    try:
+        # Get roadmap patch from LLM (a reply without a valid patch is retried on the large model)
+        roadmap_update, ops = router.complete_parsed(
+            'roadmap_patch',
+            parse_patch,
+            client=llm_clients.get_client(),
+            deadline=ROADMAP_DEADLINE,
+            messages=[{"role": "system", "content": roadmap_update_prompt}],
+            temperature=0.5,
+            max_tokens=1200
+        )
+        if roadmap_update.usage:
+            print(f"Roadmap patch tokens ({roadmap_update.model}): prompt={roadmap_update.usage.prompt_tokens} "
+                  f"completion={roadmap_update.usage.completion_tokens}")
+        print(f"Received roadmap patch: {roadmap_update.choices[0].message.content[:100]}...")
+        
+        updated_roadmap, added = apply_patch(roadmap, ops)
+        print(f"Applied roadmap patch: {len(added)} new nodes")
+        return updated_roadmap
+    except Exception as e:
+        # Bad patch, unavailable model or any other failure: use the fallback update
+        print(f"Error updating roadmap from LLM response: {e}")
+        # (on a copy: the heuristic update works in place)
+        return update_roadmap_heuristic(copy.deepcopy(roadmap), user_message)
+
 def create_empty_roadmap():
     """Create an empty roadmap with just a root node"""
     return {
@@ -213,10 +281,10 @@ def update_roadmap_heuristic(roadmap, message):
     Fallback method to update roadmap based on simple keyword matching
     Used when LLM is not available or fails
     """
-    message_lower = message.lower()
+    matches = message_matcher.scan(message)
     
     # Check for technology fields
-    if any(tech in message_lower for tech in ['programming', 'coding', 'developer', 'software']):
+    if matches.has('domain', 'computer science'):
         # Add Software Development if not present
         if not any(node['id'] == 'software_dev' for node in roadmap['nodes']):
             roadmap['nodes'].append({
@@ -269,7 +337,7 @@ def update_roadmap_heuristic(roadmap, message):
             }
     
     # Check for AI/ML interest
-    if any(ai_term in message_lower for ai_term in ['ai', 'artificial intelligence', 'machine learning', 'ml']):
+    if matches.has('domain', 'artificial intelligence'):
         # Add AI/ML if not present
         if not any(node['id'] == 'ai_ml' for node in roadmap['nodes']):
             roadmap['nodes'].append({
@@ -306,7 +374,7 @@ def update_roadmap_heuristic(roadmap, message):
             }
     
     # Check for data science interest
-    if any(data_term in message_lower for data_term in ['data', 'analytics', 'statistics', 'visualization']):
+    if matches.has('domain', 'data science'):
         # Add Data Science if not present
         if not any(node['id'] == 'data_science' for node in roadmap['nodes']):
             roadmap['nodes'].append({
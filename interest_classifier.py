@@ -0,0 +1,128 @@
+"""
+Offline career-interest classifier.
+
+A one-vs-rest logistic regression over hashed word and character n-gram
+features, trained with NumPy from the bundled labelled set in
+data/interest_training.json. It covers the same domain/role taxonomy as
+LLMChatHandler._basic_interest_extraction and answers in tens of
+microseconds, so the LLM extraction call is only needed when the
+classifier isn't confident.
+
+Data format (data/interest_training.json):
+    {"labels": ["artificial intelligence", ...],
+     "examples": [{"text": "I want to build AI agents", "labels": ["artificial intelligence"]}, ...]}
+
+Environment variables:
+    INTEREST_CONFIDENCE_THRESHOLD   minimum confidence to skip the LLM (default 0.8)
+"""
+
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'interest_training.json')
+CONFIDENCE_THRESHOLD = float(os.getenv('INTEREST_CONFIDENCE_THRESHOLD', 0.8))
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#/]+")
+
+
+def extract_features(text: str, n_features: int) -> np.ndarray:
+    """
+    Hash word unigrams, word bigrams and in-word character 3/4-grams into
+    `n_features` buckets. crc32 is used because Python's str hash is
+    randomized per process.
+    """
+    words = _TOKEN_RE.findall(text.lower())
+    grams = ["w:" + word for word in words]
+    grams.extend("b:" + a + " " + b for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        for n in (3, 4):
+            grams.extend("c:" + padded[i:i + n] for i in range(len(padded) - n + 1))
+    if not grams:
+        return np.zeros(0, dtype=np.int64)
+    return np.unique(np.fromiter((zlib.crc32(g.encode()) % n_features for g in grams), dtype=np.int64, count=len(grams)))
+
+
+class InterestClassifier:
+    """Multi-label linear model: one sigmoid per interest label"""
+
+    def __init__(self, labels: List[str], n_features: int = 1 << 15):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.weights = np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+
+    def fit(self, examples: List[Dict], epochs: int = 12, learning_rate: float = 0.5,
+            l2: float = 1e-5, seed: int = 0) -> "InterestClassifier":
+        """Train with plain SGD on the logistic loss (sparse updates, one example at a time)"""
+        index = {label: i for i, label in enumerate(self.labels)}
+        features = [extract_features(example['text'], self.n_features) for example in examples]
+        targets = np.zeros((len(examples), len(self.labels)), dtype=np.float32)
+        for row, example in enumerate(examples):
+            for label in example['labels']:
+                targets[row, index[label]] = 1.0
+
+        rng = np.random.default_rng(seed)
+        for epoch in range(epochs):
+            rate = learning_rate / (1 + epoch)
+            for row in rng.permutation(len(examples)):
+                idx = features[row]
+                probs = self._sigmoid(self.weights[idx].sum(axis=0) + self.bias)
+                grad = probs - targets[row]
+                self.weights[idx] -= rate * (grad + l2 * self.weights[idx])
+                self.bias -= rate * grad
+        return self
+
+    @staticmethod
+    def _sigmoid(z: np.ndarray) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        idx = extract_features(text, self.n_features)
+        return self._sigmoid(self.weights[idx].sum(axis=0) + self.bias)
+
+    def predict(self, text: str) -> Tuple[List[str], float]:
+        """
+        Returns:
+            (labels with probability >= 0.5, most likely first; confidence)
+
+        Confidence is that of the least certain label decision, so one
+        borderline label is enough to send the message to the LLM.
+        """
+        probs = self.predict_proba(text)
+        order = np.argsort(-probs)
+        labels = [self.labels[i] for i in order if probs[i] >= 0.5]
+        confidence = float(np.min(np.maximum(probs, 1.0 - probs)))
+        return labels, confidence
+
+
+_model: Optional[InterestClassifier] = None
+_model_lock = threading.Lock()
+
+
+def load_training_data(path: str = DATA_PATH) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def get_classifier() -> InterestClassifier:
+    """Train the bundled model on first use (well under a second) and reuse it; app.py calls it at startup"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                data = load_training_data()
+                _model = InterestClassifier(data['labels']).fit(data['examples'])
+                print(f"✅ Interest classifier trained on {len(data['examples'])} examples")
+    return _model
+
+
+def classify_interests(text: str) -> Tuple[List[str], float]:
+    """Predicted interest labels and confidence for a message"""
+    return get_classifier().predict(text)
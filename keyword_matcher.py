@@ -0,0 +1,225 @@
+"""
+Single-pass keyword matching for interest, role, knowledge-level and intent
+detection.
+
+All vocabularies live here and are compiled once, at import, into an
+Aho–Corasick automaton over word tokens. A message is lowercased and
+tokenized once, then scanned in one pass that reports every matching phrase
+(overlapping ones included: "machine learning engineer" also yields
+"machine learning"). Because patterns are sequences of whole tokens, matching
+has word-boundary semantics: 'ai' matches "AI" and "ai/ml" but not "said",
+and "front-end", "front end" and "front_end" are the same phrase.
+
+Usage:
+    from keyword_matcher import message_matcher
+    matches = message_matcher.scan("I'm a data engineer curious about RAG")
+    matches.names('role')    # ['data engineer']
+    matches.has('level', 'advanced')
+"""
+
+import re
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+# Career domains (order is the order names are reported in)
+DOMAIN_KEYWORDS: Dict[str, List[str]] = {
+    'computer science': ['programming', 'code', 'coding', 'software', 'developer', 'development', 'computer science', 'engineer', 'engineering'],
+    'artificial intelligence': ['artificial intelligence', 'ai', 'machine learning', 'ml', 'neural networks', 'deep learning', 'nlp', 'computer vision', 'ai engineer', 'ai research'],
+    'web development': ['web', 'frontend', 'front end', 'backend', 'back end', 'fullstack', 'full stack', 'html', 'css', 'javascript', 'web design', 'web app', 'react', 'angular', 'vue', 'node', 'php'],
+    'data science': ['data', 'analytics', 'statistics', 'data science', 'visualization', 'big data', 'data engineering', 'data analysis', 'business intelligence', 'bi', 'database', 'databases'],
+    'cybersecurity': ['security', 'cyber', 'cybersecurity', 'hacking', 'encryption', 'privacy', 'network security', 'infosec', 'security analyst', 'penetration testing', 'pen test', 'ethical hacking'],
+    'mobile development': ['mobile', 'app development', 'android', 'ios', 'flutter', 'react native', 'swift', 'kotlin', 'mobile app', 'mobile apps', 'app design'],
+    'game development': ['game', 'games', 'gaming', 'unity', 'unreal', '3d', 'game design', 'game programming', 'game developer', 'game engine', 'level design'],
+    'cloud computing': ['cloud', 'aws', 'azure', 'gcp', 'devops', 'infrastructure', 'serverless', 'docker', 'kubernetes', 'microservices', 'devsecops'],
+    'ui/ux design': ['ui', 'ux', 'user interface', 'user experience', 'design', 'wireframe', 'wireframes', 'prototype', 'figma', 'sketch', 'adobe xd', 'visual design'],
+    'blockchain': ['blockchain', 'crypto', 'cryptocurrency', 'web3', 'smart contract', 'smart contracts', 'ethereum', 'nft', 'defi', 'distributed ledger', 'bitcoin'],
+    'project management': ['project management', 'agile', 'scrum', 'kanban', 'product management', 'product owner', 'project manager', 'sprint', 'jira', 'pmp'],
+    'digital marketing': ['marketing', 'seo', 'content marketing', 'social media', 'analytics', 'digital marketing', 'growth hacking', 'ppc', 'google ads', 'facebook ads'],
+}
+
+# Specific job titles
+ROLE_KEYWORDS: Dict[str, List[str]] = {
+    'frontend developer': ['frontend developer', 'front end developer', 'ui developer'],
+    'backend developer': ['backend developer', 'back end developer', 'api developer'],
+    'full stack developer': ['full stack developer', 'fullstack developer'],
+    'data scientist': ['data scientist', 'data science professional', 'data science career'],
+    'data engineer': ['data engineer', 'data pipeline', 'data pipelines', 'etl developer', 'data infrastructure'],
+    'machine learning engineer': ['machine learning engineer', 'ml engineer', 'ml specialist'],
+    'cybersecurity analyst': ['cybersecurity analyst', 'security analyst', 'infosec analyst', 'security specialist'],
+    'devops engineer': ['devops engineer', 'site reliability engineer', 'sre', 'devops specialist', 'infrastructure engineer'],
+    'cloud architect': ['cloud architect', 'solutions architect', 'aws architect', 'azure architect'],
+    'ui/ux designer': ['ui designer', 'ux designer', 'ui/ux designer', 'product designer', 'interaction designer', 'user experience designer'],
+}
+
+# Self-reported or implied knowledge level
+LEVEL_KEYWORDS: Dict[str, List[str]] = {
+    'beginner': ['beginner', 'basics', 'start', 'new to', 'introduction', 'fundamentals', 'what is', 'how to'],
+    'intermediate': ['intermediate', 'already know', 'familiar with', 'experience with', 'worked with', 'prompt engineering',
+                     'frameworks', 'langchain', 'tools', 'agent memory', 'workflows'],
+    'advanced': ['advanced', 'expert', 'rag', 'vector embeddings', 'multi agent systems', 'tree of thought', 'reasoning', 'llm agents'],
+}
+
+# Finer-grained topics used by the roadmap heuristics
+TOPIC_KEYWORDS: Dict[str, List[str]] = {
+    'agentic ai': ['agentic ai', 'agentic', 'ai agents', 'ai agent'],
+    'robotics': ['robot', 'robots', 'robotics'],
+    'frontend': ['frontend', 'front end', 'ui', 'interface', 'react', 'vue', 'angular'],
+    'react': ['react', 'reactjs'],
+    'vue': ['vue', 'vuejs'],
+    'angular': ['angular', 'angularjs'],
+    'backend': ['backend', 'back end', 'server', 'database', 'api', 'node', 'express', 'django', 'flask'],
+    'node': ['node', 'nodejs', 'express', 'expressjs'],
+    'django': ['django', 'python web'],
+}
+
+# Terms app.py's update_session_roadmap keys the session roadmap on. Kept
+# narrow on purpose: "I'm a software engineer" shouldn't change the roadmap
+ROADMAP_INTEREST_KEYWORDS: Dict[str, List[str]] = {
+    'agentic ai': ['agentic ai'],
+    'agentic': ['agentic'],
+    'ai': ['ai'],
+    'artificial intelligence': ['artificial intelligence', 'machine learning'],
+    'computer science': ['computer science', 'programming'],
+    'web development': ['web development', 'web'],
+    'data science': ['data science', 'data'],
+}
+
+# What the user is asking for
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    'roadmap_request': ['roadmap', 'next steps'],
+    'greeting': ['hi', 'hello', 'hey'],
+    'frustration': ['not working', "doesn't work", 'wrong', 'error', 'problem', 'issue'],
+    'visualization': ['roadmap', 'visualization', 'diagram', 'map', 'graph', 'chart'],
+    'how_to': ['how'],
+    'getting_started': ['start', 'begin', 'learn', 'do'],
+}
+
+# Words in roadmap node titles that customize_ai_roadmap_for_level looks for
+NODE_TITLE_KEYWORDS: Dict[str, List[str]] = {
+    'ai': ['ai', 'artificial intelligence', 'machine learning', 'agent', 'agents', 'agentic'],
+    'agent': ['agent', 'agents', 'agentic'],
+    'foundational': ['introduction', 'intro', 'fundamental', 'fundamentals', 'basic', 'basics'],
+    'practical': ['framework', 'frameworks', 'implement', 'implementing', 'implementation', 'develop', 'developing',
+                  'development', 'tool', 'tools'],
+    'research': ['advanced', 'research', 'cutting edge', 'system', 'systems'],
+}
+
+LEVELS = ('beginner', 'intermediate', 'advanced')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; punctuation and hyphens separate words"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class KeywordMatches:
+    """Result of one scan: the (group, name) pairs whose phrases occurred"""
+
+    __slots__ = ('_hits', '_order')
+
+    def __init__(self, hits: Set[Tuple[str, str]], order: Dict[str, List[str]]):
+        self._hits = hits
+        self._order = order
+
+    def has(self, group: str, name: str) -> bool:
+        return (group, name) in self._hits
+
+    def any(self, group: str, *names: str) -> bool:
+        """True if any of `names` (or, with no names, anything in `group`) matched"""
+        if not names:
+            return any(hit_group == group for hit_group, _ in self._hits)
+        return any((group, name) in self._hits for name in names)
+
+    def names(self, group: str) -> List[str]:
+        """Matched names of a group, in vocabulary order"""
+        return [name for name in self._order.get(group, ()) if (group, name) in self._hits]
+
+    def __bool__(self) -> bool:
+        return bool(self._hits)
+
+    def __repr__(self) -> str:
+        return f"KeywordMatches({sorted(self._hits)})"
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick automaton over word tokens.
+
+    Args:
+        vocabularies: {group: {name: [phrase, ...]}}; a phrase matches when
+            its tokens occur consecutively in the text
+    """
+
+    def __init__(self, vocabularies: Dict[str, Dict[str, Iterable[str]]]):
+        self._order = {group: list(names) for group, names in vocabularies.items()}
+        # Trie: per state a token -> state map, plus the labels ending there
+        self._goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[Tuple[str, str]]] = [set()]
+        self.phrase_count = 0
+
+        for group, names in vocabularies.items():
+            for name, phrases in names.items():
+                for phrase in phrases:
+                    tokens = tokenize(phrase)
+                    if not tokens:
+                        continue
+                    state = 0
+                    for token in tokens:
+                        next_state = self._goto[state].get(token)
+                        if next_state is None:
+                            next_state = len(self._goto)
+                            self._goto[state][token] = next_state
+                            self._goto.append({})
+                            outputs.append(set())
+                        state = next_state
+                    outputs[state].add((group, name))
+                    self.phrase_count += 1
+
+        # Failure links (BFS); each state's outputs absorb its failure state's
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                outputs[child] |= outputs[self._fail[child]]
+                queue.append(child)
+        self._outputs: List[FrozenSet[Tuple[str, str]]] = [frozenset(out) for out in outputs]
+
+    def scan(self, text: str) -> KeywordMatches:
+        """Every vocabulary entry with a phrase in `text`, in one pass"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        hits: Set[Tuple[str, str]] = set()
+        state = 0
+        for token in _TOKEN_RE.findall(text.lower()):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if outputs[state]:
+                hits |= outputs[state]
+        return KeywordMatches(hits, self._order)
+
+
+def detect_knowledge_level(matches: KeywordMatches, default: Optional[str] = None) -> Optional[str]:
+    """Most advanced level the message gives evidence of, or `default`"""
+    for level in reversed(LEVELS):
+        if matches.has('level', level):
+            return level
+    return default
+
+
+# Built once at import and shared (scans don't mutate the automaton)
+message_matcher = KeywordMatcher({
+    'domain': DOMAIN_KEYWORDS,
+    'role': ROLE_KEYWORDS,
+    'level': LEVEL_KEYWORDS,
+    'topic': TOPIC_KEYWORDS,
+    'intent': INTENT_KEYWORDS,
+    'roadmap_interest': ROADMAP_INTEREST_KEYWORDS,
+})
+node_title_matcher = KeywordMatcher({'title': NODE_TITLE_KEYWORDS})
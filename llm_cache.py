@@ -0,0 +1,236 @@
+"""
+Response cache for deterministic, repetitive LLM calls.
+
+Some calls are made with the same prompt over and over across users (interest
+extraction, first-turn greetings). Their responses are cached by a normalized
+hash of (call site, model, messages, temperature, max_tokens, ...)
+in an in-memory LRU with TTL, optionally backed by a SQLite tier that survives
+restarts and is shared by the workers on one host.
+
+Caching is opt-in per call site: only call sites with a CachePolicy are cached.
+Health checks are deliberately not cached, so they report an outage at once.
+
+Environment variables:
+    LLM_CACHE_ENABLED       set to 0 to disable the cache entirely (default 1)
+    LLM_CACHE_MAX_ENTRIES   in-memory entries (default 2048)
+    LLM_CACHE_SQLITE_PATH   enables the on-disk tier at this path (default off)
+    LLM_CACHE_PURGE_EVERY   delete expired disk rows every N disk writes
+                            (default 500; also done when the tier opens)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from lru import LRUCache
+
+# Request fields that change the response; everything else (timeout, stream, ...) is ignored
+_KEY_FIELDS = ('model', 'messages', 'temperature', 'max_tokens', 'top_p', 'stop', 'response_format', 'seed')
+
+
+class CachePolicy:
+    """How long a call site's responses may be reused, and whether they go to disk"""
+
+    def __init__(self, ttl: float, persist: bool = False):
+        self.ttl = ttl
+        self.persist = persist
+
+    def __repr__(self) -> str:
+        return f"CachePolicy(ttl={self.ttl}, persist={self.persist})"
+
+
+# Call sites that opt in to caching
+DEFAULT_POLICIES: Dict[str, CachePolicy] = {
+    'interest_extraction': CachePolicy(ttl=24 * 3600, persist=True),
+    'chat_first_turn': CachePolicy(ttl=3600, persist=True),
+}
+
+
+def _normalize_content(content: Any) -> Any:
+    # Whitespace differences (indentation in prompt literals, trailing newlines)
+    # don't change the answer, so they shouldn't change the key either
+    if isinstance(content, str):
+        return " ".join(content.split())
+    return content
+
+
+def make_cache_key(call_site: str, create_kwargs: Dict[str, Any]) -> str:
+    """
+    Stable hash of the call site and the parts of a chat completion request
+    that affect the reply. The call site is part of the key so each site's
+    entries keep that site's TTL and persistence.
+    """
+    request = {field: create_kwargs.get(field) for field in _KEY_FIELDS if create_kwargs.get(field) is not None}
+    request['messages'] = [
+        {'role': message.get('role'), 'content': _normalize_content(message.get('content'))}
+        for message in create_kwargs.get('messages', [])
+    ]
+    request['call_site'] = call_site
+    payload = json.dumps(request, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _SQLiteTier:
+    """On-disk cache tier; one connection per thread, WAL so readers don't block"""
+
+    def __init__(self, path: str, purge_every: Optional[int] = None):
+        self.path = path
+        self.purge_every = purge_every or int(os.getenv('LLM_CACHE_PURGE_EVERY', 500))
+        self._local = threading.local()
+        self._writes_lock = threading.Lock()
+        self._writes = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " call_site TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+        # Expired rows are only skipped on read, so drop them here and every purge_every writes
+        self._purge()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[tuple]:
+        row = self._connection().execute(
+            "SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row
+
+    def set(self, key: str, call_site: str, response: str, ttl: float) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, call_site, response, expires_at) VALUES (?, ?, ?, ?)",
+                (key, call_site, response, time.time() + ttl)
+            )
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % self.purge_every == 0
+        if due:
+            self._purge()
+
+    def purge_expired(self) -> int:
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def _purge(self) -> None:
+        try:
+            purged = self.purge_expired()
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache purge failed: {e}")
+            return
+        if purged:
+            print(f"✅ Purged {purged} expired LLM cache entries from {self.path}")
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + optional SQLite) cache of chat completion responses"""
+
+    def __init__(self,
+                 policies: Optional[Dict[str, CachePolicy]] = None,
+                 max_entries: Optional[int] = None,
+                 sqlite_path: Optional[str] = None,
+                 enabled: Optional[bool] = None):
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.enabled = enabled if enabled is not None else os.getenv('LLM_CACHE_ENABLED', '1') != '0'
+        self._memory = LRUCache(max_entries=max_entries or int(os.getenv('LLM_CACHE_MAX_ENTRIES', 2048)))
+        sqlite_path = sqlite_path if sqlite_path is not None else os.getenv('LLM_CACHE_SQLITE_PATH', '')
+        self._disk = _SQLiteTier(sqlite_path) if sqlite_path else None
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, int]] = {}
+
+    def policy_for(self, call_site: str) -> Optional[CachePolicy]:
+        """The call site's policy, or None if it isn't cached"""
+        if not self.enabled:
+            return None
+        return self.policies.get(call_site)
+
+    def set_policy(self, call_site: str, policy: Optional[CachePolicy]) -> None:
+        """Opt a call site in (or out, with None)"""
+        if policy is None:
+            self.policies.pop(call_site, None)
+        else:
+            self.policies[call_site] = policy
+
+    def _count(self, call_site: str, field: str) -> None:
+        with self._lock:
+            site = self._sites.setdefault(call_site, {'hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0})
+            site[field] += 1
+
+    def get(self, call_site: str, key: str, policy: CachePolicy, loads) -> Any:
+        """
+        Look a response up in memory, then on disk.
+
+        Args:
+            loads: Rebuilds a response object from its stored JSON (disk tier)
+        """
+        response = self._memory.get(key)
+        if response is not None:
+            self._count(call_site, 'hits')
+            return response
+
+        if policy.persist and self._disk is not None:
+            row = self._disk.get(key)
+            if row is not None:
+                response = loads(row[0])
+                # Promote to memory for the remaining lifetime of the disk entry
+                self._memory.set(key, response, ttl=max(0.0, row[1] - time.time()))
+                self._count(call_site, 'disk_hits')
+                return response
+
+        self._count(call_site, 'misses')
+        return None
+
+    def set(self, call_site: str, key: str, response: Any, policy: CachePolicy, dumps) -> None:
+        """
+        Store a response in memory (and on disk if the policy persists).
+
+        Args:
+            dumps: Serializes the response object to JSON (disk tier)
+        """
+        self._memory.set(key, response, ttl=policy.ttl)
+        if policy.persist and self._disk is not None:
+            try:
+                self._disk.set(key, call_site, dumps(response), policy.ttl)
+            except sqlite3.Error as e:
+                print(f"⚠️ LLM cache disk write failed: {e}")
+        self._count(call_site, 'stores')
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory tier counters plus per-call-site hit/miss counts"""
+        with self._lock:
+            sites = {name: dict(counts) for name, counts in self._sites.items()}
+        for counts in sites.values():
+            lookups = counts['hits'] + counts['disk_hits'] + counts['misses']
+            counts['hit_rate'] = round((counts['hits'] + counts['disk_hits']) / lookups, 3) if lookups else 0.0
+        return {
+            'enabled': self.enabled,
+            'memory': self._memory.stats(),
+            'disk': self._disk.path if self._disk is not None else None,
+            'call_sites': sites,
+            'policies': {name: {'ttl': p.ttl, 'persist': p.persist} for name, p in self.policies.items()}
+        }
+
+
+# Process-wide response cache
+response_cache = LLMResponseCache()
@@ -1,7 +1,13 @@
 import os
 from typing import Dict, Any, List, Optional
-from groq import Groq
 import json
+from llm_client import get_groq_client
+from llm_resilience import CircuitOpen, is_retryable
+from model_router import model_for, router
+from interest_classifier import classify_interests, CONFIDENCE_THRESHOLD
+from keyword_matcher import message_matcher
+from context_manager import context_manager
+from rate_limiter import RateLimited
 from user_knowledge_assessment import UserKnowledgeAssessment
 
 class LLMChatHandler:
@@ -17,10 +23,8 @@ class LLMChatHandler:
             if not api_key:
                 raise ValueError("GROQ_API_KEY environment variable is not set")
                 
-            # Initialize Groq client
-            self.client = Groq(api_key=api_key)  # Pass API key directly to constructor
-            # Using a known valid model ID from Groq
-            self.model = "llama-3.3-70b-versatile"  # Fallback to known working model
+            # Chat replies use the large tier; extraction and health checks the small one (model_router)
+            self.model = model_for('chat')
             
             # Print success message
             print(f"✅ Groq API key loaded successfully: {api_key[:5]}...")
@@ -37,10 +41,14 @@ class LLMChatHandler:
         except Exception as e:
             print(f"⚠️ ERROR initializing Groq client: {str(e)}")
             print("⚠️ LLM responses will be limited to fallback templates")
-            self.client = None
             self.force_api_usage = False
             self.api_available = False
     
+    @property
+    def client(self):
+        """The shared, pooled Groq client (looked up per use, so a forked worker gets its own pool)"""
+        return get_groq_client() if getattr(self, 'api_available', False) else None
+
     def _test_api_connection(self):
         """Test connection to Groq API"""
         try:
@@ -57,11 +65,12 @@ class LLMChatHandler:
                 print("ERROR: Groq client is None!")
                 raise ValueError("Groq client failed to initialize")
                 
-            print(f"Making test call with model: {self.model}")
+            print(f"Making test call with model: {model_for('api_health_check')}")
             
-            response = self.client.chat.completions.create(
+            response = router.complete(
+                'api_health_check',
+                client=self.client,
                 messages=[{"role": "user", "content": "Hello"}],
-                model=self.model,
                 max_tokens=10,
                 temperature=0.5
             )
@@ -125,10 +134,13 @@ Session Goal: Create a truly personalized learning path that respects the user's
                          conversation_history: List[Dict[str, str]],
                          identified_interests: List[str],
                          roadmap_updated: bool = False,
-                         assessment_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                         assessment_state: Optional[Dict[str, Any]] = None,
+                         context_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Generate a contextual response based on the user's message and conversation history.
         Incorporates knowledge assessment to tailor roadmap content.
+        While the Groq circuit breaker is open, or when the call still fails
+        after its retries, the reply comes from _get_smart_fallback_response.
         
         Args:
             user_message: The current message from the user
@@ -136,9 +148,15 @@ Session Goal: Create a truly personalized learning path that respects the user's
             identified_interests: List of interests identified so far
             roadmap_updated: Whether the roadmap was just updated
             assessment_state: Current state of knowledge assessment (if any)
+            context_state: The conversation's context state (token counts and
+                summary, see context_manager); keep it with the history so
+                turns are counted and summarized only once
             
         Returns:
             A dictionary containing the response and assessment information
+            
+        Raises:
+            RateLimited: when the rate limiter sheds the call
         """
         # Initialize or use existing assessment state
         if assessment_state is None:
@@ -162,11 +180,8 @@ Session Goal: Create a truly personalized learning path that respects the user's
             if not assessment_state.get('assessment_complete', False):
                 assessment_question = self.knowledge_assessor.get_next_question('agentic ai', assessment_state)
         
-        # Create messages for the API
-        messages = [{"role": "system", "content": self.system_prompt}]
-        
-        # Add full conversation history
-        messages.extend(conversation_history)  # Include all messages for complete context
+        # Per-turn context goes after the conversation history
+        tail = []
         
         # Add information about identified interests, roadmap, and assessment
         context_parts = []
@@ -204,11 +219,21 @@ Session Goal: Create a truly personalized learning path that respects the user's
                     context_parts.append(f"Skip these areas for this user: {skip_areas}")
         
         # Add full context to messages
-        messages.append({"role": "system", "content": "\n".join(context_parts)})
+        tail.append({"role": "system", "content": "\n".join(context_parts)})
         
         # If we have an assessment question, prepare to include it in the response
         if assessment_question:
-            messages.append({"role": "system", "content": f"IMPORTANT: Include this assessment question naturally in your response: '{assessment_question}' Ask this to gauge the user's knowledge level in agentic AI."})
+            tail.append({"role": "system", "content": f"IMPORTANT: Include this assessment question naturally in your response: '{assessment_question}' Ask this to gauge the user's knowledge level in agentic AI."})
+        
+        # Create messages for the API: the conversation history is packed into
+        # the token budget, with older turns summarized
+        messages = context_manager.pack(
+            conversation_history,
+            context_state,
+            system=[{"role": "system", "content": self.system_prompt}],
+            tail=tail,
+            reserve=500
+        )
         
         # Prepare the response object
         result = {
@@ -220,40 +245,24 @@ Session Goal: Create a truly personalized learning path that respects the user's
         }
         
         try:
-            # FORCE API USAGE: We want to always try to use the API
-            # even if previous checks marked it as unavailable
-            print("\n🔄 ATTEMPTING LLM API CALL - FORCING API USAGE")
-            
-            # Re-initialize API client if it's None
-            if not self.client:
-                print("Re-initializing API client")
-                api_key = os.getenv("GROQ_API_KEY")
-                if api_key:
-                    self.client = Groq(api_key=api_key)
-                    print(f"Re-initialized client with API key: {api_key[:5]}...")
-                else:
-                    print("❌ CRITICAL ERROR: Still no API key available")
-                    
-            # Always set API to available to force a try
-            self.api_available = True
-            print(f"API client status: {self.client is not None}")
-                
             # Log when we're making an API call
             print(f"Making Groq API call for response, convo length: {len(conversation_history)}")
             
             # Print conversation history for debugging
             print("\nConversation context being sent to API:")
-            print(f"Total messages in context: {len(conversation_history)}")
+            print(f"Total messages in context: {len(messages)} (conversation: {len(conversation_history)})")
             for i, msg in enumerate(conversation_history[-10:]):  # Show last 10 for brevity in logs
                 print(f"[{i}] {msg['role'].upper()}: {msg['content'][:50]}...")
             print()
                 
-            # Generate response using Groq
+            # Generate response using Groq (deadline, retries and hedging in llm_resilience)
             try:
                 print(f"Making API call to Groq with model: {self.model}")
-                response = self.client.chat.completions.create(
+                response = router.complete(
+                    'chat',
+                    client=self.client,
+                    hedge=True,
                     messages=messages,
-                    model=self.model,
                     temperature=0.7,
                     max_tokens=500,
                     top_p=1,
@@ -269,15 +278,33 @@ Session Goal: Create a truly personalized learning path that respects the user's
                     raise ValueError("Empty response received from API")
                     
                 result['text'] = content
+                self.api_available = True
                 print("✅ Successfully generated LLM response")
                 return result
                 
+            except RateLimited:
+                # Shed under load; the server answers with a 429 the client can retry
+                raise
             except Exception as inner_e:
+                if isinstance(inner_e, CircuitOpen) or is_retryable(inner_e):
+                    # Upstream is unhealthy: answer from the local templates right away
+                    print(f"⚠️ Groq unavailable ({inner_e}), using the fallback response")
+                    self.api_available = False
+                    result['text'] = self._get_smart_fallback_response(
+                        user_message,
+                        identified_interests,
+                        conversation_history,
+                        assessment_state,
+                        assessment_question
+                    )
+                    return result
                 print(f"❌ Error during API call: {str(inner_e)}")
                 # Provide a default response instead of throwing an error
                 result['text'] = f"I'm having trouble connecting to my language model right now. Could you please share what career fields interest you?"
                 return result
         
+        except RateLimited:
+            raise
         except Exception as e:
             print(f"Error generating LLM response: {str(e)}")
             
@@ -299,7 +326,10 @@ Session Goal: Create a truly personalized learning path that respects the user's
     
     def extract_interests_from_message(self, message: str, conversation_history: List[Dict[str, str]]) -> List[str]:
         """
-        Use the LLM to extract career interests from the user's message more intelligently
+        Extract career interests from the user's message.
+        
+        The local classifier answers first; the LLM is only asked when the
+        classifier's confidence is below INTEREST_CONFIDENCE_THRESHOLD.
         
         Args:
             message: The current message from the user
@@ -308,6 +338,13 @@ Session Goal: Create a truly personalized learning path that respects the user's
         Returns:
             List of extracted interests
         """
+        # Try the offline classifier first (microseconds, no API call)
+        local_interests, confidence = classify_interests(message)
+        if confidence >= CONFIDENCE_THRESHOLD:
+            print(f"Extracted interests locally (confidence {confidence:.2f}): {local_interests}")
+            return local_interests
+        print(f"Local interest classifier unsure (confidence {confidence:.2f}), escalating to LLM")
+        
         # Create a specialized prompt for interest extraction
         system_prompt = """
 You are an AI specialized in identifying career interests from conversations.
@@ -358,33 +395,27 @@ Example outputs: ["machine learning", "artificial intelligence"], ["web developm
             # Check if API is available
             if not hasattr(self, 'api_available') or not self.api_available or not self.client:
                 print("API not available - using fallback interest extraction")
-                return self._basic_interest_extraction(message)
+                return local_interests or self._basic_interest_extraction(message)
             
             print(f"Making Groq API call for interest extraction")
-            # Generate interests using LLM
-            response = self.client.chat.completions.create(
+            # Generate interests using LLM (deterministic prompt, so cacheable); a reply
+            # that isn't a JSON list is retried on the large model
+            response, interests = router.complete_parsed(
+                'interest_extraction',
+                self._parse_interest_list,
+                client=self.client,
+                deadline=10,
                 messages=messages,
-                model=self.model,
                 temperature=0.2,  # Lower temperature for more focused extraction
                 max_tokens=100,
                 top_p=1,
                 stream=False
             )
+            print(f"Extracted interests from API: {interests}")
+            return interests
             
-            result = response.choices[0].message.content.strip()
-            print(f"Raw interest extraction result: {result}")
-            
-            # Try to parse the response as JSON
-            try:
-                interests = json.loads(result)
-                if isinstance(interests, list):
-                    print(f"Extracted interests from API: {interests}")
-                    return interests
-            except Exception as json_error:
-                print(f"Failed to parse JSON from interest extraction: {str(json_error)}")
-                # If JSON parsing fails, do basic extraction
-                pass
-                
+        except ValueError as parse_error:
+            print(f"Failed to parse JSON from interest extraction: {str(parse_error)}")
             # Fallback to basic keyword extraction
             extracted = self._basic_interest_extraction(message)
             print(f"Falling back to keyword extraction: {extracted}")
@@ -397,6 +428,20 @@ Example outputs: ["machine learning", "artificial intelligence"], ["web developm
             print(f"Extraction fallback due to error: {extracted}")
             return extracted
     
+    @staticmethod
+    def _parse_interest_list(text: str) -> List[str]:
+        """
+        The interest list in an extraction reply
+
+        Raises:
+            ValueError: If the reply isn't a JSON list
+        """
+        print(f"Raw interest extraction result: {text}")
+        interests = json.loads((text or '').strip())
+        if not isinstance(interests, list):
+            raise ValueError(f"expected a JSON list, got {type(interests).__name__}")
+        return interests
+    
     def _get_smart_fallback_response(self, 
                                  user_message: str, 
                                  identified_interests: List[str], 
@@ -404,16 +449,16 @@ Example outputs: ["machine learning", "artificial intelligence"], ["web developm
                                  assessment_state: Optional[Dict[str, Any]] = None,
                                  assessment_question: Optional[str] = None) -> str:
         """Generate a contextual response without using the LLM API, focusing on roadmap integration"""
-        message_lower = user_message.lower()
+        matches = message_matcher.scan(user_message)
         
         # Create a more personalized response by tracking chat state
         first_time_user = len(conversation_history) <= 2
         has_interests = bool(identified_interests)
         is_question = '?' in user_message
-        is_short_greeting = len(user_message) < 10 and any(greeting in message_lower for greeting in ['hi', 'hello', 'hey'])
-        is_frustrated = any(term in message_lower for term in ['not working', 'doesn\'t work', 'wrong', 'error', 'problem', 'issue'])
-        asks_about_roadmap = any(term in message_lower for term in ['roadmap', 'visualization', 'diagram', 'map', 'graph', 'chart'])
-        asks_how_to = 'how' in message_lower and any(term in message_lower for term in ['start', 'begin', 'learn', 'do'])
+        is_short_greeting = len(user_message) < 10 and matches.has('intent', 'greeting')
+        is_frustrated = matches.has('intent', 'frustration')
+        asks_about_roadmap = matches.has('intent', 'visualization')
+        asks_how_to = matches.has('intent', 'how_to') and matches.has('intent', 'getting_started')
         
         # Incorporate assessment question if we have one
         if assessment_question:
@@ -513,54 +558,10 @@ Example outputs: ["machine learning", "artificial intelligence"], ["web developm
         return "As we chat, I'll build a personalized career roadmap visualization for you on the right side of your screen. To get started, please share what fields, technologies, or roles you're interested in exploring. The more specific you can be, the better I can tailor your roadmap!"
             
     def _basic_interest_extraction(self, message: str) -> List[str]:
-        """Enhanced keyword-based interest extraction with special handling for agentic AI and user knowledge assessment"""
-        interests = []
-        message_lower = message.lower()
-        
-        # Primary career domains with related keywords
-        keywords = {
-            'computer science': ['programming', 'code', 'software', 'developer', 'computer science', 'coding', 'development', 'engineer', 'engineering'],
-            'artificial intelligence': ['artificial intelligence', 'ai', 'machine learning', 'ml', 'neural networks', 'deep learning', 'nlp', 'computer vision', 'ai engineer', 'ai research'],
-            'web development': ['web', 'frontend', 'backend', 'fullstack', 'html', 'css', 'javascript', 'web design', 'web app', 'react', 'angular', 'vue', 'node', 'php'],
-            'data science': ['data', 'analytics', 'statistics', 'data science', 'visualization', 'big data', 'data engineering', 'data analysis', 'business intelligence', 'bi', 'database'],
-            'cybersecurity': ['security', 'cyber', 'hacking', 'encryption', 'privacy', 'network security', 'infosec', 'security analyst', 'penetration testing', 'pen test', 'ethical hacking'],
-            'mobile development': ['mobile', 'app development', 'android', 'ios', 'flutter', 'react native', 'swift', 'kotlin', 'mobile app', 'app design'],
-            'game development': ['game', 'gaming', 'unity', 'unreal', '3d', 'game design', 'game programming', 'game developer', 'game engine', 'level design'],
-            'cloud computing': ['cloud', 'aws', 'azure', 'gcp', 'devops', 'infrastructure', 'serverless', 'docker', 'kubernetes', 'microservices', 'devsecops'],
-            'ui/ux design': ['ui', 'ux', 'user interface', 'user experience', 'design', 'wireframe', 'prototype', 'figma', 'sketch', 'adobe xd', 'visual design'],
-            'blockchain': ['blockchain', 'crypto', 'cryptocurrency', 'web3', 'smart contract', 'ethereum', 'nft', 'defi', 'distributed ledger', 'bitcoin'],
-            'project management': ['project management', 'agile', 'scrum', 'kanban', 'product management', 'product owner', 'project manager', 'sprint', 'jira', 'pmp'],
-            'digital marketing': ['marketing', 'seo', 'content marketing', 'social media', 'analytics', 'digital marketing', 'growth hacking', 'ppc', 'google ads', 'facebook ads']
-        }
-        
-        # Check for job titles or role mentions (more specific)
-        specific_roles = {
-            'frontend developer': ['frontend developer', 'front-end developer', 'front end developer', 'ui developer'],
-            'backend developer': ['backend developer', 'back-end developer', 'back end developer', 'api developer'],
-            'full stack developer': ['full stack developer', 'fullstack developer', 'full-stack developer'],
-            'data scientist': ['data scientist', 'data science professional', 'data science career'],
-            'data engineer': ['data engineer', 'data pipeline', 'etl developer', 'data infrastructure'],
-            'machine learning engineer': ['machine learning engineer', 'ml engineer', 'ml specialist'],
-            'cybersecurity analyst': ['cybersecurity analyst', 'security analyst', 'infosec analyst', 'security specialist'],
-            'devops engineer': ['devops engineer', 'site reliability engineer', 'sre', 'devops specialist', 'infrastructure engineer'],
-            'cloud architect': ['cloud architect', 'solutions architect', 'aws architect', 'azure architect'],
-            'ui/ux designer': ['ui designer', 'ux designer', 'ui/ux designer', 'product designer', 'interaction designer', 'user experience designer']
-        }
-        
-        # First check for specific roles (higher priority)
-        for role, terms in specific_roles.items():
-            if any(term in message_lower for term in terms):
-                interests.append(role)
-        
-        # Then check for broader domains
-        for field, terms in keywords.items():
-            if any(term in message_lower for term in terms) and not any(field in interest for interest in interests):
+        """Keyword-based interest extraction: specific roles first, then broader domains"""
+        matches = message_matcher.scan(message)
+        interests = matches.names('role')
+        for field in matches.names('domain'):
+            if not any(field in interest for interest in interests):
                 interests.append(field)
-        
-        # Handle some specific combination cases
-        if 'data' in message_lower and 'machine learning' in message_lower and 'machine learning engineer' not in interests:
-            if 'artificial intelligence' not in interests and 'data science' not in interests:
-                interests.append('data science')
-                interests.append('artificial intelligence')
-        
         return interests
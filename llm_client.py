@@ -0,0 +1,343 @@
+"""
+Process-wide Groq client manager.
+
+Every entry point used to build a brand-new ``Groq`` client per request, which
+threw away the HTTP connection pool and paid the TCP/TLS handshake on every
+chat turn. This module owns one keep-alive connection pool per worker process
+and hands out a shared client that all servers and handlers reuse.
+
+Configuration (environment variables):
+    GROQ_API_KEY          API key passed to the client
+    GROQ_BASE_URL         Override the API host (used by local stand-in servers)
+    GROQ_POOL_SIZE        Max connections in the pool (default 20)
+    GROQ_POOL_KEEPALIVE   Max idle keep-alive connections (default: pool size)
+    GROQ_KEEPALIVE_EXPIRY Seconds an idle connection is kept open (default 30)
+    GROQ_CONNECT_TIMEOUT  Connect timeout in seconds (default 5)
+    GROQ_TIMEOUT          Read/write timeout in seconds (default 60)
+    GROQ_ASYNC_CONCURRENCY  Max in-flight async requests per event loop (default 32)
+
+Calls that reach the API go through the process-wide rate limiter first
+(``rate_limiter.py``: GROQ_RPM, GROQ_TPM and the GROQ_QUEUE_* settings).
+
+Async handlers (Chainlit) use ``get_async_client()``/``async_chat_completion()``,
+which never block the event loop. httpx async pools are tied to the loop that
+created them, so there is one async client (and one concurrency limit) per loop.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+from groq import AsyncGroq, Groq
+from groq.types.chat import ChatCompletion
+
+from llm_cache import make_cache_key, response_cache
+from rate_limiter import estimate_call_tokens, rate_limiter
+from singleflight import SingleFlight
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float from the environment, falling back to a default"""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"⚠️ Ignoring invalid {name}={value!r}, using {default}")
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an int from the environment, falling back to a default"""
+    return int(_env_float(name, default))
+
+
+class LLMClientManager:
+    """
+    Owns the shared Groq client (and its httpx connection pool) for this process.
+
+    The client is created lazily on first use and re-created automatically in a
+    forked child (e.g. gunicorn workers), so every worker gets its own pool.
+    """
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 pool_size: Optional[int] = None,
+                 keepalive_connections: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = None,
+                 connect_timeout: Optional[float] = None,
+                 timeout: Optional[float] = None,
+                 async_concurrency: Optional[int] = None):
+        self._api_key = api_key
+        self._base_url = base_url
+        self.pool_size = pool_size or _env_int("GROQ_POOL_SIZE", 20)
+        self.keepalive_connections = keepalive_connections or _env_int("GROQ_POOL_KEEPALIVE", self.pool_size)
+        self.keepalive_expiry = keepalive_expiry or _env_float("GROQ_KEEPALIVE_EXPIRY", 30.0)
+        self.connect_timeout = connect_timeout or _env_float("GROQ_CONNECT_TIMEOUT", 5.0)
+        self.timeout = timeout or _env_float("GROQ_TIMEOUT", 60.0)
+        self.async_concurrency = async_concurrency or _env_int("GROQ_ASYNC_CONCURRENCY", 32)
+
+        self._lock = threading.Lock()
+        self._client: Optional[Groq] = None
+        self._http_client: Optional[httpx.Client] = None
+        self._pid: Optional[int] = None
+        # event loop -> (pid, AsyncGroq, httpx.AsyncClient, Semaphore)
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[Any, ...]]" = weakref.WeakKeyDictionary()
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._api_key or os.getenv("GROQ_API_KEY")
+
+    @property
+    def base_url(self) -> Optional[str]:
+        return self._base_url or os.getenv("GROQ_BASE_URL") or None
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def get_client(self) -> Groq:
+        """
+        Return the shared Groq client for this process.
+
+        Raises:
+            ValueError: If no GROQ_API_KEY is configured
+        """
+        pid = os.getpid()
+        client = self._client
+        if client is not None and self._pid == pid:
+            return client
+
+        with self._lock:
+            if self._client is not None and self._pid == pid:
+                return self._client
+
+            api_key = self.api_key
+            if not api_key:
+                raise ValueError("GROQ_API_KEY environment variable is not set")
+
+            # A pool inherited across fork() shares sockets with the parent,
+            # so drop it without closing and start a fresh one for this worker
+            self._http_client = httpx.Client(timeout=self._timeout(), limits=self._limits())
+            self._client = Groq(
+                api_key=api_key,
+                base_url=self.base_url,
+                timeout=self._timeout(),
+                http_client=self._http_client
+            )
+            self._pid = pid
+            print(f"✅ Shared Groq client created (pid={pid}, pool={self.pool_size})")
+            return self._client
+
+    def _async_entry(self) -> Tuple[Any, ...]:
+        loop = asyncio.get_running_loop()
+        pid = os.getpid()
+        entry = self._async_clients.get(loop)
+        if entry is not None and entry[0] == pid:
+            return entry
+
+        with self._lock:
+            entry = self._async_clients.get(loop)
+            if entry is not None and entry[0] == pid:
+                return entry
+
+            api_key = self.api_key
+            if not api_key:
+                raise ValueError("GROQ_API_KEY environment variable is not set")
+
+            http_client = httpx.AsyncClient(timeout=self._timeout(), limits=self._limits())
+            client = AsyncGroq(
+                api_key=api_key,
+                base_url=self.base_url,
+                timeout=self._timeout(),
+                http_client=http_client
+            )
+            entry = (pid, client, http_client, asyncio.Semaphore(self.async_concurrency))
+            self._async_clients[loop] = entry
+            print(f"✅ Shared async Groq client created (pid={pid}, concurrency={self.async_concurrency})")
+            return entry
+
+    def get_async_client(self) -> AsyncGroq:
+        """
+        Return the shared AsyncGroq client for the running event loop.
+
+        Raises:
+            ValueError: If no GROQ_API_KEY is configured
+            RuntimeError: If called outside a running event loop
+        """
+        return self._async_entry()[1]
+
+    def async_limit(self) -> asyncio.Semaphore:
+        """Semaphore capping in-flight async requests on the running event loop"""
+        return self._async_entry()[3]
+
+    def is_configured(self) -> bool:
+        """Whether an API key is available to build a client"""
+        return bool(self.api_key)
+
+    def close(self) -> None:
+        """Close the connection pool owned by this process"""
+        with self._lock:
+            if self._http_client is not None and self._pid == os.getpid():
+                self._http_client.close()
+            self._client = None
+            self._http_client = None
+            self._pid = None
+
+    async def aclose(self) -> None:
+        """Close the async connection pool of the running event loop"""
+        entry = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None and entry[0] == os.getpid():
+            await entry[2].aclose()
+
+
+class TokenUsageTracker:
+    """Per-call-site token counters fed from the `usage` block of Groq responses"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, int]] = {}
+
+    def record(self, call_site: str, response: Any) -> Dict[str, int]:
+        """Add a response's token usage to `call_site` and return this call's usage"""
+        usage = getattr(response, "usage", None)
+        turn = {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0
+        }
+        with self._lock:
+            site = self._sites.setdefault(call_site, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            site["calls"] += 1
+            site["prompt_tokens"] += turn["prompt_tokens"]
+            site["completion_tokens"] += turn["completion_tokens"]
+        return turn
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Totals and per-call averages for every call site"""
+        with self._lock:
+            result = {}
+            for name, site in self._sites.items():
+                calls = site["calls"] or 1
+                result[name] = dict(site,
+                                    avg_prompt_tokens=round(site["prompt_tokens"] / calls, 1),
+                                    avg_completion_tokens=round(site["completion_tokens"] / calls, 1))
+            return result
+
+
+# Process-wide manager used by all entry points
+llm_clients = LLMClientManager()
+
+# Process-wide token accounting
+token_usage = TokenUsageTracker()
+
+# Identical cacheable completions in flight at the same time
+_flights = SingleFlight('llm_client')
+
+
+def get_groq_client() -> Groq:
+    """Shortcut for the shared Groq client of this process"""
+    return llm_clients.get_client()
+
+
+def complete(call_site: str, client: Optional[Groq] = None,
+             on_latency: Optional[Callable[[float], None]] = None,
+             cache_if: Optional[Callable[[ChatCompletion], bool]] = None, bypass_flight: bool = False,
+             **create_kwargs) -> ChatCompletion:
+    """
+    Create a chat completion on behalf of a named call site.
+
+    Serves the response from the LLM response cache when the call site has a
+    cache policy; identical cacheable requests that miss at the same time
+    share one API call. Calls that reach the API wait for the rate limiter
+    (which raises RateLimited when it sheds them), and their token usage is
+    recorded.
+
+    Args:
+        call_site: Stable name of the caller (e.g. "interest_extraction")
+        client: Groq client to use (default: the shared client)
+        on_latency: Called with the seconds the API request took, only for
+            calls that reached the API (not cache hits or rate limiter waits)
+        cache_if: Only cache a fresh response when this returns True (e.g.
+            when the reply passes the caller's validation)
+        bypass_flight: Send the request even when an identical one is cached
+            or in flight (a hedged backup must not wait on the slow primary);
+            the fresh response is still cached
+        **create_kwargs: Arguments for client.chat.completions.create
+    """
+    policy = None if create_kwargs.get("stream") else response_cache.policy_for(call_site)
+    if policy is not None:
+        key = make_cache_key(call_site, create_kwargs)
+        if bypass_flight:
+            return _create_and_cache(call_site, client, create_kwargs, key, policy, on_latency, cache_if)
+        cached = response_cache.get(call_site, key, policy, ChatCompletion.model_validate_json)
+        if cached is not None:
+            return cached
+        return _flights.do((call_site, key), _create_and_cache, call_site, client, create_kwargs, key, policy,
+                           on_latency, cache_if)
+    return _create(call_site, client, create_kwargs, on_latency)
+
+
+def usage_tokens(usage: Any) -> Optional[int]:
+    """Total tokens of a response's `usage` block (None when the response has none)"""
+    if usage is None:
+        return None
+    return (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+
+
+def _create(call_site: str, client: Optional[Groq], create_kwargs: Dict[str, Any],
+            on_latency: Optional[Callable[[float], None]] = None) -> ChatCompletion:
+    estimated = estimate_call_tokens(create_kwargs)
+    rate_limiter.acquire(estimated, timeout=create_kwargs.get("timeout"))
+    # A failed call gives its estimate back to the tokens-per-minute budget
+    actual: Optional[int] = 0
+    try:
+        start = time.monotonic()
+        response = (client or llm_clients.get_client()).chat.completions.create(**create_kwargs)
+        if on_latency is not None:
+            on_latency(time.monotonic() - start)
+        token_usage.record(call_site, response)
+        actual = usage_tokens(response.usage)
+    finally:
+        rate_limiter.settle(estimated, actual)
+    return response
+
+
+def _create_and_cache(call_site: str, client: Optional[Groq], create_kwargs: Dict[str, Any],
+                      key: str, policy, on_latency: Optional[Callable[[float], None]] = None,
+                      cache_if: Optional[Callable[[ChatCompletion], bool]] = None) -> ChatCompletion:
+    response = _create(call_site, client, create_kwargs, on_latency)
+    if cache_if is None or cache_if(response):
+        response_cache.set(call_site, key, response, policy, lambda r: r.model_dump_json())
+    return response
+
+
+async def async_chat_completion(call_site: str, **create_kwargs) -> ChatCompletion:
+    """
+    Await a chat completion on the shared async client on behalf of a named
+    call site, waiting for rate limiter capacity and for a free slot when
+    GROQ_ASYNC_CONCURRENCY requests are already in flight. Token usage is
+    recorded like complete() does.
+    """
+    estimated = estimate_call_tokens(create_kwargs)
+    await rate_limiter.acquire_async(estimated, timeout=create_kwargs.get("timeout"))
+    actual: Optional[int] = 0
+    try:
+        async with llm_clients.async_limit():
+            response = await llm_clients.get_async_client().chat.completions.create(**create_kwargs)
+        token_usage.record(call_site, response)
+        actual = usage_tokens(response.usage)
+    finally:
+        rate_limiter.settle(estimated, actual)
+    return response
@@ -0,0 +1,136 @@
+"""
+Run independent LLM calls for one chat turn concurrently.
+
+A turn makes two Groq calls that don't depend on each other: the chat reply
+and the roadmap update. Running them one after the other makes the turn take
+their sum; running them side by side makes it take the slower of the two.
+
+Flask handlers use ParallelCalls (a shared thread pool); the Chainlit handlers
+use call_with_deadline with asyncio.gather.
+
+Environment variables:
+    LLM_PARALLEL_WORKERS   threads in the shared pool (default 16)
+    LLM_CHAT_DEADLINE      seconds allowed for the chat reply (default 30)
+    LLM_ROADMAP_DEADLINE   seconds allowed for the roadmap update (default 45)
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+CHAT_DEADLINE = float(os.getenv('LLM_CHAT_DEADLINE', 30))
+ROADMAP_DEADLINE = float(os.getenv('LLM_ROADMAP_DEADLINE', 45))
+
+_RAISE = object()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Shared thread pool for LLM calls, created on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('LLM_PARALLEL_WORKERS', 16)),
+                    thread_name_prefix='llm-call'
+                )
+    return _executor
+
+
+class ParallelCalls:
+    """
+    Submit named calls to the shared pool and collect them with per-call deadlines.
+
+    Use as a context manager: leaving the block (normally, on error, or when a
+    streaming response is closed because the client went away) cancels every
+    call that hasn't started yet. A call that is already running can't be
+    interrupted from outside, so pass the same deadline as the Groq request
+    `timeout` to bound it, and have it return its result instead of writing
+    shared state: the caller applies only what arrives before the deadline.
+
+        with ParallelCalls() as calls:
+            calls.submit('roadmap', update_roadmap, roadmap, msg, deadline=ROADMAP_DEADLINE)
+            calls.submit('chat', chat_reply, user_id, deadline=CHAT_DEADLINE)
+            reply = calls.result('chat')
+            updated = calls.result('roadmap', default=None)
+            if updated is not None:
+                roadmaps[user_id] = updated
+    """
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        self._executor = executor or get_executor()
+        self._futures: Dict[str, Future] = {}
+        self._deadlines: Dict[str, Optional[float]] = {}
+
+    def submit(self, name: str, fn: Callable[..., Any], *args, deadline: Optional[float] = None, **kwargs) -> Future:
+        """Start `fn(*args, **kwargs)`; `deadline` is in seconds from now"""
+        # Run in a copy of the caller's context (e.g. the rate limiter's current user)
+        self._futures[name] = self._executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        self._deadlines[name] = time.monotonic() + deadline if deadline is not None else None
+        return self._futures[name]
+
+    def result(self, name: str, default: Any = _RAISE) -> Any:
+        """
+        Wait for a call until its deadline.
+
+        Raises the call's exception (or concurrent.futures.TimeoutError) unless
+        a `default` is given, in which case failures are logged and `default`
+        is returned instead.
+        """
+        future = self._futures[name]
+        deadline_at = self._deadlines[name]
+        timeout = max(0.0, deadline_at - time.monotonic()) if deadline_at is not None else None
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            print(f"LLM call '{name}' missed its deadline")
+            if default is _RAISE:
+                raise
+            return default
+        except Exception as e:
+            if default is _RAISE:
+                raise
+            print(f"LLM call '{name}' failed: {e}")
+            return default
+
+    def cancel(self) -> None:
+        """Cancel every call that hasn't started yet"""
+        for future in self._futures.values():
+            future.cancel()
+
+    def __enter__(self) -> "ParallelCalls":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.cancel()
+
+
+async def call_with_deadline(awaitable: Awaitable, deadline: float, name: str, default: Any = _RAISE) -> Any:
+    """
+    Await `awaitable` for at most `deadline` seconds (cancelling it on timeout).
+
+    With a `default`, timeouts and errors are logged and `default` is returned,
+    so one failed call doesn't sink the others in an asyncio.gather.
+    """
+    try:
+        return await asyncio.wait_for(awaitable, timeout=deadline)
+    except asyncio.TimeoutError:
+        print(f"LLM call '{name}' missed its deadline")
+        if default is _RAISE:
+            raise
+        return default
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        if default is _RAISE:
+            raise
+        print(f"LLM call '{name}' failed: {e}")
+        return default
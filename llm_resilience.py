@@ -0,0 +1,401 @@
+"""
+Deadlines, retries, hedging and a circuit breaker around Groq completions.
+
+`resilience.complete(call_site, ...)` wraps llm_client.complete:
+
+- Every call has a deadline. Each attempt's HTTP timeout is the smaller of
+  the time left and LLM_ATTEMPT_TIMEOUT, so a slow upstream can't hold a
+  worker for the SDK's 60s default.
+- Retryable failures (timeouts, connection errors, 408/409/429/5xx) are
+  retried with jittered exponential backoff while the deadline allows. The
+  SDK's own retries are turned off for these calls, so there is one retry
+  policy.
+- With hedging on, a second identical request is sent when the first one
+  hasn't answered after the call site's recent p95 latency, and whichever
+  answers first wins. Only use it where duplicate requests are harmless.
+- A circuit breaker opens after LLM_BREAKER_FAILURES consecutive retryable
+  failures. While it is open, calls fail at once with CircuitOpen, so
+  callers go straight to their fallback. After LLM_BREAKER_COOLDOWN one
+  probe call is let through; its outcome closes or reopens the breaker.
+
+`resilience.stream(call_site, ...)` puts streamed replies behind the same
+breaker, with LLM_ATTEMPT_TIMEOUT (or a shorter deadline) bounding the
+connect and every wait for a chunk, the first token included. Streams are
+neither retried nor hedged: once tokens have gone out they can't be repeated.
+
+RateLimited (our own load shedding) is never retried and doesn't count as
+an upstream failure.
+
+Environment:
+    LLM_DEADLINE            default deadline per call (default 30s)
+    LLM_ATTEMPT_TIMEOUT     longest single attempt (default 15s)
+    LLM_RETRIES             retries after the first attempt (default 2)
+    LLM_RETRY_BASE          first backoff step (default 0.25s)
+    LLM_RETRY_MAX           backoff cap (default 4s)
+    LLM_HEDGE               1 to hedge calls that allow it (default 0)
+    LLM_HEDGE_MIN_SAMPLES   latencies needed before hedging (default 20)
+    LLM_HEDGE_MIN_DELAY     lower bound of the hedge delay (default 0.2s)
+    LLM_HEDGE_WORKERS       threads for hedged calls (default 16)
+    LLM_BREAKER_FAILURES    consecutive failures that open the breaker (default 5)
+    LLM_BREAKER_COOLDOWN    seconds the breaker stays open (default 30)
+"""
+
+import contextvars
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import groq
+import httpx
+from groq import Groq
+from groq.types.chat import ChatCompletion
+
+from llm_client import complete, get_groq_client
+from rate_limiter import RateLimited
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an upstream the breaker considers unhealthy"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call's deadline passes before any attempt succeeded"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed attempt may succeed if repeated (and says something about upstream health)"""
+    if isinstance(error, RateLimited):
+        return False
+    # httpx errors reach us unwrapped when a stream breaks off mid-reply
+    if isinstance(error, (groq.APIConnectionError, httpx.TransportError, DeadlineExceeded)):
+        return True
+    if isinstance(error, groq.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS
+    return False
+
+
+def _retry_after(error: BaseException) -> float:
+    """The Retry-After of a 429/503 response, in seconds (0 when absent)"""
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers.get('retry-after', 0)) if response is not None else 0.0
+    except ValueError:
+        return 0.0
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures -> half-open probe after `cooldown`"""
+
+    def __init__(self, failure_threshold: Optional[int] = None, cooldown: Optional[float] = None):
+        self.failure_threshold = failure_threshold or int(os.getenv('LLM_BREAKER_FAILURES', 5))
+        self.cooldown = float(os.getenv('LLM_BREAKER_COOLDOWN', 30)) if cooldown is None else cooldown
+        self._lock = threading.Lock()
+        self._state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._counters = {'opened': 0, 'rejected': 0}
+
+    def allow(self) -> bool:
+        """
+        Raise CircuitOpen unless a call may go out now (in half-open state, one probe at a time).
+
+        Returns True when the caller got the half-open probe slot; it must
+        then record an outcome or release() the slot.
+        """
+        with self._lock:
+            if self._state == 'closed':
+                return False
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if self._state == 'open' and remaining <= 0:
+                self._state = 'half_open'
+            if self._state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            self._counters['rejected'] += 1
+            raise CircuitOpen("LLM upstream unavailable (circuit open)", max(remaining, 1.0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != 'closed':
+                print("✅ LLM circuit breaker closed")
+            self._state, self._failures, self._probing = 'closed', 0, False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == 'half_open' or (self._state == 'closed' and self._failures >= self.failure_threshold):
+                print(f"⚠️ LLM circuit breaker opened after {self._failures} failures, "
+                      f"failing fast for {self.cooldown:.0f}s")
+                self._state, self._opened_at, self._probing = 'open', time.monotonic(), False
+                self._counters['opened'] += 1
+
+    def release(self) -> None:
+        """Give up a half-open probe slot without an outcome (the call never reached upstream)"""
+        with self._lock:
+            self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._counters, state=self._state, consecutive_failures=self._failures)
+
+
+class LatencyWindow:
+    """Latencies of recent successful upstream requests, for the hedge delay"""
+
+    def __init__(self, size: int = 200):
+        self._lock = threading.Lock()
+        self._values: deque = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._values.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def percentile(self, fraction: float) -> float:
+        with self._lock:
+            ordered = sorted(self._values)
+        if not ordered:
+            return 0.0
+        return ordered[max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))]
+
+
+class ResilientCaller:
+    """Deadline/retry/hedge/breaker policy shared by every resilient call in the process"""
+
+    def __init__(self, deadline: Optional[float] = None, attempt_timeout: Optional[float] = None,
+                 retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None, hedge: Optional[bool] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.deadline = deadline or float(os.getenv('LLM_DEADLINE', 30))
+        self.attempt_timeout = attempt_timeout or float(os.getenv('LLM_ATTEMPT_TIMEOUT', 15))
+        self.retries = int(os.getenv('LLM_RETRIES', 2)) if retries is None else retries
+        self.backoff_base = backoff_base or float(os.getenv('LLM_RETRY_BASE', 0.25))
+        self.backoff_max = backoff_max or float(os.getenv('LLM_RETRY_MAX', 4))
+        self.hedge = os.getenv('LLM_HEDGE', '0') == '1' if hedge is None else hedge
+        self.hedge_min_samples = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 20))
+        self.hedge_min_delay = float(os.getenv('LLM_HEDGE_MIN_DELAY', 0.2))
+        self.breaker = breaker or CircuitBreaker()
+        # (call site, tier) -> latencies; a call site's tiers are far apart, so each gets its own p95
+        self._latencies: Dict[Tuple[str, str], LatencyWindow] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # client -> the same client with the SDK's retries turned off
+        self._no_retry_clients: "weakref.WeakKeyDictionary[Groq, Groq]" = weakref.WeakKeyDictionary()
+        self._counters = {'calls': 0, 'attempts': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0,
+                          'failures': 0, 'deadline_exceeded': 0, 'streams': 0, 'stream_failures': 0}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def _latency(self, call_site: str, tier: str) -> LatencyWindow:
+        with self._lock:
+            return self._latencies.setdefault((call_site, tier), LatencyWindow())
+
+    def _no_retry(self, client: Optional[Groq]) -> Groq:
+        client = client or get_groq_client()
+        with self._lock:
+            wrapped = self._no_retry_clients.get(client)
+            if wrapped is None:
+                wrapped = self._no_retry_clients[client] = client.with_options(max_retries=0)
+        return wrapped
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=int(os.getenv('LLM_HEDGE_WORKERS', 16)),
+                                                    thread_name_prefix='llm-hedge')
+            return self._executor
+
+    def _hedge_delay(self, latency: LatencyWindow) -> Optional[float]:
+        """p95 latency of the call site's tier, once there are enough samples to trust it"""
+        if len(latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, latency.percentile(0.95))
+
+    def _attempt(self, call_site: str, client: Groq, create_kwargs: Dict[str, Any], timeout: float,
+                 latency: LatencyWindow, bypass_flight: bool = False) -> ChatCompletion:
+        self._count('attempts')
+        # Only requests that reached upstream feed the hedge delay (not cache hits or rate limiter waits)
+        return complete(call_site, client=client, on_latency=latency.record, bypass_flight=bypass_flight,
+                        **dict(create_kwargs, timeout=timeout))
+
+    def _hedged_attempt(self, call_site: str, client: Groq, create_kwargs: Dict[str, Any], timeout: float,
+                        latency: LatencyWindow, hedge_delay: float) -> ChatCompletion:
+        """Primary request, plus a second one if the primary is slower than `hedge_delay`; first answer wins"""
+        executor = self._get_executor()
+        start = time.monotonic()
+        # Copied so rate limiting still sees the caller's user
+        primary = executor.submit(contextvars.copy_context().run, self._attempt, call_site, client, create_kwargs,
+                                  timeout, latency)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        left = timeout - (time.monotonic() - start)
+        self._count('hedges')
+        # The backup skips the cache and single-flight, otherwise it would just join the primary's request
+        backup = executor.submit(contextvars.copy_context().run, self._attempt, call_site, client, create_kwargs, left,
+                                 latency, True)
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, timeout - (time.monotonic() - start)) + 1.0,
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._count('hedge_wins')
+                    # The loser finishes in the background; its result is dropped
+                    return future.result()
+                error = future.exception()
+        raise error or DeadlineExceeded(f"{call_site}: no answer within {timeout:.1f}s")
+
+    def complete(self, call_site: str, client: Optional[Groq] = None, deadline: Optional[float] = None,
+                 hedge: bool = False, tier: Optional[str] = None, **create_kwargs) -> ChatCompletion:
+        """
+        llm_client.complete with a deadline, retries, optional hedging and the circuit breaker.
+
+        Args:
+            call_site: Stable name of the caller
+            client: Groq client to use (default: the shared client)
+            deadline: Seconds the whole call may take (default LLM_DEADLINE)
+            hedge: Allow a hedged second request (only takes effect with LLM_HEDGE=1)
+            tier: model_router tier of the call; latencies (and so the hedge
+                delay) are kept per call site and tier (default: per model)
+            **create_kwargs: Arguments for client.chat.completions.create (a
+                `timeout` caps each attempt), plus llm_client.complete's `cache_if`
+
+        Raises:
+            CircuitOpen: while the breaker is open (nothing is sent)
+            RateLimited: when the rate limiter sheds the call
+            The last attempt's error (or DeadlineExceeded) when all attempts failed
+        """
+        probe = self.breaker.allow()
+        try:
+            self._count('calls')
+            client = self._no_retry(client)
+            deadline_at = time.monotonic() + (deadline or self.deadline)
+            attempt_timeout = min(self.attempt_timeout, create_kwargs.pop('timeout', None) or self.attempt_timeout)
+            latency = self._latency(call_site, tier or create_kwargs.get('model', ''))
+            hedge_delay = self._hedge_delay(latency) if hedge and self.hedge else None
+
+            attempt = 0
+            while True:
+                remaining = deadline_at - time.monotonic()
+                timeout = min(attempt_timeout, remaining)
+                try:
+                    if hedge_delay is not None and hedge_delay < timeout:
+                        response = self._hedged_attempt(call_site, client, create_kwargs, timeout, latency,
+                                                            hedge_delay)
+                    else:
+                        response = self._attempt(call_site, client, create_kwargs, timeout, latency)
+                    self.breaker.record_success()
+                    return response
+                except Exception as e:
+                    if not is_retryable(e):
+                        # Upstream answered (e.g. a 400) or we shed the call ourselves
+                        if not isinstance(e, RateLimited):
+                            self.breaker.record_success()
+                        raise
+                    self.breaker.record_failure()
+                    backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                    backoff = max(backoff, _retry_after(e))
+                    remaining = deadline_at - time.monotonic()
+                    if attempt >= self.retries or backoff >= remaining - 0.05:
+                        self._count('failures')
+                        if remaining <= 0.05:
+                            self._count('deadline_exceeded')
+                        raise
+                    print(f"⚠️ {call_site}: attempt {attempt + 1} failed ({type(e).__name__}), "
+                          f"retrying in {backoff:.2f}s")
+                    time.sleep(backoff)
+                    # Other calls may have opened the breaker meanwhile
+                    probe = self.breaker.allow()
+                    self._count('retries')
+                    attempt += 1
+        finally:
+            # A probe that ended without an outcome (shed by the rate limiter, or an
+            # error before any request went out) must not leave the breaker half-open
+            if probe:
+                self.breaker.release()
+
+    def stream(self, call_site: str, client: Optional[Groq] = None, timer=None,
+               deadline: Optional[float] = None, **create_kwargs) -> Iterator[str]:
+        """
+        sse.stream_completion behind the circuit breaker, with a connect/first-token deadline.
+
+        Args:
+            call_site: Stable name of the caller
+            client: Groq client to use (default: the shared client)
+            timer: Optional sse.StreamTimer
+            deadline: Longest wait to connect or for any chunk, the first
+                included (capped by LLM_ATTEMPT_TIMEOUT)
+            **create_kwargs: Arguments for client.chat.completions.create
+
+        Raises (on the first next()):
+            CircuitOpen: while the breaker is open (nothing is sent)
+            RateLimited: when the rate limiter sheds the call
+        """
+        from sse import stream_completion
+
+        probe = self.breaker.allow()
+        self._count('streams')
+        timeout = min(self.attempt_timeout, deadline or self.attempt_timeout)
+        create_kwargs.pop('timeout', None)
+        answered = False
+        try:
+            for delta in stream_completion(self._no_retry(client), timer, timeout=timeout, **create_kwargs):
+                if not answered:
+                    # Upstream is healthy once the first token is in
+                    answered = True
+                    self.breaker.record_success()
+                yield delta
+            if not answered:
+                self.breaker.record_success()
+        except Exception as e:
+            if is_retryable(e):
+                print(f"⚠️ {call_site}: stream failed ({type(e).__name__})")
+                self._count('stream_failures')
+                self.breaker.record_failure()
+            elif not answered and not isinstance(e, RateLimited):
+                self.breaker.record_success()
+            raise
+        finally:
+            # Closed by the client before the first token, or shed: give the probe slot back
+            if probe:
+                self.breaker.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            sites = list(self._latencies.items())
+        counters['breaker'] = self.breaker.stats()
+        counters['p95_ms'] = {f"{site}/{tier}": round(window.percentile(0.95) * 1000, 1)
+                              for (site, tier), window in sites}
+        return counters
+
+
+# Process-wide policy and breaker shared by every entry point
+resilience = ResilientCaller()
@@ -0,0 +1,215 @@
+"""
+Model routing: each LLM call site gets a model tier.
+
+Extraction, classification, health checks, summaries and structured
+roadmap updates run on the small, fast model; chat replies run on the
+large one. Calls whose output is parsed (a JSON interest list, a roadmap
+patch) pass a `parse` function: if it raises on the small model's reply,
+the same request is repeated on the next larger tier.
+
+Per-tier calls, escalations, validation failures, latency and token use
+are reported by `router.stats()` (under `model_router` in /api/metrics).
+
+Environment:
+    MODEL_SMALL     small tier model (default llama-3.1-8b-instant)
+    MODEL_LARGE     large tier model (default llama-3.3-70b-versatile)
+    MODEL_ROUTES    per-call-site overrides, e.g. "roadmap_patch=large,chat=small"
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from groq.types.chat import ChatCompletion
+
+from llm_client import async_chat_completion
+from llm_resilience import LatencyWindow, resilience
+
+# Smallest first; escalation moves one step to the right
+TIERS = ('small', 'large')
+
+DEFAULT_ROUTES: Dict[str, str] = {
+    'interest_extraction': 'small',
+    'api_health_check': 'small',
+    'context_summary': 'small',
+    'roadmap_patch': 'small',
+    'roadmap_json': 'small',
+    'chat': 'large',
+    'chat_first_turn': 'large',
+}
+
+# Call sites without a route get the large tier
+DEFAULT_TIER = 'large'
+
+
+def _parse_routes(value: str) -> Dict[str, str]:
+    """'site=tier,site=tier' -> {site: tier}; unknown tiers are ignored"""
+    routes = {}
+    for item in value.split(','):
+        site, _, tier = item.partition('=')
+        site, tier = site.strip(), tier.strip().lower()
+        if not site:
+            continue
+        if tier not in TIERS:
+            print(f"⚠️ Ignoring MODEL_ROUTES entry {item.strip()!r}: tier must be one of {', '.join(TIERS)}")
+            continue
+        routes[site] = tier
+    return routes
+
+
+def _parses(parse: Callable[[str], Any], response: ChatCompletion) -> bool:
+    """Whether `parse` accepts the response's reply"""
+    try:
+        parse(response.choices[0].message.content)
+        return True
+    except Exception:
+        return False
+
+
+class TierStats:
+    """Counters and recent latencies of one tier"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = LatencyWindow(size=1000)
+        self.counters = {'calls': 0, 'errors': 0, 'validation_failures': 0, 'escalations': 0,
+                         'prompt_tokens': 0, 'completion_tokens': 0}
+
+    def record(self, seconds: float, response: Optional[ChatCompletion] = None, error: bool = False) -> None:
+        usage = getattr(response, 'usage', None)
+        with self._lock:
+            self.counters['calls'] += 1
+            self.counters['errors'] += int(error)
+            if usage is not None:
+                self.counters['prompt_tokens'] += usage.prompt_tokens or 0
+                self.counters['completion_tokens'] += usage.completion_tokens or 0
+        if not error:
+            self.latency.record(seconds)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        return dict(counters, p50_ms=round(self.latency.percentile(0.5) * 1000, 1),
+                    p95_ms=round(self.latency.percentile(0.95) * 1000, 1))
+
+
+class ModelRouter:
+    """Maps call sites to tiers and tiers to models, escalating when a reply fails validation"""
+
+    def __init__(self, routes: Optional[Dict[str, str]] = None, models: Optional[Dict[str, str]] = None):
+        self.models = models or {
+            'small': os.getenv('MODEL_SMALL', 'llama-3.1-8b-instant'),
+            'large': os.getenv('MODEL_LARGE', 'llama-3.3-70b-versatile'),
+        }
+        self.routes = dict(DEFAULT_ROUTES)
+        self.routes.update(_parse_routes(os.getenv('MODEL_ROUTES', '')) if routes is None else routes)
+        self._tiers = {tier: TierStats() for tier in TIERS}
+
+    def tier_for(self, call_site: str) -> str:
+        return self.routes.get(call_site, DEFAULT_TIER)
+
+    def model_for(self, call_site: str) -> str:
+        """Model of the call site's tier (for calls made outside the router, e.g. streams)"""
+        return self.models[self.tier_for(call_site)]
+
+    def _ladder(self, call_site: str, model: Optional[str]) -> List[Tuple[str, str]]:
+        """(tier, model) pairs to try in order; a pinned model is tried alone"""
+        if model:
+            tier = next((t for t in TIERS if self.models[t] == model), self.tier_for(call_site))
+            return [(tier, model)]
+        start = TIERS.index(self.tier_for(call_site))
+        return [(tier, self.models[tier]) for tier in TIERS[start:]]
+
+    def _validated(self, call_site: str, tier: str, response: ChatCompletion,
+                   parse: Optional[Callable[[str], Any]], last: bool) -> Tuple[bool, Any]:
+        """(ok, parsed value); raises the parse error on the last tier"""
+        if parse is None:
+            return True, None
+        try:
+            return True, parse(response.choices[0].message.content)
+        except Exception as e:
+            self._tiers[tier].count('validation_failures')
+            if last:
+                raise
+            self._tiers[tier].count('escalations')
+            print(f"⚠️ {call_site}: {tier} model reply failed validation ({e}), escalating")
+            return False, None
+
+    def complete_parsed(self, call_site: str, parse: Optional[Callable[[str], Any]],
+                        model: Optional[str] = None, **call_kwargs) -> Tuple[ChatCompletion, Any]:
+        """
+        Chat completion on the call site's tier, through llm_resilience.
+
+        Args:
+            call_site: Stable name of the caller; picks the tier
+            parse: fn(reply text) -> value, raising when the reply is unusable;
+                a failure repeats the call on the next larger tier
+            model: Pin a model instead of routing (no escalation)
+            **call_kwargs: Arguments for resilience.complete (client, deadline,
+                hedge and the create arguments, without `model`)
+
+        Returns:
+            (response, parsed value or None without `parse`)
+
+        Raises:
+            The parse error of the largest tier's reply, or the call's error
+        """
+        ladder = self._ladder(call_site, model)
+        # Cacheable call sites only cache replies that pass `parse`, so a bad reply isn't served again
+        cache_if = None if parse is None else lambda response: _parses(parse, response)
+        for index, (tier, tier_model) in enumerate(ladder):
+            start = time.monotonic()
+            try:
+                response = resilience.complete(call_site, model=tier_model, tier=tier, cache_if=cache_if,
+                                               **call_kwargs)
+            except Exception:
+                self._tiers[tier].record(time.monotonic() - start, error=True)
+                raise
+            self._tiers[tier].record(time.monotonic() - start, response)
+            ok, value = self._validated(call_site, tier, response, parse, index == len(ladder) - 1)
+            if ok:
+                return response, value
+
+    def complete(self, call_site: str, model: Optional[str] = None, **call_kwargs) -> ChatCompletion:
+        """complete_parsed without validation: the response of the call site's tier"""
+        return self.complete_parsed(call_site, None, model=model, **call_kwargs)[0]
+
+    async def acomplete_parsed(self, call_site: str, parse: Optional[Callable[[str], Any]],
+                               model: Optional[str] = None, **create_kwargs) -> Tuple[ChatCompletion, Any]:
+        """complete_parsed for coroutines, on the shared async client (llm_client.async_chat_completion)"""
+        ladder = self._ladder(call_site, model)
+        for index, (tier, tier_model) in enumerate(ladder):
+            start = time.monotonic()
+            try:
+                response = await async_chat_completion(call_site, model=tier_model, **create_kwargs)
+            except Exception:
+                self._tiers[tier].record(time.monotonic() - start, error=True)
+                raise
+            self._tiers[tier].record(time.monotonic() - start, response)
+            ok, value = self._validated(call_site, tier, response, parse, index == len(ladder) - 1)
+            if ok:
+                return response, value
+
+    async def acomplete(self, call_site: str, model: Optional[str] = None, **create_kwargs) -> ChatCompletion:
+        return (await self.acomplete_parsed(call_site, None, model=model, **create_kwargs))[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'models': dict(self.models),
+            'routes': dict(self.routes),
+            'tiers': {tier: stats.snapshot() for tier, stats in self._tiers.items()},
+        }
+
+
+# Process-wide routing table, shared by every entry point
+router = ModelRouter()
+
+
+def model_for(call_site: str) -> str:
+    """Shortcut for router.model_for"""
+    return router.model_for(call_site)
@@ -0,0 +1,302 @@
+"""
+Client-side rate limiting and admission control for Groq calls.
+
+Every call that reaches the API first takes one request from a
+requests-per-minute bucket and its estimated tokens (prompt + max_tokens)
+from a tokens-per-minute bucket; the estimate is settled against the
+reported usage afterwards. Without capacity, callers wait in a bounded
+queue that is served round-robin across users, so one busy session can't
+starve the others. When the queue (or a user's share of it) is full, or
+the expected wait is longer than the caller can wait, the call is shed
+at once with RateLimited, which the servers turn into a 429 with
+Retry-After instead of holding a Flask thread.
+
+The buckets live in each worker process. GROQ_RPM and GROQ_TPM are the
+limits of the whole account (the defaults are Groq's free tier; set your
+plan's limits), and each process gets its share: the limit divided by
+GROQ_WORKERS, which defaults to WEB_CONCURRENCY (gunicorn's worker count
+setting) or 1.
+
+Environment:
+    GROQ_RPM               account requests per minute (default 30, 0 = unlimited)
+    GROQ_TPM               account tokens per minute (default 12000, 0 = unlimited)
+    GROQ_WORKERS           processes sharing the account limits (default WEB_CONCURRENCY or 1)
+    GROQ_QUEUE_SIZE        callers allowed to wait for capacity (default 32)
+    GROQ_QUEUE_PER_USER    waiting calls one user may hold (default 4)
+    GROQ_QUEUE_TIMEOUT     longest wait before a call is shed (default 10s)
+"""
+
+import asyncio
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+
+from token_estimate import message_tokens
+
+# User the current request's LLM calls are queued under (copied into worker threads by ParallelCalls)
+current_user: contextvars.ContextVar = contextvars.ContextVar('llm_user', default='anonymous')
+
+# Async waiters poll at most this often while they aren't at the head of the queue
+_ASYNC_POLL_SECONDS = 0.05
+
+
+class RateLimited(Exception):
+    """Raised when a call is shed; `retry_after` is a hint in seconds"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def set_current_user(user_id: Optional[str]) -> None:
+    """Queue this request's LLM calls under `user_id`"""
+    current_user.set(user_id or 'anonymous')
+
+
+def estimate_call_tokens(create_kwargs: Dict[str, Any]) -> int:
+    """Tokens a chat completion request may use: its prompt plus max_tokens"""
+    messages: List[Dict[str, Any]] = create_kwargs.get('messages') or []
+    return sum(message_tokens(m) for m in messages) + int(create_kwargs.get('max_tokens') or 1024)
+
+
+class TokenBucket:
+    """Refills `per_minute` units a minute up to `capacity` (no limit when per_minute <= 0)"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.unlimited = per_minute <= 0
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (requests above capacity wait for a full bucket)"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def backlog_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units could all have been taken, one after another"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        return max(0.0, amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        """Return unused units (or, when negative, charge for extra use)"""
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """Token buckets plus a bounded, per-user round-robin wait queue, shared by all threads"""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 queue_size: Optional[int] = None, per_user_queue: Optional[int] = None,
+                 max_wait: Optional[float] = None):
+        # Explicit limits are this process's own; the environment gives the account's, shared by the workers
+        workers = max(1, int(os.getenv('GROQ_WORKERS') or os.getenv('WEB_CONCURRENCY') or 1))
+        rpm = float(os.getenv('GROQ_RPM', 30)) / workers if requests_per_minute is None else requests_per_minute
+        tpm = float(os.getenv('GROQ_TPM', 12000)) / workers if tokens_per_minute is None else tokens_per_minute
+        self.limits = {'rpm': rpm, 'tpm': tpm}
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.queue_size = int(os.getenv('GROQ_QUEUE_SIZE', 32)) if queue_size is None else queue_size
+        self.per_user_queue = int(os.getenv('GROQ_QUEUE_PER_USER', 4)) if per_user_queue is None else per_user_queue
+        self.max_wait = float(os.getenv('GROQ_QUEUE_TIMEOUT', 10)) if max_wait is None else max_wait
+        self._cond = threading.Condition()
+        # user -> waiting tickets; the first user is served next, then moves to the back
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._waiting = 0
+        self._counters = {'admitted': 0, 'queued': 0, 'shed': 0, 'wait_seconds': 0.0}
+
+    # -- bookkeeping (callers hold self._cond) ---------------------------------------
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        return max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+
+    def _backlog_time(self, tokens: int, now: float) -> float:
+        """Expected wait for a new call behind everything already queued"""
+        queued = [ticket for queue in self._queues.values() for ticket in queue]
+        return max(self.requests.backlog_time(len(queued) + 1, now),
+                   self.tokens.backlog_time(sum(t['tokens'] for t in queued) + tokens, now))
+
+    def _shed(self, reason: str, retry_after: float) -> RateLimited:
+        self._counters['shed'] += 1
+        retry_after = max(1, math.ceil(retry_after))
+        return RateLimited(f"LLM rate limit: {reason}, retry in {retry_after}s", retry_after)
+
+    def _admit(self, tokens: int, waited: float) -> None:
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self._counters['admitted'] += 1
+        self._counters['wait_seconds'] += waited
+
+    def _remove(self, ticket: Dict[str, Any]) -> None:
+        queue = self._queues.get(ticket['user'])
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            self._waiting -= 1
+            if not queue:
+                del self._queues[ticket['user']]
+            else:
+                # The user had its turn (or gave it up); the next user goes first
+                self._queues.move_to_end(ticket['user'])
+            self._cond.notify_all()
+
+    def _enqueue(self, tokens: int, user: str, max_wait: float, now: float) -> Optional[Dict[str, Any]]:
+        """Admit right away (None), queue (returns the ticket) or raise RateLimited"""
+        if not self._waiting and self._wait_time(tokens, now) == 0:
+            self._admit(tokens, 0.0)
+            return None
+        if self._waiting >= self.queue_size:
+            raise self._shed("queue full", self._backlog_time(tokens, now))
+        if len(self._queues.get(user, ())) >= self.per_user_queue:
+            raise self._shed("too many calls waiting for this user", self._backlog_time(tokens, now))
+        expected = self._backlog_time(tokens, now)
+        if expected > max_wait:
+            raise self._shed("expected wait too long", expected)
+        ticket = {'user': user, 'tokens': tokens, 'enqueued': now, 'deadline': now + max_wait}
+        self._queues.setdefault(user, deque()).append(ticket)
+        self._waiting += 1
+        self._counters['queued'] += 1
+        return ticket
+
+    def _poll(self, ticket: Dict[str, Any], now: float) -> Optional[float]:
+        """
+        Admit the ticket if it's its turn and there's capacity (returns 0), else
+        the seconds to wait before polling again (None: not its turn yet)
+        """
+        if now >= ticket['deadline']:
+            self._remove(ticket)
+            raise self._shed("timed out waiting for capacity", self._backlog_time(ticket['tokens'], now))
+        first_user = next(iter(self._queues))
+        if self._queues[first_user][0] is not ticket:
+            return None
+        wait = self._wait_time(ticket['tokens'], now)
+        if wait == 0:
+            self._remove(ticket)
+            self._admit(ticket['tokens'], now - ticket['enqueued'])
+            return 0.0
+        return wait
+
+    # -- public API ----------------------------------------------------------------
+
+    def check(self, user: Optional[str] = None) -> None:
+        """Raise RateLimited if a call from `user` would be shed right now (nothing is reserved)"""
+        user = user or current_user.get()
+        with self._cond:
+            now = time.monotonic()
+            if self._waiting >= self.queue_size or len(self._queues.get(user, ())) >= self.per_user_queue:
+                raise self._shed("queue full", self._backlog_time(0, now))
+            expected = self._backlog_time(0, now)
+            if expected > self.max_wait:
+                raise self._shed("expected wait too long", expected)
+
+    def acquire(self, tokens: int, user: Optional[str] = None, timeout: Optional[float] = None) -> float:
+        """
+        Wait (blocking) until a call of `tokens` tokens may go out.
+
+        Args:
+            tokens: Estimated tokens of the call (see estimate_call_tokens)
+            user: Whose turn it is in the queue (default: current_user)
+            timeout: Longest acceptable wait (capped by GROQ_QUEUE_TIMEOUT)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimited: when the call is shed
+        """
+        user = user or current_user.get()
+        max_wait = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        with self._cond:
+            start = time.monotonic()
+            ticket = self._enqueue(tokens, user, max_wait, start)
+            if ticket is None:
+                return 0.0
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._poll(ticket, now)
+                    if wait == 0:
+                        return now - start
+                    remaining = ticket['deadline'] - now
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            finally:
+                self._remove(ticket)
+
+    async def acquire_async(self, tokens: int, user: Optional[str] = None, timeout: Optional[float] = None) -> float:
+        """acquire() for coroutines: waits with asyncio.sleep instead of blocking the event loop"""
+        user = user or current_user.get()
+        max_wait = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        with self._cond:
+            start = time.monotonic()
+            ticket = self._enqueue(tokens, user, max_wait, start)
+        if ticket is None:
+            return 0.0
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    wait = self._poll(ticket, now)
+                    remaining = ticket['deadline'] - now
+                if wait == 0:
+                    return now - start
+                await asyncio.sleep(min(remaining, _ASYNC_POLL_SECONDS if wait is None else wait))
+        finally:
+            with self._cond:
+                self._remove(ticket)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """
+        Correct the token bucket once the call is over.
+
+        `actual_tokens` is the call's real usage; 0 refunds the whole estimate
+        (the call failed before using any), None keeps it (usage unknown, e.g.
+        a stream that was closed early).
+        """
+        if actual_tokens is None:
+            return
+        with self._cond:
+            self.tokens.give_back(estimated_tokens - actual_tokens)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            counters = dict(self._counters)
+            waiting = self._waiting
+        waited = counters.pop('wait_seconds')
+        return dict(counters, waiting=waiting, limits=dict(self.limits),
+                    avg_wait_ms=round(waited / counters['admitted'] * 1000, 1) if counters['admitted'] else 0.0)
+
+
+def rate_limited_response(error: RateLimited, **body):
+    """JSON 429 reply with Retry-After for a shed chat request (Flask)"""
+    from flask import jsonify
+    response = jsonify(dict({
+        'error': 'rate_limited',
+        'response': f"I'm getting a lot of requests right now. Please try again in {error.retry_after} seconds.",
+        'retry_after': error.retry_after
+    }, **body))
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+# Process-wide limiter shared by every Groq call
+rate_limiter = RateLimiter()
@@ -1,15 +1,20 @@
 import chainlit as cl
 import os
 from dotenv import load_dotenv
-import groq
 import json
 import uuid
+import asyncio
+from llm_parallel import call_with_deadline, CHAT_DEADLINE, ROADMAP_DEADLINE
+from model_router import router
+from roadmap_patch import parse_roadmap_json
+from context_manager import context_manager
+from rate_limiter import set_current_user
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Groq client
-client = groq.Client(api_key=os.getenv("GROQ_API_KEY"))
+# Groq calls go through the shared async client (llm_client.async_chat_completion,
+# via model_router) so a slow completion never blocks the event loop for other sessions
 
 @cl.on_chat_start
 async def on_chat_start():
@@ -67,8 +72,9 @@ async def display_roadmap(highlight_nodes=None):
     """Display the roadmap visualization"""
     roadmap = cl.user_session.get("roadmap")
     
-    # Create HTML for the roadmap
-    html_content = f"""
+    # Create HTML for the roadmap (placeholders are filled in below; this is not
+    # an f-string because the embedded JS is full of braces)
+    html_content = """
     <div id="roadmap-container" style="height:500px; background: #161B22; border-radius:8px; overflow:hidden; position:relative;">
         <svg id="roadmap-svg" width="100%" height="100%"></svg>
         <div id="node-details" style="position:absolute; bottom:0; left:0; right:0; background:rgba(22,27,34,0.9); padding:20px; border-top:1px solid #30363d; transform:translateY(100%); transition:transform 0.3s ease; max-height:50%; overflow-y:auto;">
@@ -388,33 +394,20 @@ async def analyze_user_message(message_text, current_roadmap):
     """
     
     try:
-        # Call the LLM to analyze and update the roadmap
-        response = client.chat.completions.create(
+        # Call the LLM to analyze and update the roadmap (small model first; a
+        # reply that isn't a valid roadmap is retried on the large one)
+        response, updated_roadmap = await router.acomplete_parsed(
+            'roadmap_json',
+            parse_roadmap_json,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
-            model="llama-3.3-70b-versatile",
             temperature=0.5,
-            max_tokens=2500
+            max_tokens=2500,
+            timeout=ROADMAP_DEADLINE
         )
         
-        # Parse the response
-        llm_response = response.choices[0].message.content
-        
-        # Extract JSON (it might be in a code block)
-        json_text = llm_response
-        
-        if "```json" in llm_response:
-            json_text = llm_response.split("```json")[1].split("```")[0].strip()
-        elif "```" in llm_response:
-            json_text = llm_response.split("```")[1].split("```")[0].strip()
-    except Exception as e:
-        print(f"Error processing LLM response: {str(e)}")
-        return current_roadmap, []
-            
-        updated_roadmap = json.loads(json_text)
-        
         # Identify new nodes
         new_node_ids = [node["id"] for node in updated_roadmap["nodes"] if node["id"] not in current_node_ids]
         
@@ -425,11 +418,25 @@ async def analyze_user_message(message_text, current_roadmap):
         # Return original roadmap if there's an error
         return current_roadmap, []
 
+async def generate_chat_reply(llm_messages):
+    """Get the assistant's chat reply for the conversation so far"""
+    response = await router.acomplete(
+        'chat',
+        messages=llm_messages,
+        temperature=0.7,
+        max_tokens=800,
+        timeout=CHAT_DEADLINE
+    )
+    return response.choices[0].message.content
+
 @cl.on_message
 async def on_message(message: cl.Message):
     # Get message text
     message_text = message.content
     
+    # LLM calls wait for rate limiter capacity in a queue shared fairly between sessions
+    set_current_user(cl.user_session.get("id"))
+    
     # Get current session data
     history = cl.user_session.get("history", [])
     system_prompt = cl.user_session.get("system_prompt", "You are a helpful career advisor.")
@@ -438,41 +445,36 @@ async def on_message(message: cl.Message):
     # Add user message to history
     history.append({"role": "user", "content": message_text})
     
-    # Update the roadmap based on user message
-    updated_roadmap, new_nodes = await analyze_user_message(message_text, roadmap)
-    
-    # Update the session roadmap
-    cl.user_session.set("roadmap", updated_roadmap)
-    
     # Send LLM response to user
     try:
         # Show typing indicator
         await cl.Message(content="").send()
         
-        # Prepare messages for LLM
-        llm_messages = [
-            {"role": "system", "content": system_prompt}
-        ] + history
-        
-        # Add roadmap context if there are new nodes
-        if new_nodes:
-            new_node_labels = [
-                node["label"] for node in updated_roadmap["nodes"] 
-                if node["id"] in new_nodes
-            ]
-            roadmap_context = f"I've updated your career roadmap with the following topics: {', '.join(new_node_labels)}. You can click on them for more details."
-            llm_messages.append({"role": "system", "content": f"Context: {roadmap_context}"})
+        # Prepare messages for LLM, packed into the token budget (older turns
+        # are summarized; an LLM summary would block, so it runs off the event loop)
+        context_state = cl.user_session.get("context") or {}
+        llm_messages = await asyncio.to_thread(
+            context_manager.pack, history, context_state,
+            system=[{"role": "system", "content": system_prompt}], reserve=800
+        )
+        cl.user_session.set("context", context_state)
         
-        # Get response from LLM
-        response = client.chat.completions.create(
-            messages=llm_messages,
-            model="llama-3.3-70b-versatile",
-            temperature=0.7,
-            max_tokens=800
+        # The roadmap update and the chat reply are independent, so run them
+        # concurrently. If Chainlit cancels this handler (the user stopped the
+        # run or disconnected), gather cancels both calls.
+        (updated_roadmap, new_nodes), ai_response = await asyncio.gather(
+            call_with_deadline(
+                analyze_user_message(message_text, roadmap),
+                ROADMAP_DEADLINE, 'roadmap', default=(roadmap, [])
+            ),
+            call_with_deadline(generate_chat_reply(llm_messages), CHAT_DEADLINE, 'chat', default=None)
         )
         
-        # Extract the response
-        ai_response = response.choices[0].message.content
+        # Update the session roadmap
+        cl.user_session.set("roadmap", updated_roadmap)
+        
+        if ai_response is None:
+            raise RuntimeError("the AI service is unavailable right now")
         
         # Add assistant message to history
         history.append({"role": "assistant", "content": ai_response})
@@ -1,12 +1,24 @@
 import os
+import re
 import json
-import uuid
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional
+from lru import LRUCache
 from roadmap_parser import RoadmapParser
+from roadmap_pack import PackError, RoadmapPack
+from roadmap_ids import stable_node_id
+from singleflight import SingleFlight
+
+# Roadmap names as used in the cache and the developer-roadmap repo
+_ROADMAP_NAME_RE = re.compile(r'^[a-z0-9][a-z0-9-]*$')
+_MARKDOWN_LINK_RE = re.compile(r'\]\((https?://[^)\s]+)\)')
+MAX_PAGE_SIZE = 50
+# Most related nodes whose content one details request prefetches
+MAX_CONTENT_PREFETCH = 20
 
 class RoadmapNode:
     """Node class for the roadmap visualization, similar to your existing implementation"""
-    def __init__(self, id: str, title: str, node_type: str, content: str = "", resources: List[str] = None, parent_id: Optional[str] = None):
+    def __init__(self, id: str, title: str, node_type: str, content: str = "", resources: List[str] = None, parent_id: Optional[str] = None,
+                 roadmap: Optional[str] = None, child_count: Optional[int] = None):
         self.id = id
         self.title = title
         self.node_type = node_type
@@ -14,9 +26,13 @@ class RoadmapNode:
         self.resources = resources or []
         self.parent_id = parent_id
         self.children = []
+        # Nodes taken from a developer roadmap: which one, and how many children
+        # the node has there (more than `children` when the tree was trimmed)
+        self.roadmap = roadmap
+        self.child_count = child_count
     
     def to_dict(self):
-        return {
+        data = {
             'id': self.id,
             'title': self.title,
             'type': self.node_type,
@@ -24,19 +40,30 @@ class RoadmapNode:
             'resources': self.resources,
             'children': [child.to_dict() for child in self.children]
         }
+        if self.roadmap is not None:
+            data['roadmap'] = self.roadmap
+            data['child_count'] = self.child_count
+            if self.child_count > len(self.children):
+                # Cursor for GET /api/roadmap/node/<id>/children
+                data['next_cursor'] = str(len(self.children))
+        return data
     
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]):
+    def from_dict(cls, data: Dict[str, Any], path: tuple = ()):
+        """Build a node tree from dicts; nodes without an ID get one derived from their title path"""
+        title = data.get('title', '')
         node = cls(
-            id=data.get('id', str(uuid.uuid4())),
-            title=data.get('title', ''),
+            id=data.get('id') or stable_node_id(data.get('roadmap') or '', path, title),
+            title=title,
             node_type=data.get('type', 'TOPIC'),
             content=data.get('content', ''),
-            resources=data.get('resources', [])
+            resources=list(data.get('resources', [])),
+            roadmap=data.get('roadmap'),
+            child_count=data.get('child_count')
         )
         
         for child_data in data.get('children', []):
-            child_node = cls.from_dict(child_data)
+            child_node = cls.from_dict(child_data, path + (title,))
             node.add_child(child_node)
         
         return node
@@ -62,8 +89,16 @@ class RoadmapGenerator:
     by matching them with relevant roadmaps from the repository
     """
     
-    def __init__(self, cache_dir: str = 'roadmap_cache'):
+    def __init__(self, cache_dir: str = 'roadmap_cache', memo_entries: Optional[int] = None):
         self.parser = RoadmapParser(cache_dir=cache_dir)
+        # Converted, depth-trimmed subtrees keyed on
+        # (roadmap, max_depth, child_limit, version of the cached JSON); a new
+        # version on disk means a new key, and stale entries age out of the LRU
+        self.subtree_cache = LRUCache(max_entries=memo_entries or int(os.getenv('ROADMAP_MEMO_MAX_ENTRIES', 64)))
+        # Concurrent misses for the same memo entry share one conversion
+        self.flights = SingleFlight('roadmap_generator')
+        # Children per page of get_children_page
+        self.page_size = int(os.getenv('ROADMAP_PAGE_SIZE', 5))
         self.roadmap_keywords = {
             'ai': ['ai-agents', 'ai-engineer', 'prompt-engineering'],
             'web development': ['frontend', 'backend', 'javascript', 'react', 'nodejs'],
@@ -109,26 +144,32 @@ class RoadmapGenerator:
         # Match interests to roadmaps
         matched_roadmaps = self.match_interests_to_roadmaps(interests)
         
+        # Limit to top 3 to avoid overwhelming; download the uncached ones concurrently
+        selected_roadmaps = matched_roadmaps[:3]
+        failed = self.parser.prefetch_roadmaps(selected_roadmaps)
+        
         # For each matched roadmap, integrate it into our roadmap
-        for roadmap_name in matched_roadmaps[:3]:  # Limit to top 3 to avoid overwhelming
+        for roadmap_name in selected_roadmaps:
+            if roadmap_name in failed:
+                continue
             try:
-                # Convert JSON to our node structure
-                roadmap_data = self.parser.convert_to_roadmap_nodes(roadmap_name)
+                # Converted, trimmed top-level subtrees (memoized)
+                subtrees = self.get_trimmed_subtrees(roadmap_name)
                 
-                # Create a category node for this roadmap
+                # Create a category node for this roadmap (same ID every time, so
+                # merges into an existing roadmap recognize it)
+                category_title = self.parser._format_roadmap_title(roadmap_name)
                 category_node = RoadmapNode(
-                    id=str(uuid.uuid4()),
-                    title=self.parser._format_roadmap_title(roadmap_name),
+                    id=stable_node_id(roadmap_name, [root_node.title], category_title, prefix='category'),
+                    title=category_title,
                     node_type="CATEGORY",
-                    content=f"Learning path for {self.parser._format_roadmap_title(roadmap_name)}"
+                    content=f"Learning path for {category_title}"
                 )
                 
                 # Add the roadmap's root children to our category
-                for child in roadmap_data.get('children', []):
-                    # Convert dict to RoadmapNode
-                    child_node = self._dict_to_node(child)
-                    if child_node:
-                        category_node.add_child(child_node)
+                for child in subtrees:
+                    # Fresh nodes per call, so callers can't mutate the memoized trees
+                    category_node.add_child(RoadmapNode.from_dict(child))
                 
                 # Add this category to our root
                 root_node.add_child(category_node)
@@ -141,23 +182,212 @@ class RoadmapGenerator:
         # Return the roadmap as a dictionary
         return root_node.to_dict()
     
-    def _dict_to_node(self, node_dict: Dict[str, Any], max_depth: int = 2, current_depth: int = 0) -> Optional[RoadmapNode]:
-        """Convert a dictionary structure to RoadmapNode, with depth limiting"""
+    def get_trimmed_subtrees(self, roadmap_name: str, max_depth: int = 2, child_limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Top-level subtrees of a roadmap, trimmed to `max_depth` levels and
+        `child_limit` children per node, as plain dicts.
+        
+        Memoized per version of the roadmap JSON in the disk cache, so repeat
+        calls skip reading, parsing and converting the roadmap; concurrent
+        misses share one conversion.
+        """
+        version = self.parser.source_version(roadmap_name)
+        if version is not None:
+            subtrees = self.subtree_cache.get((roadmap_name, max_depth, child_limit, version))
+            if subtrees is not None:
+                return subtrees
+        return self.flights.do((roadmap_name, max_depth, child_limit), self._build_trimmed_subtrees,
+                               roadmap_name, max_depth, child_limit)
+    
+    def _build_trimmed_subtrees(self, roadmap_name: str, max_depth: int, child_limit: int) -> List[Dict[str, Any]]:
+        # Convert JSON to our node structure (fetches and caches it if needed)
+        roadmap_data = self.parser.convert_to_roadmap_nodes(roadmap_name, max_depth, child_limit)
+        subtrees = []
+        for child in roadmap_data.get('children', []):
+            child_node = self._dict_to_node(child, max_depth, child_limit=child_limit, roadmap=roadmap_name)
+            if child_node:
+                subtrees.append(child_node.to_dict())
+        
+        version = self.parser.source_version(roadmap_name)
+        if version is not None:
+            self.subtree_cache.set((roadmap_name, max_depth, child_limit, version), subtrees)
+        return subtrees
+    
+    def get_children_page(self, roadmap_name: str, node_id: str, cursor: Optional[str] = None,
+                          limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        One page of a developer-roadmap node's children, for expanding a
+        trimmed roadmap on demand. Children come without their own children
+        but with `child_count`/`next_cursor`, so each can be expanded in turn.
+        
+        Args:
+            cursor: `next_cursor` from a node or a previous page (default: first page)
+            limit: Children per page (default ROADMAP_PAGE_SIZE, at most MAX_PAGE_SIZE)
+        
+        Returns:
+            {'roadmap', 'node_id', 'children', 'total', 'next_cursor'}, or None
+            if the roadmap isn't cached or has no such node
+        
+        Raises:
+            ValueError: On a malformed roadmap name or cursor
+        """
+        self._check_roadmap_name(roadmap_name)
+        try:
+            offset = int(cursor) if cursor else 0
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        if offset < 0:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        limit = max(1, min(limit or self.page_size, MAX_PAGE_SIZE))
+        
+        # Only roadmaps already in the cache; expanding never triggers a download
+        if self.parser.source_version(roadmap_name) is None:
+            return None
+        children = self._child_nodes(roadmap_name, node_id)
+        if children is None:
+            return None
+        
+        page = [self._dict_to_node(child, max_depth=0, roadmap=roadmap_name).to_dict()
+                for child in children[offset:offset + limit]]
+        end = offset + len(page)
+        return {
+            'roadmap': roadmap_name,
+            'node_id': node_id,
+            'children': page,
+            'total': len(children),
+            'next_cursor': str(end) if end < len(children) else None
+        }
+    
+    def get_node_details(self, roadmap_name: str, node_id: str, prefetch_ids: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+        """
+        Full content of a developer-roadmap node, resolved when the node is
+        opened rather than when the roadmap is built.
+        
+        Args:
+            prefetch_ids: Related nodes the user may open next (e.g. the visible
+                siblings); their content is fetched into the disk cache in the
+                background, while this node's content is being resolved
+        
+        Returns:
+            {'roadmap', 'node_id', 'title', 'content', 'has_content_file',
+            'resources'}, or None if the roadmap isn't cached or has no such node
+        
+        Raises:
+            ValueError: On a malformed roadmap name
+        """
+        self._check_roadmap_name(roadmap_name)
+        if self.parser.source_version(roadmap_name) is None:
+            return None
+        node = self._find_node(roadmap_name, node_id)
+        if node is None:
+            return None
+        
+        related = []
+        for related_id in list(dict.fromkeys(prefetch_ids))[:MAX_CONTENT_PREFETCH]:
+            related_node = self._find_node(roadmap_name, related_id) if related_id != node_id else None
+            if related_node is not None:
+                related.append((related_node['id'], related_node['title']))
+        self.parser.prefetch_node_content(roadmap_name, related)
+        
+        try:
+            content = self.parser.fetch_node_content(roadmap_name, node['id'], node['title'])
+        except Exception as e:
+            print(f"⚠️ Could not fetch content of {roadmap_name}/{node_id}: {e}")
+            content = None
+        return {
+            'roadmap': roadmap_name,
+            'node_id': node['id'],
+            'title': node['title'],
+            'content': content if content is not None else node['content'],
+            'has_content_file': content is not None,
+            'resources': list(dict.fromkeys(_MARKDOWN_LINK_RE.findall(content or '')))
+        }
+    
+    @staticmethod
+    def _check_roadmap_name(roadmap_name: str) -> None:
+        if not _ROADMAP_NAME_RE.match(roadmap_name):
+            raise ValueError(f"Invalid roadmap name: {roadmap_name!r}")
+    
+    def _pack(self, roadmap_name: str) -> Optional[RoadmapPack]:
+        """The roadmap's pack, or None when packs are off or unavailable (callers then use the JSON)"""
+        if not self.parser.use_packs:
+            return None
+        try:
+            return self.parser.load_pack(roadmap_name)
+        except (PackError, OSError) as e:
+            print(f"⚠️ Packed cache unavailable for {roadmap_name}, using JSON: {e}")
+            return None
+    
+    @staticmethod
+    def _shallow(node: Dict[str, Any]) -> Dict[str, Any]:
+        """A converted node without its children, but with their count (like RoadmapPack.node)"""
+        return dict({key: value for key, value in node.items() if key != 'children'}, child_count=len(node['children']))
+    
+    def _find_node(self, roadmap_name: str, node_id: str) -> Optional[Dict[str, Any]]:
+        """A node of the cached roadmap (without its children), or None"""
+        pack = self._pack(roadmap_name)
+        if pack is not None:
+            index = pack.find(node_id)
+            return None if index is None else pack.node(index)
+        node = self._node_index(roadmap_name).get(node_id)
+        return None if node is None else self._shallow(node)
+    
+    def _child_nodes(self, roadmap_name: str, node_id: str) -> Optional[List[Dict[str, Any]]]:
+        """All children of a node (without their own children, with `child_count`), or None if there's no such node"""
+        pack = self._pack(roadmap_name)
+        if pack is not None:
+            index = pack.find(node_id)
+            return None if index is None else [pack.node(i) for i in pack.children(index)]
+        node = self._node_index(roadmap_name).get(node_id)
+        return None if node is None else [self._shallow(child) for child in node['children']]
+    
+    def _node_index(self, roadmap_name: str) -> Dict[str, Dict[str, Any]]:
+        """Every node of the fully converted roadmap by id (memoized like the trimmed subtrees)"""
+        key = (roadmap_name, 'index', self.parser.source_version(roadmap_name))
+        index = self.subtree_cache.get(key)
+        if index is None:
+            index = self.flights.do(key, self._build_node_index, roadmap_name, key)
+        return index
+    
+    def _build_node_index(self, roadmap_name: str, key: tuple) -> Dict[str, Dict[str, Any]]:
+        index = {}
+        stack = list(self.parser.convert_to_roadmap_nodes(roadmap_name).get('children', []))
+        while stack:
+            node = stack.pop()
+            if node['id'] not in index:
+                index[node['id']] = node
+                stack.extend(node['children'])
+        self.subtree_cache.set(key, index)
+        return index
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the parsed-roadmap memo"""
+        return self.subtree_cache.stats()
+    
+    def _dict_to_node(self, node_dict: Dict[str, Any], max_depth: int = 2, current_depth: int = 0, child_limit: int = 5,
+                      roadmap: Optional[str] = None) -> Optional[RoadmapNode]:
+        """
+        Convert a dictionary structure to RoadmapNode, with depth limiting.
+        With `roadmap` set, nodes record their full child count so the trimmed
+        parts can be fetched later (get_children_page).
+        """
         if current_depth > max_depth:
             # Limit depth to prevent overly complex roadmaps
             return None
         
         node = RoadmapNode(
-            id=node_dict.get('id', str(uuid.uuid4())),
+            id=node_dict.get('id') or stable_node_id(roadmap or '', [str(current_depth)], node_dict.get('title', 'Unknown')),
             title=node_dict.get('title', 'Unknown'),
             node_type=node_dict.get('node_type', 'TOPIC'),
             content=node_dict.get('content', ''),
-            resources=node_dict.get('resources', [])
+            resources=node_dict.get('resources', []),
+            roadmap=roadmap,
+            child_count=node_dict.get('child_count', len(node_dict.get('children', [])))
         )
         
         # Process children up to the max depth
-        for child_dict in node_dict.get('children', [])[:5]:  # Limit children per node
-            child_node = self._dict_to_node(child_dict, max_depth, current_depth + 1)
+        for child_dict in node_dict.get('children', [])[:child_limit]:  # Limit children per node
+            child_node = self._dict_to_node(child_dict, max_depth, current_depth + 1, child_limit, roadmap)
             if child_node:
                 node.add_child(child_node)
         
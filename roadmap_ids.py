@@ -0,0 +1,41 @@
+"""
+Deterministic roadmap node IDs and roadmap ETags.
+
+Node IDs are content-addressed: they're derived from the roadmap a node
+belongs to, its path from the root and its title. Generating the same
+roadmap twice therefore gives the same IDs, so identical requests produce
+byte-identical trees that can be memoized, deduplicated by ID when merged,
+and served with an ETag.
+
+Usage:
+    stable_node_id('agentic-ai', ['AI Engineering', 'Agentic AI'], 'Agent Frameworks', prefix='agent_frameworks')
+    # -> 'agent_frameworks_3f1c9a0d2b7e'
+"""
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, Iterable, Optional
+
+
+def stable_node_id(roadmap: str, path: Iterable[str], title: str, prefix: Optional[str] = None) -> str:
+    """
+    ID for a node titled `title` under `path` (the titles or IDs of its
+    ancestors) in `roadmap`. The readable prefix defaults to the title
+    in snake case.
+    """
+    key = json.dumps([roadmap, list(path), title], separators=(',', ':'))
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]
+    if prefix is None:
+        prefix = re.sub(r'[^a-z0-9]+', '_', title.lower()).strip('_') or 'node'
+    return f"{prefix}_{digest}"
+
+
+def canonical_json(roadmap: Dict[str, Any]) -> str:
+    """Byte-stable serialization of a roadmap (sorted keys, no whitespace)"""
+    return json.dumps(roadmap, sort_keys=True, separators=(',', ':'))
+
+
+def roadmap_etag(roadmap: Dict[str, Any]) -> str:
+    """Strong ETag value (unquoted) for a roadmap's canonical JSON"""
+    return hashlib.sha256(canonical_json(roadmap).encode('utf-8')).hexdigest()[:32]
@@ -0,0 +1,188 @@
+"""
+Offline bulk import of the developer-roadmap dataset.
+
+Reads a local checkout or tarball of kamranahmedse/developer-roadmap,
+discovers every roadmap (`<name>/<name>.json`) and its content files
+(`<name>/content/*.md`), converts them in parallel worker processes and
+fills the roadmap cache in one pass: the JSON with its `.meta` sidecar and a
+`.pack` holding the converted tree and the content files. A `manifest.json`
+listing the imported roadmaps is written to the cache and is what
+RoadmapParser.fetch_all_available_roadmaps reports from then on.
+
+    python roadmap_import.py developer-roadmap-master.tar.gz
+    python roadmap_import.py ~/src/developer-roadmap --cache-dir roadmap_cache --workers 8
+
+Imported entries are revalidated against ROADMAP_BASE_URL once they are
+older than their max age; with no network access the cached copy keeps being
+served, so pass a long `--max-age` to skip those attempts.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tarfile
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from roadmap_parser import MANIFEST_FILE, RoadmapParser, _atomic_write
+
+# Where the roadmaps live inside the developer-roadmap repository
+ROADMAPS_SUBDIR = os.path.join('src', 'data', 'roadmaps')
+
+_ROADMAP_MEMBER_RE = re.compile(r'(?:^|/)([^/]+)/(?:\1\.json|content/[^/]+\.md)$')
+
+_worker_parser: Optional[RoadmapParser] = None
+
+
+def extract_archive(archive_path: str, target_dir: str) -> str:
+    """Extract only the roadmap JSON and content files of a tarball; returns `target_dir`"""
+    with tarfile.open(archive_path) as archive:
+        members = [m for m in archive.getmembers() if m.isfile() and _ROADMAP_MEMBER_RE.search(m.name)]
+        if hasattr(tarfile, 'data_filter'):
+            archive.extractall(target_dir, members=members, filter='data')
+        else:
+            archive.extractall(target_dir, members=members)
+    return target_dir
+
+
+def find_roadmaps_root(source_dir: str) -> str:
+    """`src/data/roadmaps` of a checkout (possibly one directory down, as in archives), else `source_dir`"""
+    candidates = [source_dir]
+    candidates.extend(os.path.join(source_dir, entry) for entry in sorted(os.listdir(source_dir)))
+    for candidate in candidates:
+        roadmaps_dir = os.path.join(candidate, ROADMAPS_SUBDIR)
+        if os.path.isdir(roadmaps_dir):
+            return roadmaps_dir
+    return source_dir
+
+
+def discover_roadmaps(roadmaps_root: str) -> Dict[str, Dict[str, Any]]:
+    """{roadmap name: {'json': path, 'content': [content file paths]}} for every roadmap under the root"""
+    roadmaps = {}
+    for name in sorted(os.listdir(roadmaps_root)):
+        json_path = os.path.join(roadmaps_root, name, f"{name}.json")
+        if not os.path.isfile(json_path):
+            continue
+        content_dir = os.path.join(roadmaps_root, name, 'content')
+        content = []
+        if os.path.isdir(content_dir):
+            content = [os.path.join(content_dir, filename) for filename in sorted(os.listdir(content_dir))
+                       if filename.endswith('.md')]
+        roadmaps[name] = {'json': json_path, 'content': content}
+    return roadmaps
+
+
+def _init_worker(cache_dir: str) -> None:
+    global _worker_parser
+    _worker_parser = RoadmapParser(cache_dir=cache_dir)
+
+
+def _import_one(name: str, json_path: str, content_paths: List[str], max_age: Optional[float]) -> Dict[str, Any]:
+    """Convert and cache one roadmap (runs in a worker process)"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        body = f.read()
+    size = len(body.encode('utf-8'))
+    contents = {}
+    for path in content_paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        # Keyed like RoadmapParser.fetch_content_file's file ids (file name without .md)
+        contents[os.path.basename(path)[:-len('.md')]] = text
+        size += len(text.encode('utf-8'))
+    result = _worker_parser.import_roadmap(name, body, contents, max_age=max_age)
+    result.update({'content_files': len(contents), 'bytes': size})
+    return result
+
+
+def import_roadmaps(source: str, cache_dir: str = 'roadmap_cache', workers: Optional[int] = None,
+                    max_age: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Import every roadmap found in a checkout directory or tarball into `cache_dir`.
+
+    Returns:
+        The manifest written to the cache, plus 'failed' ({name: reason})
+        and 'stats' (counts and throughput)
+    """
+    start = time.perf_counter()
+    os.makedirs(cache_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix='roadmap-import-') as scratch:
+        source_dir = source if os.path.isdir(source) else extract_archive(source, scratch)
+        roadmaps = discover_roadmaps(find_roadmaps_root(source_dir))
+        discovered = time.perf_counter()
+        if not roadmaps:
+            raise ValueError(f"No roadmaps (<name>/<name>.json) found in {source}")
+
+        imported, failed = {}, {}
+        workers = workers or min(len(roadmaps), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_dir,)) as executor:
+            futures = {
+                executor.submit(_import_one, name, entry['json'], entry['content'], max_age): name
+                for name, entry in roadmaps.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    imported[name] = future.result()
+                except Exception as e:
+                    failed[name] = str(e)
+                    print(f"⚠️ Could not import roadmap {name}: {e}")
+
+    # Existing entries (e.g. from an earlier partial import) are kept
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    manifest = {'roadmaps': {}}
+    if os.path.exists(manifest_path):
+        manifest = RoadmapParser(cache_dir=cache_dir).read_manifest()
+    for name in roadmaps:
+        if name in imported:
+            manifest['roadmaps'][name] = {
+                'nodes': imported[name]['nodes'],
+                'content_files': imported[name]['content_files'],
+                'sha256': imported[name]['sha256']
+            }
+    manifest['roadmaps'] = dict(sorted(manifest['roadmaps'].items()))
+    manifest.update({'source': os.path.abspath(source), 'imported_at': time.time()})
+    _atomic_write(manifest_path, json.dumps(manifest, indent=2))
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'roadmaps': len(imported),
+        'nodes': sum(r['nodes'] for r in imported.values()),
+        'content_files': sum(r['content_files'] for r in imported.values()),
+        'bytes': sum(r['bytes'] for r in imported.values()),
+        'workers': workers,
+        'discover_seconds': round(discovered - start, 3),
+        'seconds': round(elapsed, 3),
+    }
+    stats['roadmaps_per_second'] = round(stats['roadmaps'] / elapsed, 1)
+    stats['nodes_per_second'] = round(stats['nodes'] / elapsed)
+    stats['mb_per_second'] = round(stats['bytes'] / 1e6 / elapsed, 1)
+    return dict(manifest, failed=failed, stats=stats)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import developer roadmaps from a local checkout or tarball")
+    parser.add_argument('source', help="developer-roadmap checkout directory or .tar/.tar.gz archive")
+    parser.add_argument('--cache-dir', default='roadmap_cache')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('--max-age', type=float, default=None,
+                        help="seconds the imported files stay fresh (default ROADMAP_CACHE_MAX_AGE)")
+    args = parser.parse_args(argv)
+
+    result = import_roadmaps(args.source, args.cache_dir, args.workers, args.max_age)
+    stats = result['stats']
+    print(f"✅ Imported {stats['roadmaps']} roadmaps ({stats['nodes']} nodes, {stats['content_files']} content files, "
+          f"{stats['bytes'] / 1e6:.1f} MB) into {args.cache_dir} in {stats['seconds']:.2f}s "
+          f"with {stats['workers']} workers")
+    print(f"   {stats['roadmaps_per_second']} roadmaps/s, {stats['nodes_per_second']} nodes/s, "
+          f"{stats['mb_per_second']} MB/s (discovery {stats['discover_seconds']:.2f}s)")
+    if result['failed']:
+        print(f"⚠️ {len(result['failed'])} roadmaps failed: {', '.join(sorted(result['failed']))}")
+    return 1 if result['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -52,10 +52,10 @@ def initialize_roadmap_cache():
     """
     try:
         common_roadmaps = ['ai-agents', 'frontend', 'backend', 'python']
-        for roadmap_name in common_roadmaps:
-            print(f"Pre-caching roadmap: {roadmap_name}")
-            roadmap_gen.parser.fetch_roadmap_json(roadmap_name)
-        print("Roadmap cache initialization complete")
+        print(f"Pre-caching roadmaps: {', '.join(common_roadmaps)}")
+        # Fetched concurrently, so a cold boot waits for one round trip rather than four
+        failed = roadmap_gen.parser.prefetch_roadmaps(common_roadmaps)
+        print(f"Roadmap cache initialization complete ({len(common_roadmaps) - len(failed)}/{len(common_roadmaps)} cached)")
     except Exception as e:
         print(f"Error initializing roadmap cache: {str(e)}")
 
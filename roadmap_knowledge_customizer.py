@@ -4,10 +4,22 @@ to provide a personalized learning experience.
 """
 
 import os
-import json
-import uuid
 from typing import Dict, Any, List, Optional
 
+from keyword_matcher import node_title_matcher
+from lru import LRUCache
+from roadmap_ids import stable_node_id, roadmap_etag
+from roadmap_overlay import apply_overlay, freeze
+
+# Scope of the IDs of the hand-written agentic AI nodes
+AGENTIC_AI_ROADMAP = 'agentic-ai'
+
+KNOWLEDGE_LEVELS = ('beginner', 'intermediate', 'advanced')
+
+# Customized roadmaps by (input ETag, interests, level); the output is a pure
+# function of those, so repeat turns skip the rebuild
+_customized = LRUCache(max_entries=int(os.getenv('ROADMAP_CUSTOMIZED_MAX_ENTRIES', 256)))
+
 def update_roadmap_with_knowledge_level(
     current_roadmap: Dict[str, Any], 
     interests: List[str],
@@ -18,6 +30,10 @@ def update_roadmap_with_knowledge_level(
     Different content will be shown or highlighted based on beginner,
     intermediate, or advanced levels.
     
+    The result is read-only and shared: agentic AI roadmaps are the
+    precomputed level templates, other roadmaps are the input with a
+    level overlay applied. Copy it before modifying it.
+    
     Args:
         current_roadmap: The current roadmap structure
         interests: List of user interests
@@ -27,24 +43,36 @@ def update_roadmap_with_knowledge_level(
         Updated roadmap structure with customized content
     """
     # Check if we have a valid knowledge level
-    if knowledge_level not in ['beginner', 'intermediate', 'advanced']:
+    if knowledge_level not in KNOWLEDGE_LEVELS:
         # Default to beginner if not specified
         knowledge_level = 'beginner'
     
-    # Special case: For agentic AI, generate a complete custom roadmap
-    has_agentic_ai_interest = any(
-        interest.lower() in ['agentic-ai', 'agentic ai']
-        for interest in interests
-    )
+    # Special case: For agentic AI, serve the level's template
+    if _has_agentic_ai_interest(interests):
+        return AGENTIC_AI_TEMPLATES[knowledge_level]
     
-    if has_agentic_ai_interest:
+    key = (roadmap_etag(current_roadmap), tuple(interests), knowledge_level)
+    cached = _customized.get(key)
+    if cached is None:
+        cached = _customize_roadmap(current_roadmap, interests, knowledge_level)
+        _customized.set(key, cached)
+    return cached
+
+def _has_agentic_ai_interest(interests: List[str]) -> bool:
+    return any(interest.lower() in ['agentic-ai', 'agentic ai'] for interest in interests)
+
+def _customize_roadmap(current_roadmap: Dict[str, Any], interests: List[str], knowledge_level: str) -> Dict[str, Any]:
+    """update_roadmap_with_knowledge_level without the templates and the memo"""
+    # Special case: For agentic AI, generate a complete custom roadmap
+    if _has_agentic_ai_interest(interests):
         print(f"Generating dedicated agentic AI roadmap for knowledge level: {knowledge_level}")
         # Generate a completely new roadmap specifically for agentic AI
-        return generate_agentic_ai_roadmap(knowledge_level)
+        return freeze(generate_agentic_ai_roadmap(knowledge_level))
     
-    # For other interests, use the standard customization approach
-    # Create a deep copy of the roadmap to avoid modifying the original
-    updated_roadmap = json.loads(json.dumps(current_roadmap))
+    # For other interests, overlay the level's changes on the roadmap;
+    # nodes the overlay doesn't touch are shared, not copied
+    overlay: Dict[str, Dict[str, Any]] = {}
+    additions: Dict[str, List[Dict[str, Any]]] = {}
     
     # Check for general AI interests
     has_ai_interest = any(
@@ -54,61 +82,74 @@ def update_roadmap_with_knowledge_level(
     
     if has_ai_interest:
         # Customize AI roadmap based on knowledge level
-        customize_ai_roadmap_for_level(updated_roadmap, knowledge_level)
+        collect_ai_level_overlay(current_roadmap, knowledge_level, overlay, additions)
     
     # Add a note about the customization
-    if 'content' in updated_roadmap:
+    if 'content' in current_roadmap:
         level_notes = {
             'beginner': "Customized for beginners with foundation-building content",
             'intermediate': "Customized for intermediate users with practical implementation focus",
             'advanced': "Customized for advanced users with cutting-edge techniques"
         }
-        updated_roadmap['content'] += f" - {level_notes.get(knowledge_level, '')}"
+        root_overlay = overlay.setdefault(current_roadmap.get('id'), {})
+        root_overlay['content'] = f"{root_overlay.get('content', current_roadmap['content'])} - {level_notes.get(knowledge_level, '')}"
     
-    return updated_roadmap
+    return apply_overlay(current_roadmap, overlay, additions)
 
-def customize_ai_roadmap_for_level(roadmap_node: Dict[str, Any], knowledge_level: str) -> None:
+def collect_ai_level_overlay(
+    roadmap_node: Dict[str, Any],
+    knowledge_level: str,
+    overlay: Dict[str, Dict[str, Any]],
+    additions: Dict[str, List[Dict[str, Any]]]
+) -> None:
     """
-    Recursively customize AI roadmap nodes based on knowledge level
+    Recursively collect the knowledge level's changes to AI roadmap nodes
+    (the node itself is not modified)
     
     Args:
         roadmap_node: A node in the roadmap (possibly with children)
         knowledge_level: User's knowledge level
+        overlay: Field overrides by node id, filled in
+        additions: Nodes to add by parent id, filled in
     """
     # Process current node based on title/type
-    node_title = roadmap_node.get('title', '').lower()
+    title_terms = node_title_matcher.scan(roadmap_node.get('title', ''))
+    node_id = roadmap_node.get('id')
+    changes: Dict[str, Any] = {}
     
     # Check for AI-related node
-    is_ai_node = any(term in node_title for term in 
-                     ['ai', 'artificial intelligence', 'machine learning', 'agent'])
+    is_ai_node = title_terms.has('title', 'ai')
     
     if is_ai_node:
         # Add indicators based on knowledge level
         if knowledge_level == 'beginner':
-            if 'introduction' in node_title or 'fundamental' in node_title or 'basic' in node_title:
-                roadmap_node['highlight'] = True
-                roadmap_node['priority'] = 'high'
+            if title_terms.has('title', 'foundational'):
+                changes['highlight'] = True
+                changes['priority'] = 'high'
                 
         elif knowledge_level == 'intermediate':
-            if any(term in node_title for term in ['framework', 'implement', 'develop', 'tool']):
-                roadmap_node['highlight'] = True
-                roadmap_node['priority'] = 'high'
+            if title_terms.has('title', 'practical'):
+                changes['highlight'] = True
+                changes['priority'] = 'high'
                 
-            if 'introduction' in node_title or 'basic' in node_title:
-                roadmap_node['priority'] = 'low'
+            if title_terms.has('title', 'foundational'):
+                changes['priority'] = 'low'
                 
         elif knowledge_level == 'advanced':
-            if any(term in node_title for term in ['advanced', 'research', 'cutting-edge', 'system']):
-                roadmap_node['highlight'] = True
-                roadmap_node['priority'] = 'high'
+            if title_terms.has('title', 'research'):
+                changes['highlight'] = True
+                changes['priority'] = 'high'
                 
-            if any(term in node_title for term in ['introduction', 'basic', 'fundamental']):
-                roadmap_node['collapsed'] = True
-                roadmap_node['priority'] = 'low'
+            if title_terms.has('title', 'foundational'):
+                changes['collapsed'] = True
+                changes['priority'] = 'low'
+    
+    if changes:
+        overlay.setdefault(node_id, {}).update(changes)
     
     # Add agentic AI specific nodes for the right knowledge level
-    if 'agent' in node_title:
-        agentic_ai_nodes = create_agentic_ai_nodes_for_level(knowledge_level)
+    if title_terms.has('title', 'agent'):
+        agentic_ai_nodes = create_agentic_ai_nodes_for_level(knowledge_level, parent_id=node_id or '')
         
         # Only add if we have new nodes and this node has children
         if agentic_ai_nodes and 'children' in roadmap_node:
@@ -120,11 +161,11 @@ def customize_ai_roadmap_for_level(roadmap_node: Dict[str, Any], knowledge_level
                     # Mark as newly added
                     new_node['highlight'] = True
                     new_node['new'] = True
-                    roadmap_node['children'].append(new_node)
+                    additions.setdefault(node_id, []).append(new_node)
     
-    # Recursively process children
+    # Recursively process children (added agent nodes are already tailored)
     for child in roadmap_node.get('children', []):
-        customize_ai_roadmap_for_level(child, knowledge_level)
+        collect_ai_level_overlay(child, knowledge_level, overlay, additions)
 
 def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str, Any]:
     """
@@ -137,10 +178,16 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
     Returns:
         A complete roadmap structure focused on agentic AI
     """
+    # IDs depend only on each node's place in this roadmap
+    category_path = ['My Career Roadmap', 'AI Engineering']
+    topic_path = category_path + ['Agentic AI']
+    
+    def topic_id(prefix: str, title: str) -> str:
+        return stable_node_id(AGENTIC_AI_ROADMAP, topic_path, title, prefix=prefix)
+    
     # Create the root node
-    root_id = f"agentic_ai_roadmap_{uuid.uuid4().hex[:8]}"
     roadmap = {
-        'id': root_id,
+        'id': stable_node_id(AGENTIC_AI_ROADMAP, [], 'My Career Roadmap', prefix='agentic_ai_roadmap'),
         'title': 'My Career Roadmap',
         'type': 'ROOT',
         'content': 'Your personalized agentic AI learning journey',
@@ -149,7 +196,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
     
     # Create the main category node
     ai_category = {
-        'id': f"ai_engineering_{uuid.uuid4().hex[:8]}",
+        'id': stable_node_id(AGENTIC_AI_ROADMAP, category_path[:1], 'AI Engineering', prefix='ai_engineering'),
         'title': 'AI Engineering',
         'type': 'CATEGORY',
         'content': 'Artificial Intelligence and ML engineering paths',
@@ -158,7 +205,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
     
     # Create the agentic AI node
     agentic_ai_node = {
-        'id': f"agentic_ai_{uuid.uuid4().hex[:8]}",
+        'id': stable_node_id(AGENTIC_AI_ROADMAP, category_path, 'Agentic AI', prefix='agentic_ai'),
         'title': 'Agentic AI',
         'type': 'TOPIC',
         'content': 'The cutting-edge field of developing autonomous AI agents',
@@ -171,7 +218,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
         # For beginners: focus on fundamentals and concepts
         agentic_ai_node['children'] = [
             {
-                'id': f"ai_agent_basics_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('ai_agent_basics', 'What is an AI Agent?'),
                 'title': 'What is an AI Agent?',
                 'type': 'TOPIC',
                 'content': 'AI agents are autonomous systems that can perceive their environment, make decisions, and take actions to achieve specific goals.',
@@ -180,7 +227,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"llm_basics_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('llm_basics', 'LLM Foundations'),
                 'title': 'LLM Foundations',
                 'type': 'TOPIC',
                 'content': 'Learn how Large Language Models function as the core of modern AI agents.',
@@ -189,7 +236,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"prompt_engineering_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('prompt_engineering', 'Prompt Engineering'),
                 'title': 'Prompt Engineering',
                 'type': 'TOPIC',
                 'content': 'Master the art of crafting effective prompts to guide agent behavior.',
@@ -197,7 +244,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"tools_basics_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('tools_basics', 'Tools and Functions'),
                 'title': 'Tools and Functions',
                 'type': 'TOPIC',
                 'content': 'Introduction to how agents can use tools and call functions.',
@@ -210,7 +257,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
         # For intermediate: focus on frameworks and implementation
         agentic_ai_node['children'] = [
             {
-                'id': f"agent_frameworks_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('agent_frameworks', 'Agent Frameworks'),
                 'title': 'Agent Frameworks',
                 'type': 'TOPIC',
                 'content': 'Explore LangChain, AutoGPT, and other frameworks for building AI agents.',
@@ -219,7 +266,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"tool_integration_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('tool_integration', 'Tool Integration'),
                 'title': 'Tool Integration',
                 'type': 'TOPIC',
                 'content': 'Connect your agents to external tools, APIs, and data sources.',
@@ -228,7 +275,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"agent_memory_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('agent_memory', 'Agent Memory Systems'),
                 'title': 'Agent Memory Systems',
                 'type': 'TOPIC',
                 'content': 'Implement different memory architectures for persistent agent knowledge.',
@@ -237,7 +284,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"rag_systems_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('rag_systems', 'Retrieval-Augmented Generation'),
                 'title': 'Retrieval-Augmented Generation',
                 'type': 'TOPIC',
                 'content': 'Learn to enhance your agents with external knowledge using RAG techniques.',
@@ -245,7 +292,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"vector_embeddings_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('vector_embeddings', 'Vector Embeddings'),
                 'title': 'Vector Embeddings',
                 'type': 'TOPIC',
                 'content': 'Understanding vector embeddings for semantic search and retrieval.',
@@ -258,7 +305,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
         # For advanced: focus on cutting-edge techniques and systems
         agentic_ai_node['children'] = [
             {
-                'id': f"multi_agent_systems_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('multi_agent_systems', 'Multi-Agent Systems'),
                 'title': 'Multi-Agent Systems',
                 'type': 'TOPIC',
                 'content': 'Design and implement systems with multiple collaborating AI agents.',
@@ -267,7 +314,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"reasoning_techniques_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('reasoning_techniques', 'Advanced Reasoning'),
                 'title': 'Advanced Reasoning',
                 'type': 'TOPIC',
                 'content': 'Implement chain-of-thought, tree-of-thought, and other advanced reasoning methods.',
@@ -276,7 +323,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"agent_alignment_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('agent_alignment', 'Agent Alignment & Safety'),
                 'title': 'Agent Alignment & Safety',
                 'type': 'TOPIC',
                 'content': 'Techniques for ensuring agents are aligned with human values and goals.',
@@ -285,7 +332,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"advanced_rag_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('advanced_rag', 'Advanced RAG Architectures'),
                 'title': 'Advanced RAG Architectures',
                 'type': 'TOPIC',
                 'content': 'Cutting-edge retrieval systems like HyDE and multi-vector retrieval.',
@@ -293,7 +340,7 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
                 'children': []
             },
             {
-                'id': f"research_frontiers_{uuid.uuid4().hex[:8]}",
+                'id': topic_id('research_frontiers', 'Research Frontiers'),
                 'title': 'Research Frontiers',
                 'type': 'TOPIC',
                 'content': 'Stay current with the latest research and emerging techniques in agentic AI.',
@@ -309,13 +356,14 @@ def generate_agentic_ai_roadmap(knowledge_level: str = 'beginner') -> Dict[str,
     return roadmap
 
 
-def create_agentic_ai_nodes_for_level(knowledge_level: str) -> List[Dict[str, Any]]:
+def create_agentic_ai_nodes_for_level(knowledge_level: str, parent_id: str = '') -> List[Dict[str, Any]]:
     """
     Create agentic AI-specific nodes based on knowledge level
     This is used to add nodes to an existing roadmap, rather than creating a complete one.
     
     Args:
         knowledge_level: User's knowledge level
+        parent_id: ID of the node they'll be added under (part of their IDs)
         
     Returns:
         List of nodes to add to the roadmap
@@ -325,7 +373,8 @@ def create_agentic_ai_nodes_for_level(knowledge_level: str) -> List[Dict[str, An
     # Common node structure
     def create_node(title, content, node_type='TOPIC'):
         return {
-            'id': f"agentic_{title.lower().replace(' ', '_')}_{uuid.uuid4().hex[:8]}",
+            'id': stable_node_id(AGENTIC_AI_ROADMAP, [parent_id], title,
+                                 prefix=f"agentic_{title.lower().replace(' ', '_')}"),
             'title': title,
             'type': node_type,
             'content': content,
@@ -376,3 +425,9 @@ def create_agentic_ai_nodes_for_level(knowledge_level: str) -> List[Dict[str, An
         ))
     
     return nodes
+
+
+# The per-level agentic AI roadmaps, built once and shared read-only by every session
+AGENTIC_AI_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    level: freeze(generate_agentic_ai_roadmap(level)) for level in KNOWLEDGE_LEVELS
+}
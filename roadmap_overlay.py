@@ -0,0 +1,105 @@
+"""
+Read-only roadmap trees and copy-on-write overlays.
+
+Templates (e.g. the per-level agentic AI roadmaps) are built once and
+frozen, so every session can share the same objects. Per-user changes are
+kept as small overlays - {node id: {field: value}} plus nodes to append
+under a parent - and `apply_overlay` copies only the nodes on the path to
+a changed node; untouched subtrees stay shared with the template.
+
+Frozen nodes are dicts (children are tuples), so they serialize to JSON
+like any other roadmap; copy.deepcopy() (or `thaw`) of a frozen tree gives
+a plain, mutable one (dicts and lists).
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+class FrozenDict(dict):
+    """dict that refuses in-place changes"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("roadmap template nodes are read-only; copy the roadmap before modifying it")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[str, Any]:
+        return thaw(self)
+
+    def __reduce__(self):
+        # Pickles (and unpickles) as a plain dict
+        return dict, (dict(self),)
+
+
+def thaw(node: Any) -> Any:
+    """Mutable copy of a roadmap tree (dicts -> dict, tuples -> lists)"""
+    if isinstance(node, dict):
+        return {key: thaw(value) for key, value in node.items()}
+    if isinstance(node, (list, tuple)):
+        return [thaw(value) for value in node]
+    return node
+
+
+def freeze(node: Any) -> Any:
+    """Read-only copy of a roadmap tree (dicts -> FrozenDict, lists -> tuples)"""
+    if isinstance(node, FrozenDict):
+        return node
+    if isinstance(node, dict):
+        return FrozenDict((key, freeze(value)) for key, value in node.items())
+    if isinstance(node, (list, tuple)):
+        return tuple(freeze(value) for value in node)
+    return node
+
+
+def apply_overlay(
+    node: Dict[str, Any],
+    overlay: Optional[Dict[str, Dict[str, Any]]] = None,
+    additions: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> Dict[str, Any]:
+    """
+    `node` with the overlay applied, sharing every unchanged subtree.
+
+    Args:
+        node: Root of a (frozen) roadmap tree
+        overlay: Field overrides by node id (e.g. highlight, priority, collapsed)
+        additions: Nodes to append to a node's children, by parent id
+
+    Returns:
+        A frozen tree; `node` itself when it is frozen and the overlay
+        touches nothing in it
+    """
+    overlay = overlay or {}
+    additions = additions or {}
+    targets = set(overlay) | set(additions)
+
+    # Mark the nodes on the path to a target (iteratively; trees can be deep)
+    dirty = set()
+    if targets:
+        path: List[Dict[str, Any]] = []
+        stack = [(node, 0)]
+        while stack:
+            current, depth = stack.pop()
+            del path[depth:]
+            path.append(current)
+            if current.get('id') in targets:
+                dirty.update(id(ancestor) for ancestor in path)
+            children = current.get('children')
+            if children:
+                stack.extend((child, depth + 1) for child in children)
+
+    def rebuild(current: Dict[str, Any]) -> Dict[str, Any]:
+        if id(current) not in dirty:
+            return freeze(current)
+        node_id = current.get('id')
+        updated = {key: freeze(value) for key, value in current.items() if key != 'children'}
+        updated.update(freeze(overlay.get(node_id, {})))
+        if 'children' in current or node_id in additions:
+            updated['children'] = (tuple(rebuild(child) for child in current.get('children') or ())
+                                   + freeze(additions.get(node_id, ())))
+        return FrozenDict(updated)
+
+    return rebuild(node)
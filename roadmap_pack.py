@@ -0,0 +1,306 @@
+"""
+Packed binary roadmap cache, read through mmap.
+
+A pack holds one converted roadmap: a fixed-size node table, the child and
+root index arrays, an index of content blobs (cached `.md` files) and one
+UTF-8 string table. It is built once from the roadmap JSON; afterwards
+workers map it read-only, so they share the same page-cache pages and only
+decode the nodes they actually visit (e.g. the first two levels of a
+trimmed roadmap) instead of parsing the whole JSON.
+
+Layout (little-endian):
+    header    magic "RMPK", version, counts, section offsets, source sha256
+    nodes     node_count x (id, title, content string refs; type; children slice)
+    children  u32 node indices, one slice per node
+    roots     u32 node indices
+    contents  content_count x (key ref, blob ref), sorted by key
+    strings   UTF-8 bytes; refs are (offset, length) into this section
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from typing import Any, Dict, List, Optional
+
+MAGIC = b'RMPK'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHHIIIIQQQQQ32s')
+_NODE = struct.Struct('<IIIIIIIIB3x')
+_CONTENT = struct.Struct('<IIII')
+_U32 = struct.Struct('<I')
+
+NODE_TYPES = ('TOPIC', 'CATEGORY', 'ROOT', 'SUBTOPIC', 'RESOURCE')
+
+
+class PackError(ValueError):
+    """Raised when a file isn't a readable roadmap pack"""
+
+
+class _StringTable:
+    """Deduplicating string table builder"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._offsets: Dict[str, tuple] = {}
+
+    def add(self, text: str) -> tuple:
+        ref = self._offsets.get(text)
+        if ref is None:
+            encoded = text.encode('utf-8')
+            ref = (len(self.data), len(encoded))
+            self.data += encoded
+            self._offsets[text] = ref
+        return ref
+
+
+def write_pack(path: str, roots: List[Dict[str, Any]], contents: Optional[Dict[str, str]] = None,
+               source_sha256: str = '') -> int:
+    """
+    Write a pack for a converted roadmap; returns the number of nodes stored.
+
+    Args:
+        roots: Root nodes as built by RoadmapParser.build_roadmap_tree
+            (dicts with id/title/content/node_type/children; shared children
+            are stored once)
+        contents: Content blobs by key (e.g. file id -> markdown)
+        source_sha256: Hex sha256 of the JSON the pack was built from
+    """
+    strings = _StringTable()
+    index_of: Dict[str, int] = {}
+    ordered: List[Dict[str, Any]] = []
+
+    # Number every node once (iteratively; roadmaps can be deep)
+    stack = list(reversed(roots))
+    while stack:
+        node = stack.pop()
+        if node['id'] in index_of:
+            continue
+        index_of[node['id']] = len(ordered)
+        ordered.append(node)
+        stack.extend(reversed(node.get('children', [])))
+
+    node_table = bytearray()
+    children = bytearray()
+    child_count = 0
+    for node in ordered:
+        child_ids = [child['id'] for child in node.get('children', [])]
+        node_type = node.get('node_type', 'TOPIC')
+        node_table += _NODE.pack(
+            *strings.add(node['id']),
+            *strings.add(node.get('title', '')),
+            *strings.add(node.get('content', '')),
+            child_count, len(child_ids),
+            NODE_TYPES.index(node_type) if node_type in NODE_TYPES else 0
+        )
+        for child_id in child_ids:
+            children += _U32.pack(index_of[child_id])
+        child_count += len(child_ids)
+
+    root_table = b''.join(_U32.pack(index_of[node['id']]) for node in roots)
+
+    content_table = bytearray()
+    for key in sorted(contents or {}, key=lambda k: k.encode('utf-8')):
+        content_table += _CONTENT.pack(*strings.add(key), *strings.add(contents[key]))
+
+    nodes_off = _HEADER.size
+    children_off = nodes_off + len(node_table)
+    roots_off = children_off + len(children)
+    contents_off = roots_off + len(root_table)
+    strings_off = contents_off + len(content_table)
+    header = _HEADER.pack(
+        MAGIC, VERSION, 0, len(ordered), child_count, len(roots), len(contents or {}),
+        nodes_off, children_off, roots_off, contents_off, strings_off,
+        bytes.fromhex(source_sha256) if source_sha256 else b'\0' * 32
+    )
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for section in (header, node_table, children, root_table, content_table, strings.data):
+                f.write(section)
+        os.chmod(tmp_path, 0o644)
+        # Readers that already mapped the old pack keep their (unlinked) copy
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(ordered)
+
+
+class RoadmapPack:
+    """Read-only, lazily decoded view of a pack file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file
+                raise PackError(f"{path}: {e}")
+        if len(self._buf) < _HEADER.size:
+            self.close()
+            raise PackError(f"{path}: truncated header")
+        (magic, version, _, self.node_count, self._child_count, self._root_count, self.content_count,
+         self._nodes_off, self._children_off, self._roots_off, self._contents_off, self._strings_off,
+         source) = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise PackError(f"{path}: not a version {VERSION} roadmap pack")
+        if self._strings_off > len(self._buf) or self._nodes_off + self.node_count * _NODE.size > self._children_off:
+            self.close()
+            raise PackError(f"{path}: section table out of range")
+        self.source_sha256 = source.hex() if source.strip(b'\0') else ''
+        self._index_by_id: Optional[Dict[str, int]] = None
+        self._content_by_node: Optional[Dict[str, int]] = None
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_off + offset
+        return self._buf[start:start + length].decode('utf-8')
+
+    def _record(self, index: int) -> tuple:
+        if not 0 <= index < self.node_count:
+            raise IndexError(index)
+        return _NODE.unpack_from(self._buf, self._nodes_off + index * _NODE.size)
+
+    def node(self, index: int) -> Dict[str, Any]:
+        """One node as a dict (without children, but with their count), decoded on demand"""
+        id_off, id_len, title_off, title_len, content_off, content_len, _, child_count, node_type = self._record(index)
+        return {
+            'id': self._string(id_off, id_len),
+            'title': self._string(title_off, title_len),
+            'content': self._string(content_off, content_len),
+            'node_type': NODE_TYPES[node_type] if node_type < len(NODE_TYPES) else 'TOPIC',
+            'resources': [],
+            'child_count': child_count,
+        }
+
+    def find(self, node_id: str) -> Optional[int]:
+        """Index of the node with id `node_id`, or None (the id index is built on first use)"""
+        if self._index_by_id is None:
+            index_by_id = {}
+            for index in range(self.node_count):
+                id_off, id_len = self._record(index)[:2]
+                index_by_id[self._string(id_off, id_len)] = index
+            self._index_by_id = index_by_id
+        return self._index_by_id.get(node_id)
+
+    def children(self, index: int) -> List[int]:
+        first, count = self._record(index)[6:8]
+        start = self._children_off + first * _U32.size
+        return list(struct.unpack_from(f'<{count}I', self._buf, start))
+
+    def roots(self) -> List[int]:
+        return list(struct.unpack_from(f'<{self._root_count}I', self._buf, self._roots_off))
+
+    def to_tree(self, max_depth: Optional[int] = None, child_limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Root nodes with nested children, in the same shape as
+        RoadmapParser.build_roadmap_tree. Only nodes within `max_depth` levels
+        (roots are level 0) and the first `child_limit` children of each node
+        are decoded.
+        """
+        # Untrimmed trees share nodes reached from several parents, like the
+        # JSON conversion; trimmed ones are small, so copies are fine there
+        shared = max_depth is None
+        built: Dict[int, Dict[str, Any]] = {}
+
+        def make(index: int) -> Dict[str, Any]:
+            node = self.node(index)
+            node['children'] = []
+            if shared:
+                built[index] = node
+            return node
+
+        roots = []
+        for root in self.roots():
+            if shared and root in built:
+                roots.append(built[root])
+                continue
+            roots.append(make(root))
+            # Iterative, since untrimmed roadmaps can be thousands of levels deep
+            stack = [(roots[-1], root, 0)]
+            while stack:
+                node, index, depth = stack.pop()
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                child_indices = self.children(index)
+                if child_limit is not None:
+                    child_indices = child_indices[:child_limit]
+                for child_index in child_indices:
+                    if shared and child_index in built:
+                        node['children'].append(built[child_index])
+                        continue
+                    child = make(child_index)
+                    node['children'].append(child)
+                    stack.append((child, child_index, depth + 1))
+        return roots
+
+    def _content_entry(self, position: int) -> tuple:
+        return _CONTENT.unpack_from(self._buf, self._contents_off + position * _CONTENT.size)
+
+    def content(self, key: str) -> Optional[str]:
+        """Content blob stored under `key` (binary search over the sorted index)"""
+        target = key.encode('utf-8')
+        low, high = 0, self.content_count
+        while low < high:
+            middle = (low + high) // 2
+            key_off, key_len, blob_off, blob_len = self._content_entry(middle)
+            start = self._strings_off + key_off
+            candidate = self._buf[start:start + key_len]
+            if candidate == target:
+                return self._string(blob_off, blob_len)
+            if candidate < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def node_content(self, node_id: str) -> Optional[str]:
+        """
+        Content blob of a node: upstream content files are named
+        `<slug>@<node id>`, so this matches on the id part of the key
+        (the key index is built on first use)
+        """
+        if self._content_by_node is None:
+            content_by_node = {}
+            for position in range(self.content_count):
+                key_off, key_len = self._content_entry(position)[:2]
+                content_by_node[self._string(key_off, key_len).rpartition('@')[2]] = position
+            self._content_by_node = content_by_node
+        position = self._content_by_node.get(node_id)
+        if position is None:
+            return None
+        blob_off, blob_len = self._content_entry(position)[2:]
+        return self._string(blob_off, blob_len)
+
+    def content_items(self) -> Dict[str, str]:
+        """Every content blob, by key (e.g. to carry them over into a rebuilt pack)"""
+        items = {}
+        for position in range(self.content_count):
+            key_off, key_len, blob_off, blob_len = self._content_entry(position)
+            items[self._string(key_off, key_len)] = self._string(blob_off, blob_len)
+        return items
+
+    def close(self) -> None:
+        self._buf.close()
+
+    def __enter__(self) -> "RoadmapPack":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def sha256_file(path: str) -> str:
+    """Hex sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
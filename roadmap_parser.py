@@ -1,52 +1,180 @@
 import requests
+import hashlib
 import json
+import math
 import os
-from typing import Dict, Any, List, Optional
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: cache entries are only locked within the process
+    fcntl = None
+
+from lru import LRUCache
+from roadmap_pack import RoadmapPack, PackError, write_pack
+from singleflight import SingleFlight
+
+DEFAULT_BASE_URL = 'https://raw.githubusercontent.com/kamranahmedse/developer-roadmap/master/src/data/roadmaps/'
+MANIFEST_FILE = 'manifest.json'
+# Roadmaps offered when the cache has no manifest from roadmap_import.py
+BUNDLED_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'roadmap_manifest.json')
+
+def _slugify(title: str) -> str:
+    """Upstream content file slug of a node title ("What are AI Agents?" -> "what-are-ai-agents")"""
+    return re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def _atomic_write(path: str, text: str) -> None:
+    """
+    Write to a temp file in the same directory, then rename over `path`, so
+    readers see either the old file or the new one, never a partial write.
+    No fsync: the cache can always be refetched, and checksums catch files
+    torn by a crash.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        # mkstemp creates 0600 files; cache files are shared by every worker
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 class RoadmapParser:
     """
     Parser for developer roadmaps from kamranahmedse/developer-roadmap
+    
+    Environment variables:
+        ROADMAP_BASE_URL           where roadmap JSON/content is fetched from (default: GitHub raw)
+        ROADMAP_FETCH_TIMEOUT      seconds allowed per roadmap fetch (default 10)
+        ROADMAP_PREFETCH_WORKERS   concurrent fetches when prefetching (default 4)
+        ROADMAP_CACHE_MAX_AGE      seconds a cached file is fresh (default 1 day)
+        ROADMAP_CACHE_SWR          seconds after that it is still served while
+                                   refreshed in the background (default 7 days)
+        ROADMAP_PACKED_CACHE       set to 0 to convert from JSON instead of the
+                                   packed .pack files (default 1)
+        ROADMAP_CONTENT_WORKERS    concurrent content file prefetches (default 4)
+    
+    Each cached file has a `.meta` sidecar with the ETag/Last-Modified it was
+    served with, when it was last validated, and its own max_age/swr. Past
+    max_age the file is revalidated with a conditional GET, so an unchanged
+    roadmap costs a 304 instead of the whole payload.
     """
     
-    def __init__(self, cache_dir: str = 'roadmap_cache'):
+    def __init__(self, cache_dir: str = 'roadmap_cache', base_url: Optional[str] = None, timeout: Optional[float] = None):
         """Initialize the roadmap parser with optional caching"""
-        self.base_url = 'https://raw.githubusercontent.com/kamranahmedse/developer-roadmap/master/src/data/roadmaps/'
+        self.base_url = base_url or os.getenv('ROADMAP_BASE_URL', DEFAULT_BASE_URL)
         self.cache_dir = cache_dir
+        self.timeout = timeout if timeout is not None else float(os.getenv('ROADMAP_FETCH_TIMEOUT', 10))
+        self.prefetch_workers = int(os.getenv('ROADMAP_PREFETCH_WORKERS', 4))
+        self.max_age = float(os.getenv('ROADMAP_CACHE_MAX_AGE', 24 * 3600))
+        self.stale_while_revalidate = float(os.getenv('ROADMAP_CACHE_SWR', 7 * 24 * 3600))
+        
+        # Background revalidation of stale entries (one refresh per file at a time)
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._thread_locks: Dict[str, threading.Lock] = {}
+        
+        # Concurrent reads/fetches of one cache entry and loads of one pack share a single run
+        self._flights = SingleFlight('roadmap_parser')
+        
+        # Background prefetch of node content files (one download per file at a
+        # time); files the upstream repo doesn't have are remembered for an hour
+        self.content_workers = int(os.getenv('ROADMAP_CONTENT_WORKERS', 4))
+        self._content_executor: Optional[ThreadPoolExecutor] = None
+        self._content_pending = set()
+        self._missing_content = LRUCache(max_entries=4096, ttl=3600)
+        
+        # Packed, memory-mapped copies of the converted roadmaps (roadmap_pack.py)
+        self.use_packs = os.getenv('ROADMAP_PACKED_CACHE', '1') != '0'
+        self._packs: Dict[str, tuple] = {}
+        
+        # One keep-alive session for every fetch; plain GETs are safe to share across threads
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1,
+                                                pool_maxsize=max(self.prefetch_workers, self.content_workers))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
         # Create cache directory if it doesn't exist
         if not os.path.exists(cache_dir):
             os.makedirs(cache_dir)
     
-    def fetch_roadmap_json(self, roadmap_name: str) -> Dict[str, Any]:
-        """Fetch the JSON data for a roadmap"""
+    def fetch_roadmap_json(self, roadmap_name: str, max_age: Optional[float] = None,
+                           stale_while_revalidate: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Fetch the JSON data for a roadmap
+        
+        Args:
+            max_age, stale_while_revalidate: Cache policy for this entry
+                (stored with it; defaults to the parser-wide settings)
+        """
         cache_path = os.path.join(self.cache_dir, f"{roadmap_name}.json")
+        url = f"{self.base_url}{roadmap_name}/{roadmap_name}.json"
+        return json.loads(self._fetch_cached(cache_path, url, max_age, stale_while_revalidate))
+    
+    def prefetch_roadmaps(self, roadmap_names: Iterable[str]) -> Dict[str, str]:
+        """
+        Fetch the roadmaps that aren't in the disk cache yet, concurrently.
         
-        # Check if we have a cached version
-        if os.path.exists(cache_path):
-            with open(cache_path, 'r') as f:
-                return json.load(f)
+        At most ROADMAP_PREFETCH_WORKERS fetches run at once, each bounded by
+        the fetch timeout; a roadmap that is still pending after its share of
+        the overall deadline is reported as timed out and not waited for.
         
-        # Fetch from GitHub
-        url = f"{self.base_url}{roadmap_name}/{roadmap_name}.json"
-        response = requests.get(url)
-        response.raise_for_status()
+        Returns:
+            {roadmap name: reason} for the roadmaps that couldn't be fetched
+        """
+        pending = [
+            name for name in dict.fromkeys(roadmap_names)
+            if not os.path.exists(os.path.join(self.cache_dir, f"{name}.json"))
+        ]
+        if not pending:
+            return {}
         
-        # Parse and cache the data
-        data = response.json()
-        with open(cache_path, 'w') as f:
-            json.dump(data, f)
+        workers = min(self.prefetch_workers, len(pending))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='roadmap-fetch')
+        futures = {executor.submit(self.fetch_roadmap_json, name): name for name in pending}
+        # Fetches run in waves of `workers`, each wave within one timeout
+        _, not_done = wait(futures, timeout=self.timeout * math.ceil(len(pending) / workers))
+        executor.shutdown(wait=False, cancel_futures=True)
         
-        return data
+        failures = {}
+        for future, name in futures.items():
+            if future in not_done:
+                failures[name] = 'timed out'
+            elif future.exception() is not None:
+                failures[name] = str(future.exception())
+        for name, reason in failures.items():
+            print(f"⚠️ Could not fetch roadmap {name}: {reason}")
+        return failures
+    
+    def source_version(self, roadmap_name: str) -> Optional[tuple]:
+        """Version of the cached roadmap JSON on disk (mtime, size), or None if not cached"""
+        try:
+            stat = os.stat(os.path.join(self.cache_dir, f"{roadmap_name}.json"))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
     
-    def fetch_content_file(self, roadmap_name: str, file_id: str) -> str:
+    def fetch_content_file(self, roadmap_name: str, file_id: str, max_age: Optional[float] = None,
+                           stale_while_revalidate: Optional[float] = None) -> str:
         """Fetch a specific content file from the roadmap"""
         cache_path = os.path.join(self.cache_dir, f"{roadmap_name}_{file_id}.md")
         
-        # Check cache first
-        if os.path.exists(cache_path):
-            with open(cache_path, 'r') as f:
-                return f.read()
-        
         # Extract the actual filename from ID (format is usually filename@id)
         parts = file_id.split('@')
         if len(parts) > 1:
@@ -54,26 +182,376 @@ class RoadmapParser:
         else:
             filename = f"{file_id}.md"
         
-        # Fetch from GitHub
+        # Content packed with the roadmap (e.g. an imported cache) saves the download
+        if self.use_packs and not os.path.exists(cache_path):
+            pack = self._open_pack(os.path.join(self.cache_dir, f"{roadmap_name}.pack"))
+            packed = pack.content(file_id) if pack is not None else None
+            if packed is not None:
+                return packed
+        
         url = f"{self.base_url}{roadmap_name}/content/{filename}"
-        response = requests.get(url)
-        response.raise_for_status()
+        return self._fetch_cached(cache_path, url, max_age, stale_while_revalidate)
+    
+    def fetch_node_content(self, roadmap_name: str, node_id: str, title: str) -> Optional[str]:
+        """
+        Markdown content of a roadmap node, or None if the roadmap has no
+        content file for it. Content packed with the roadmap is matched on the
+        node id; otherwise the upstream file `<slug of title>@<node id>.md`
+        is fetched through the disk cache.
+        """
+        if self.use_packs:
+            pack = self._open_pack(os.path.join(self.cache_dir, f"{roadmap_name}.pack"))
+            packed = pack.node_content(node_id) if pack is not None else None
+            if packed is not None:
+                return packed
         
-        content = response.text
+        file_id = f"{_slugify(title)}@{node_id}"
+        if (roadmap_name, file_id) in self._missing_content:
+            return None
+        try:
+            return self.fetch_content_file(roadmap_name, file_id)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                self._missing_content.set((roadmap_name, file_id), True)
+                return None
+            raise
+    
+    def prefetch_node_content(self, roadmap_name: str, nodes: Iterable[Tuple[str, str]]) -> int:
+        """
+        Fetch the content of (node id, title) pairs into the disk cache in the
+        background, at most ROADMAP_CONTENT_WORKERS at a time. Nodes already
+        cached, being fetched or known to have no content file are skipped.
         
-        # Cache the content
-        with open(cache_path, 'w') as f:
-            f.write(content)
+        Returns:
+            How many fetches were queued
+        """
+        queued = 0
+        for node_id, title in nodes:
+            file_id = f"{_slugify(title)}@{node_id}"
+            key = (roadmap_name, file_id)
+            if key in self._missing_content or os.path.exists(os.path.join(self.cache_dir, f"{roadmap_name}_{file_id}.md")):
+                continue
+            with self._refresh_lock:
+                if key in self._content_pending:
+                    continue
+                self._content_pending.add(key)
+                if self._content_executor is None:
+                    self._content_executor = ThreadPoolExecutor(max_workers=self.content_workers,
+                                                                thread_name_prefix='roadmap-content')
+            self._content_executor.submit(self._prefetch_one, roadmap_name, node_id, title, key)
+            queued += 1
+        return queued
+    
+    def _prefetch_one(self, roadmap_name: str, node_id: str, title: str, key: tuple) -> None:
+        try:
+            self.fetch_node_content(roadmap_name, node_id, title)
+        except Exception as e:
+            print(f"⚠️ Prefetching content of {roadmap_name}/{node_id} failed: {e}")
+        finally:
+            with self._refresh_lock:
+                self._content_pending.discard(key)
+    
+    def _fetch_cached(self, cache_path: str, url: str, max_age: Optional[float],
+                      stale_while_revalidate: Optional[float]) -> str:
+        """_fetch_entry, shared by the threads of this process that ask for the same entry at once"""
+        return self._flights.do(('entry', cache_path, max_age, stale_while_revalidate),
+                                self._fetch_entry, cache_path, url, max_age, stale_while_revalidate)
+    
+    def _fetch_entry(self, cache_path: str, url: str, max_age: Optional[float],
+                     stale_while_revalidate: Optional[float]) -> str:
+        """
+        Return the cached body for `url`, fetching or revalidating as its age requires:
+        fresh -> disk; stale within the SWR window -> disk now, background
+        refresh; older -> conditional GET (the stale copy is kept if it fails).
         
-        return content
+        Fetches and revalidations hold the entry's file lock, so concurrent
+        workers wait for one download instead of each making their own.
+        """
+        body, meta = self._read_entry(cache_path)
+        if body is None:
+            with self._entry_lock(cache_path):
+                # Another worker may have fetched it while we waited for the lock
+                body, meta = self._read_entry(cache_path)
+                if body is None:
+                    return self._download(cache_path, url, {}, max_age, stale_while_revalidate)
+        
+        if max_age is not None:
+            meta['max_age'] = max_age
+        if stale_while_revalidate is not None:
+            meta['swr'] = stale_while_revalidate
+        age = time.time() - meta['validated_at']
+        
+        if age >= meta['max_age']:
+            if age < meta['max_age'] + meta['swr']:
+                self._refresh_in_background(cache_path, url, meta)
+            else:
+                try:
+                    with self._entry_lock(cache_path):
+                        current, current_meta = self._read_entry(cache_path)
+                        if current is not None and current_meta['validated_at'] > meta['validated_at']:
+                            # Revalidated by another worker while we waited
+                            return current
+                        return self._download(cache_path, url, meta, meta['max_age'], meta['swr'])
+                except requests.RequestException as e:
+                    print(f"⚠️ Revalidating {url} failed, serving the stale copy: {e}")
+        
+        return body
     
-    def convert_to_roadmap_nodes(self, roadmap_name: str) -> Dict[str, Any]:
+    def _download(self, cache_path: str, url: str, meta: Dict[str, Any], max_age: Optional[float],
+                  stale_while_revalidate: Optional[float]) -> str:
+        """GET `url` (conditional if `meta` has validators) and update the cache entry; call with the entry lock held"""
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        new_meta = {
+            'etag': meta.get('etag'),
+            'last_modified': meta.get('last_modified'),
+            'sha256': meta.get('sha256'),
+            'validated_at': time.time(),
+            'max_age': max_age if max_age is not None else self.max_age,
+            'swr': stale_while_revalidate if stale_while_revalidate is not None else self.stale_while_revalidate
+        }
+        
+        if response.status_code == 304:
+            body, _ = self._read_entry(cache_path)
+            if body is not None:
+                # Unchanged: keep the body (and its mtime, so parsed-roadmap memos stay valid)
+                self._write_meta(cache_path, new_meta)
+                return body
+            # Our copy is gone or corrupt; fetch it unconditionally
+            response = self.session.get(url, timeout=self.timeout)
+        
+        response.raise_for_status()
+        body = response.text
+        _atomic_write(cache_path, body)
+        new_meta['etag'] = response.headers.get('ETag')
+        new_meta['last_modified'] = response.headers.get('Last-Modified')
+        new_meta['sha256'] = _sha256(body)
+        self._write_meta(cache_path, new_meta)
+        return body
+    
+    def _refresh_in_background(self, cache_path: str, url: str, meta: Dict[str, Any]) -> None:
+        with self._refresh_lock:
+            if cache_path in self._refreshing:
+                return
+            self._refreshing.add(cache_path)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='roadmap-refresh')
+        
+        def refresh():
+            try:
+                with self._entry_lock(cache_path):
+                    _, current_meta = self._read_entry(cache_path)
+                    if current_meta is None or current_meta['validated_at'] <= meta['validated_at']:
+                        self._download(cache_path, url, meta, meta['max_age'], meta['swr'])
+            except Exception as e:
+                print(f"⚠️ Background refresh of {url} failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(cache_path)
+        
+        self._refresh_executor.submit(refresh)
+    
+    def _read_entry(self, cache_path: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Cached body and metadata, or (None, None) if the file is missing or
+        doesn't match its recorded checksum
+        """
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, UnicodeDecodeError):
+            return None, None
+        meta = self._read_meta(cache_path)
+        if meta.get('sha256') and meta['sha256'] != _sha256(body):
+            # Body and sidecar are replaced one after the other, so a mismatch is
+            # either a writer between the two renames or a damaged file; refetch
+            # under the lock either way
+            return None, None
+        return body, meta
+    
+    def _read_meta(self, cache_path: str) -> Dict[str, Any]:
+        """Sidecar metadata; files cached before sidecars existed count as validated at their mtime"""
+        meta = {}
+        try:
+            with open(f"{cache_path}.meta", 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if not isinstance(meta, dict):
+            meta = {}
+        if not isinstance(meta.get('validated_at'), (int, float)):
+            try:
+                meta['validated_at'] = os.path.getmtime(cache_path)
+            except OSError:
+                meta['validated_at'] = 0.0
+        meta.setdefault('max_age', self.max_age)
+        meta.setdefault('swr', self.stale_while_revalidate)
+        return meta
+    
+    def _write_meta(self, cache_path: str, meta: Dict[str, Any]) -> None:
+        _atomic_write(f"{cache_path}.meta", json.dumps(meta))
+    
+    @contextmanager
+    def _entry_lock(self, cache_path: str):
+        """
+        Exclusive lock on one cache entry, across threads and processes
+        (flock on a `.lock` file; thread-only where fcntl isn't available)
+        """
+        if fcntl is None:
+            with self._refresh_lock:
+                lock = self._thread_locks.setdefault(cache_path, threading.Lock())
+            with lock:
+                yield
+            return
+        with open(f"{cache_path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def convert_to_roadmap_nodes(self, roadmap_name: str, max_depth: Optional[int] = None,
+                                 child_limit: Optional[int] = None) -> Dict[str, Any]:
         """
         Convert the JSON roadmap data into a structured format
         suitable for CareerPath.AI visualization
+        
+        With the packed cache enabled, nodes come from the roadmap's pack and
+        only those within `max_depth` levels / `child_limit` children per node
+        are decoded; otherwise the whole JSON is parsed and converted.
         """
+        if self.use_packs:
+            try:
+                pack = self.load_pack(roadmap_name)
+                return self._roadmap_root(roadmap_name, pack.to_tree(max_depth, child_limit))
+            except (PackError, OSError) as e:
+                print(f"⚠️ Packed cache unavailable for {roadmap_name}, using JSON: {e}")
         json_data = self.fetch_roadmap_json(roadmap_name)
+        return self.build_roadmap_tree(json_data, roadmap_name)
+    
+    def load_pack(self, roadmap_name: str) -> RoadmapPack:
+        """
+        The roadmap's packed cache, mapped into memory.
         
+        While the cached JSON is fresh this only reads its small `.meta`
+        sidecar and reuses the mapped pack; otherwise the JSON is fetched or
+        revalidated as usual and the pack is rebuilt if the JSON changed.
+        Concurrent loads of the same roadmap share one run.
+        """
+        return self._flights.do(('pack', roadmap_name), self._load_pack, roadmap_name)
+    
+    def _load_pack(self, roadmap_name: str) -> RoadmapPack:
+        json_path = os.path.join(self.cache_dir, f"{roadmap_name}.json")
+        pack_path = os.path.join(self.cache_dir, f"{roadmap_name}.pack")
+        
+        if os.path.exists(json_path):
+            meta = self._read_meta(json_path)
+            if meta.get('sha256') and time.time() - meta['validated_at'] < meta['max_age']:
+                pack = self._open_pack(pack_path)
+                if pack is not None and pack.source_sha256 == meta['sha256']:
+                    return pack
+        
+        url = f"{self.base_url}{roadmap_name}/{roadmap_name}.json"
+        body = self._fetch_cached(json_path, url, None, None)
+        source_sha256 = _sha256(body)
+        pack = self._open_pack(pack_path)
+        if pack is not None and pack.source_sha256 == source_sha256:
+            return pack
+        
+        with self._entry_lock(pack_path):
+            # Another worker may have rebuilt it while we waited for the lock
+            pack = self._open_pack(pack_path)
+            if pack is None or pack.source_sha256 != source_sha256:
+                # Content that only lives in the old pack (imported offline) is carried over
+                contents = pack.content_items() if pack is not None else {}
+                contents.update(self._cached_contents(roadmap_name))
+                tree = self.build_roadmap_tree(json.loads(body), roadmap_name)
+                write_pack(pack_path, tree['children'], contents, source_sha256)
+                pack = self._open_pack(pack_path)
+        if pack is None:
+            raise PackError(f"{pack_path}: could not be opened after building")
+        return pack
+    
+    def import_roadmap(self, roadmap_name: str, body: str, contents: Optional[Dict[str, str]] = None,
+                       max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Store a roadmap obtained offline (see roadmap_import.py) as if it had
+        just been fetched: the JSON with its `.meta` sidecar, plus its pack
+        holding `contents` (content file id -> markdown).
+        
+        Returns:
+            {'nodes': converted node count, 'sha256': sha256 of the JSON}
+        """
+        tree = self.build_roadmap_tree(json.loads(body), roadmap_name)
+        source_sha256 = _sha256(body)
+        json_path = os.path.join(self.cache_dir, f"{roadmap_name}.json")
+        pack_path = os.path.join(self.cache_dir, f"{roadmap_name}.pack")
+        
+        with self._entry_lock(json_path):
+            _atomic_write(json_path, body)
+            self._write_meta(json_path, {
+                'etag': None,
+                'last_modified': None,
+                'sha256': source_sha256,
+                'validated_at': time.time(),
+                'max_age': max_age if max_age is not None else self.max_age,
+                'swr': self.stale_while_revalidate,
+                'source': 'import'
+            })
+        with self._entry_lock(pack_path):
+            nodes = write_pack(pack_path, tree['children'], contents or {}, source_sha256)
+        return {'nodes': nodes, 'sha256': source_sha256}
+    
+    def read_manifest(self) -> Dict[str, Any]:
+        """The cache's roadmap manifest, falling back to the bundled one"""
+        for path in (os.path.join(self.cache_dir, MANIFEST_FILE), BUNDLED_MANIFEST):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(manifest, dict) and isinstance(manifest.get('roadmaps'), dict):
+                return manifest
+        return {'roadmaps': {}}
+    
+    def _open_pack(self, pack_path: str) -> Optional[RoadmapPack]:
+        """Mapped pack at `pack_path`, reused until the file is replaced; None if missing or unreadable"""
+        try:
+            stat = os.stat(pack_path)
+        except OSError:
+            return None
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self._packs.get(pack_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        try:
+            pack = RoadmapPack(pack_path)
+        except (PackError, OSError) as e:
+            print(f"⚠️ Ignoring unreadable roadmap pack {pack_path}: {e}")
+            return None
+        # The previous mapping isn't closed: other threads may still be reading
+        # it, and it is released once the last reference goes away
+        self._packs[pack_path] = (key, pack)
+        return pack
+    
+    def _cached_contents(self, roadmap_name: str) -> Dict[str, str]:
+        """Cached content files of a roadmap, by file id, for packing"""
+        prefix = f"{roadmap_name}_"
+        contents = {}
+        for filename in os.listdir(self.cache_dir):
+            if filename.startswith(prefix) and filename.endswith('.md'):
+                body, _ = self._read_entry(os.path.join(self.cache_dir, filename))
+                if body is not None:
+                    contents[filename[len(prefix):-len('.md')]] = body
+        return contents
+    
+    def build_roadmap_tree(self, json_data: Dict[str, Any], roadmap_name: str) -> Dict[str, Any]:
+        """Build the roadmap tree from already-loaded roadmap JSON"""
         # Extract nodes and edges from the JSON data
         nodes = json_data.get('nodes', [])
         
@@ -91,41 +569,86 @@ class RoadmapParser:
                     'children': []
                 }
         
-        # Build the tree structure by processing connections
-        root_nodes = []
-        connections = json_data.get('edges', [])
-        
-        # Build parent-child relationships
-        for connection in connections:
-            source = connection.get('source', '')
-            target = connection.get('target', '')
-            
-            if source in node_map and target in node_map:
-                parent = node_map[source]
-                child = node_map[target]
-                parent['children'].append(child)
-            
-        # Find root nodes (those without parents)
-        for node_id, node in node_map.items():
-            is_child = False
-            for potential_parent in node_map.values():
-                if any(child['id'] == node_id for child in potential_parent['children']):
-                    is_child = True
-                    break
-            
-            if not is_child:
-                root_nodes.append(node)
-        
-        # Create the structured roadmap
-        roadmap = {
+        # Build parent-child relationships and find the root nodes
+        root_nodes = self._link_nodes(node_map, json_data.get('edges', []))
+        return self._roadmap_root(roadmap_name, root_nodes)
+    
+    def _roadmap_root(self, roadmap_name: str, root_nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create the structured roadmap around its root nodes"""
+        return {
             'id': f"{roadmap_name}_root",
             'title': self._format_roadmap_title(roadmap_name),
             'type': 'ROOT',
             'content': f"Your personalized {self._format_roadmap_title(roadmap_name)} roadmap",
             'children': root_nodes
         }
+    
+    def _link_nodes(self, node_map: Dict[str, Dict[str, Any]], edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Attach children to their parents and return the root nodes, in O(nodes + edges).
+        
+        Duplicate edges and self-loops are ignored. A node reached from several
+        parents is shared by all of them, as before; edges that would close a
+        cycle are dropped so the result stays acyclic (and serializable). Roots
+        are the nodes without parents, plus one entry node for any cycle that no
+        root leads into.
+        """
+        # Adjacency index and in-degree map over the unique, valid edges
+        adjacency = {node_id: [] for node_id in node_map}
+        in_degree = dict.fromkeys(node_map, 0)
+        seen_edges = set()
+        skipped = 0
+        for edge in edges:
+            source = edge.get('source', '')
+            target = edge.get('target', '')
+            if source not in node_map or target not in node_map:
+                continue
+            if source == target or (source, target) in seen_edges:
+                skipped += 1
+                continue
+            seen_edges.add((source, target))
+            adjacency[source].append(target)
+            in_degree[target] += 1
+        
+        root_ids = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        
+        # Iterative DFS (no recursion limit on deep roadmaps); an edge into a
+        # node still on the stack is a back edge, i.e. it closes a cycle
+        unvisited, active, done = 0, 1, 2
+        state = dict.fromkeys(node_map, unvisited)
+        cycle_edges = 0
         
-        return roadmap
+        def visit(start_id: str) -> None:
+            nonlocal cycle_edges
+            state[start_id] = active
+            stack = [(start_id, iter(adjacency[start_id]))]
+            while stack:
+                parent_id, pending = stack[-1]
+                for child_id in pending:
+                    if state[child_id] == active:
+                        cycle_edges += 1
+                        continue
+                    node_map[parent_id]['children'].append(node_map[child_id])
+                    if state[child_id] == unvisited:
+                        state[child_id] = active
+                        stack.append((child_id, iter(adjacency[child_id])))
+                        break
+                else:
+                    state[parent_id] = done
+                    stack.pop()
+        
+        for node_id in root_ids:
+            visit(node_id)
+        # Whatever is left is only reachable through a cycle
+        for node_id in node_map:
+            if state[node_id] == unvisited:
+                root_ids.append(node_id)
+                visit(node_id)
+        
+        if skipped or cycle_edges:
+            print(f"⚠️ Roadmap graph: ignored {skipped} duplicate/self edge(s), dropped {cycle_edges} cycle edge(s)")
+        
+        return [node_map[node_id] for node_id in root_ids]
     
     def _extract_content_from_node(self, node: Dict[str, Any]) -> str:
         """Extract content from a node, could be extended to fetch from content files"""
@@ -149,19 +672,7 @@ class RoadmapParser:
 
     def fetch_all_available_roadmaps(self) -> List[str]:
         """
-        Fetch a list of all available roadmaps
-        """
-        # This would ideally query the GitHub API to get the list,
-        # but for now we'll hardcode some common ones
-        return [
-            'ai-agents',
-            'ai-engineer', 
-            'frontend',
-            'backend',
-            'devops',
-            'python',
-            'javascript',
-            'react',
-            'android',
-            'software-architect'
-        ]
+        Names of the available roadmaps, from the manifest written by
+        roadmap_import.py (or the bundled one)
+        """
+        return list(self.read_manifest()['roadmaps'])
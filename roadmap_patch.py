@@ -0,0 +1,191 @@
+"""
+Incremental roadmap updates for the flat roadmap format used by the Flask
+servers ({"nodes": [{id, label, type, parent}], "nodeDetails": {id: {...}}}).
+
+Instead of sending the whole roadmap to the model and asking for the complete
+updated roadmap back, the prompt carries a one-line-per-node summary and the
+model returns only a list of operations:
+
+    {"ops": [
+        {"op": "add_node", "id": "ai_agents", "label": "AI Agents", "type": "topic", "parent": "ai"},
+        {"op": "set_details", "id": "ai_agents", "content": "...", "resources": ["..."]}
+    ]}
+
+The server validates each op against the current roadmap and applies the
+valid ones, so existing nodes can never be dropped or rewritten.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+NODE_TYPES = ('category', 'topic', 'subtopic', 'resource')
+_ID_RE = re.compile(r'^[A-Za-z0-9_\-]{1,64}$')
+
+PATCH_FORMAT_INSTRUCTIONS = """Respond with ONLY a JSON object of this shape (no explanation, no markdown):
+{"ops": [
+  {"op": "add_node", "id": "<new unique snake_case id>", "label": "<label>", "type": "<category|topic|subtopic|resource>", "parent": "<existing or newly added node id>"},
+  {"op": "set_details", "id": "<id of a node you added>", "content": "<description>", "resources": ["<resource>", "..."]}
+]}
+Only include NEW nodes. Never repeat, rename or remove existing nodes. Return {"ops": []} if nothing should be added."""
+
+
+class PatchError(ValueError):
+    """Raised when a model reply can't be read as a patch"""
+
+
+def summarize_roadmap(roadmap: Dict[str, Any]) -> str:
+    """Compact summary of the existing nodes: one `id: label <- parent` line each"""
+    lines = []
+    for node in roadmap.get("nodes", []):
+        parent = node.get("parent")
+        line = f"{node['id']}: {node.get('label', '')}"
+        if parent:
+            line += f" <- {parent}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def build_patch_prompt(user_message: str, roadmap: Dict[str, Any], guidance: str = "") -> str:
+    """
+    Build the roadmap update prompt.
+
+    Args:
+        user_message: The user's chat message
+        roadmap: Current roadmap (only ids/labels/parents are sent)
+        guidance: Extra instructions about what to add and how detailed to be
+    """
+    return f"""As a career advisor AI, analyze this user message and extend the user's career roadmap with new nodes.
+
+User message: "{user_message}"
+
+Existing roadmap nodes (id: label <- parent):
+{summarize_roadmap(roadmap)}
+
+{guidance.strip()}
+
+{PATCH_FORMAT_INSTRUCTIONS}"""
+
+
+def _reply_json(text: str) -> Any:
+    """The JSON payload of a model reply, which may be fenced or surrounded by chatter"""
+    if text is None:
+        raise PatchError("empty reply")
+    # Extract JSON from possible markdown formatting
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0]
+    elif "```" in text:
+        text = text.split("```")[1].split("```")[0]
+    text = text.strip()
+
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError:
+        # Tolerate chatter around the object
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            raise PatchError("no JSON object in reply")
+        try:
+            payload = json.loads(text[start:end + 1])
+        except json.JSONDecodeError as e:
+            raise PatchError(f"invalid JSON: {e}")
+    return payload
+
+
+def parse_patch(text: str) -> List[Dict[str, Any]]:
+    """
+    Extract the op list from a model reply.
+
+    Raises:
+        PatchError: If the reply doesn't contain a JSON op list
+    """
+    payload = _reply_json(text)
+    ops = payload.get("ops") if isinstance(payload, dict) else payload
+    if not isinstance(ops, list):
+        raise PatchError("reply has no 'ops' list")
+    return [op for op in ops if isinstance(op, dict)]
+
+
+def parse_roadmap_json(text: str) -> Dict[str, Any]:
+    """
+    Extract a complete roadmap (the Chainlit apps ask for the whole updated
+    roadmap rather than a patch) from a model reply.
+
+    Raises:
+        PatchError: If the reply doesn't contain a roadmap with a node list
+    """
+    roadmap = _reply_json(text)
+    if not isinstance(roadmap, dict) or not isinstance(roadmap.get("nodes"), list):
+        raise PatchError("reply has no roadmap with a 'nodes' list")
+    if not all(isinstance(node, dict) and "id" in node for node in roadmap["nodes"]):
+        raise PatchError("roadmap has nodes without an id")
+    return roadmap
+
+
+def apply_patch(roadmap: Dict[str, Any], ops: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Validate ops against the roadmap and apply the valid ones.
+
+    Invalid ops (unknown op, duplicate/malformed id, unknown parent, details
+    for a node this patch didn't add) are skipped. The input roadmap is not
+    modified.
+
+    Returns:
+        (updated roadmap, ids of the nodes that were added)
+
+    Raises:
+        PatchError: If an op's id, parent or label isn't a string
+    """
+    nodes = list(roadmap.get("nodes", []))
+    details = dict(roadmap.get("nodeDetails", {}))
+    known_ids = {node["id"] for node in nodes}
+    ids_by_label = {str(node.get("label", "")).lower(): node["id"] for node in nodes}
+    added: List[str] = []
+    skipped = 0
+
+    for op in ops:
+        kind = op.get("op")
+        node_id = op.get("id")
+
+        if kind == "add_node":
+            label = op.get("label")
+            parent = op.get("parent")
+            node_type = str(op.get("type", "topic")).lower()
+            # Ids and parents are used as set/dict keys below, so check their types first
+            if not isinstance(node_id, str) or not isinstance(parent, str) or not isinstance(label, str):
+                raise PatchError(f"add_node op with a non-string id, parent or label: {op!r:.200}")
+            # Models sometimes name the parent by its label instead of its id
+            if parent not in known_ids:
+                parent = ids_by_label.get(parent.lower(), parent)
+            if (not _ID_RE.match(node_id) or node_id in known_ids or not label.strip()
+                    or node_type not in NODE_TYPES or parent not in known_ids):
+                skipped += 1
+                continue
+            nodes.append({"id": node_id, "label": label.strip(), "type": node_type, "parent": parent})
+            known_ids.add(node_id)
+            ids_by_label[label.strip().lower()] = node_id
+            added.append(node_id)
+
+        elif kind == "set_details":
+            content = op.get("content")
+            resources = op.get("resources", [])
+            if not isinstance(node_id, str):
+                raise PatchError(f"set_details op with a non-string id: {op!r:.200}")
+            if node_id not in added or not isinstance(content, str) or not isinstance(resources, list):
+                skipped += 1
+                continue
+            details[node_id] = {
+                "content": content,
+                "resources": [str(resource) for resource in resources]
+            }
+
+        else:
+            skipped += 1
+
+    if skipped:
+        print(f"Skipped {skipped} invalid roadmap patch op(s)")
+
+    updated = dict(roadmap)
+    updated["nodes"] = nodes
+    updated["nodeDetails"] = details
+    return updated, added
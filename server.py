@@ -3,15 +3,12 @@ import os
 import json
 import uuid
 from dotenv import load_dotenv
-from groq import Groq
+from model_router import router
+from rate_limiter import RateLimited, rate_limited_response, set_current_user
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Groq client
-client = Groq()
-client.api_key = os.getenv("GROQ_API_KEY")
-
 app = Flask(__name__)
 
 # In-memory storage for roadmaps
@@ -233,11 +230,12 @@ def process_chat():
         {"role": "user", "content": message}
     ]
     
+    set_current_user(user_id)
     try:
-        # Call Groq API to get a response
-        response = client.chat.completions.create(
+        # Call Groq API to get a response (rate limiter, resilience and usage accounting via the router)
+        response = router.complete(
+            'chat',
             messages=messages,
-            model="llama-3.3-70b-versatile",
             temperature=0.7,
             max_tokens=500
         )
@@ -296,6 +294,10 @@ def process_chat():
             "roadmap": roadmap
         })
     
+    except RateLimited as limited:
+        # Shed under load: let the client retry the same message
+        return rate_limited_response(limited, roadmap=roadmap)
+    
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -0,0 +1,256 @@
+"""
+Server-side Flask sessions: the cookie carries only a random session ID and
+the session data (conversation, roadmap, interests, ...) lives in a backend.
+
+Backends:
+    memory  - in-process LRU (default; per worker, lost on restart)
+    sqlite  - SQLite database in WAL mode (shared by workers on one host)
+
+Configure with environment variables:
+    SESSION_BACKEND       memory | sqlite (default memory)
+    SESSION_SQLITE_PATH   database file for the sqlite backend (default sessions.db)
+    SESSION_MAX_ENTRIES   sessions kept by the memory backend (default 10000)
+    SESSION_TTL           idle lifetime in seconds (default 7 days)
+
+Usage:
+    from session_store import init_session_store
+    init_session_store(app)
+"""
+
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from flask import current_app
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from lru import LRUCache
+
+DEFAULT_TTL = 7 * 24 * 3600
+_SESSION_ID_RE = re.compile(r'^[A-Za-z0-9_-]{32,64}$')
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its ID and whether it was touched"""
+
+    def __init__(self, initial: Optional[Dict[str, Any]] = None, sid: Optional[str] = None, new: bool = False):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+
+    def setdefault(self, key, default=None):
+        self.accessed = True
+        return super().setdefault(key, default)
+
+
+class SessionBackend:
+    """Storage interface for session data, keyed by session ID"""
+
+    def load(self, sid: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def save(self, sid: str, data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def delete(self, sid: str) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    @staticmethod
+    def serialize(data: Dict[str, Any]) -> str:
+        return json.dumps(data, separators=(',', ':'))
+
+    @staticmethod
+    def deserialize(payload: str) -> Dict[str, Any]:
+        return json.loads(payload)
+
+
+class MemorySessionBackend(SessionBackend):
+    """In-process LRU backend; each worker has its own sessions"""
+
+    def __init__(self, max_entries: int = 10000, ttl: Optional[float] = DEFAULT_TTL):
+        # Data is stored serialized so a request never shares nested lists/dicts
+        # with another request (same semantics as the cookie session had)
+        self._cache = LRUCache(max_entries=max_entries, ttl=ttl)
+
+    def load(self, sid: str) -> Optional[Dict[str, Any]]:
+        payload = self._cache.get(sid)
+        return self.deserialize(payload) if payload is not None else None
+
+    def save(self, sid: str, data: Dict[str, Any]) -> None:
+        self._cache.set(sid, self.serialize(data))
+
+    def delete(self, sid: str) -> None:
+        self._cache.delete(sid)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """SQLite backend in WAL mode so readers don't block the writer"""
+
+    def __init__(self, path: str = 'sessions.db', ttl: Optional[float] = DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " expires_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared across threads; keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, sid: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT data, expires_at FROM sessions WHERE id = ?", (sid,)
+        ).fetchone()
+        if row is None:
+            return None
+        payload, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(sid)
+            return None
+        return self.deserialize(payload)
+
+    def save(self, sid: str, data: Dict[str, Any]) -> None:
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO sessions (id, data, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+                (sid, self.serialize(data), expires_at)
+            )
+        self._writes += 1
+        # Sweep expired rows now and then instead of on every write
+        if self._writes % 500 == 0:
+            self.purge_expired()
+
+    def delete(self, sid: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+
+    def purge_expired(self) -> int:
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        count = self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {'entries': count, 'path': self.path}
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface that keeps only the session ID in the cookie"""
+
+    session_class = ServerSideSession
+
+    def __init__(self, backend: SessionBackend):
+        self.backend = backend
+
+    def open_session(self, app, request) -> ServerSideSession:
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and _SESSION_ID_RE.match(sid):
+            data = self.backend.load(sid)
+            if data is not None:
+                return self.session_class(data, sid=sid)
+        return self.session_class(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session: ServerSideSession, response) -> None:
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and not session.new:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        # Nested mutations (session['conversation'].append(...)) don't flag the
+        # session as modified, so persist whenever the request touched it
+        if session.accessed or session.modified:
+            self.backend.save(session.sid, dict(session))
+
+        # The ID never changes, so only send it for new sessions or to refresh expiry
+        if session.new or (session.permanent and app.config['SESSION_REFRESH_EACH_REQUEST']):
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app)
+            )
+
+    def persist(self, session: ServerSideSession) -> None:
+        """Write the session now, e.g. from a streaming response after headers went out"""
+        if session:
+            self.backend.save(session.sid, dict(session))
+
+
+def create_session_backend(kind: Optional[str] = None) -> SessionBackend:
+    """Build the session backend named by `kind` or SESSION_BACKEND"""
+    kind = (kind or os.getenv('SESSION_BACKEND', 'memory')).lower()
+    ttl = float(os.getenv('SESSION_TTL', DEFAULT_TTL))
+    if kind == 'sqlite':
+        return SQLiteSessionBackend(os.getenv('SESSION_SQLITE_PATH', 'sessions.db'), ttl=ttl)
+    if kind == 'memory':
+        return MemorySessionBackend(int(os.getenv('SESSION_MAX_ENTRIES', 10000)), ttl=ttl)
+    raise ValueError(f"Unknown SESSION_BACKEND: {kind}")
+
+
+def init_session_store(app, backend: Optional[SessionBackend] = None) -> SessionBackend:
+    """Install server-side sessions on a Flask app"""
+    backend = backend or create_session_backend()
+    app.session_interface = ServerSideSessionInterface(backend)
+    print(f"✅ Server-side sessions enabled ({type(backend).__name__})")
+    return backend
+
+
+def persist_session(session) -> None:
+    """Save the current session immediately if the app uses server-side sessions"""
+    interface = current_app.session_interface
+    if isinstance(interface, ServerSideSessionInterface):
+        interface.persist(session)
@@ -1,23 +1,32 @@
 from flask import Flask, send_from_directory, render_template, request, jsonify
 import os
+import copy
 import json
 import uuid
 from dotenv import load_dotenv
-import groq
+from llm_client import llm_clients, token_usage
+from roadmap_patch import build_patch_prompt, parse_patch, apply_patch
+from sse import wants_event_stream, sse_response, format_sse, StreamTimer
+from llm_parallel import ParallelCalls, CHAT_DEADLINE, ROADMAP_DEADLINE
+from keyword_matcher import message_matcher
+from context_manager import context_manager
+from rate_limiter import RateLimited, rate_limiter, rate_limited_response, set_current_user
+from llm_resilience import CircuitOpen, resilience
+from model_router import model_for, router
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__, static_folder='static')
 
-# Initialize Groq client if API key is available
-groq_client = None
-if os.getenv("GROQ_API_KEY"):
-    groq_client = groq.Client(api_key=os.getenv("GROQ_API_KEY"))
+# The shared, pooled Groq client is fetched from llm_clients at each use
+# (never kept in a global) so forked workers get their own connection pool
 
 # In-memory storage for user roadmaps and chat history
 roadmaps = {}
 chat_history = {}
+# Per-user context state (token counts, summary of older turns)
+context_states = {}
 
 # Routes
 @app.route('/')
@@ -34,14 +43,22 @@ def get_roadmap():
     
     return jsonify(roadmaps[user_id])
 
+@app.route('/api/usage', methods=['GET'])
+def get_token_usage():
+    # Token usage per LLM call site since this worker started
+    return jsonify(token_usage.snapshot())
+
 @app.route('/api/chat', methods=['POST'])
 def process_chat():
+    timer = StreamTimer()
     data = request.json
     if not data or 'message' not in data:
         return jsonify({'error': 'Message is required'}), 400
     
     user_message = data['message']
     user_id = request.cookies.get('user_id', str(uuid.uuid4()))
+    # LLM calls wait for rate limiter capacity in a queue shared fairly between users
+    set_current_user(user_id)
     
     # Initialize chat history if needed
     if user_id not in chat_history:
@@ -62,62 +79,25 @@ def process_chat():
     # Process the message and update the roadmap
     try:
         # If Groq client is available, use LLM to generate response and update roadmap
-        if groq_client:
-            # First, generate the AI response
-            chat_response = groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=chat_history[user_id],
-                temperature=0.7,
-                max_tokens=800
-            )
-            
-            ai_response = chat_response.choices[0].message.content
-            chat_history[user_id].append({"role": "assistant", "content": ai_response})
-            
-            # Now, ask the LLM to update the roadmap based on the user message
-            roadmap_update_prompt = f"""
-            As a career advisor AI, analyze this user message and update their career roadmap.
-            
-            User message: "{user_message}"
-            
-            Current roadmap: {json.dumps(roadmaps[user_id])}
-            
-            Add relevant nodes based on the user's interests. For each node, include:
-            1. id: a unique identifier (e.g., "ai_robotics")
-            2. label: a descriptive label
-            3. type: one of [category, topic, subtopic, resource]
-            4. parent: ID of the parent node
-            
-            For each new node, also add details in the nodeDetails object:
-            - content: detailed description
-            - resources: array of learning resources
-            
-            Return ONLY the complete updated roadmap JSON without any explanation.
-            """
+        if llm_clients.is_configured():
+            # Stream tokens as Server-Sent Events when the client asks for it
+            if wants_event_stream(request, data):
+                # Shed before the stream starts, while a 429 can still be sent
+                rate_limiter.check()
+                return sse_response(stream_chat_turn(user_id, user_message, current_node_ids, timer))
             
-            # Get roadmap update from LLM
-            roadmap_update = groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "system", "content": roadmap_update_prompt}],
-                temperature=0.5,
-                max_tokens=2000
-            )
-            
-            # Try to parse the roadmap from the LLM response
-            try:
-                roadmap_text = roadmap_update.choices[0].message.content
+            # The chat reply and the roadmap update are independent, so run them side by side
+            with ParallelCalls() as calls:
+                calls.submit('roadmap', update_roadmap_with_llm, roadmaps[user_id], user_message, deadline=ROADMAP_DEADLINE)
+                calls.submit('chat', generate_chat_reply, packed_history(user_id), deadline=CHAT_DEADLINE)
                 
-                # Extract JSON from possible markdown formatting
-                if "```json" in roadmap_text:
-                    roadmap_text = roadmap_text.split("```json")[1].split("```")[0].strip()
-                elif "```" in roadmap_text:
-                    roadmap_text = roadmap_text.split("```")[1].split("```")[0].strip()
+                ai_response = calls.result('chat')
+                chat_history[user_id].append({"role": "assistant", "content": ai_response})
                 
-                updated_roadmap = json.loads(roadmap_text)
-                roadmaps[user_id] = updated_roadmap
-            except Exception as e:
-                print(f"Error updating roadmap: {e}")
-                # If parsing fails, keep the original roadmap
+                # Only an update that arrives in time is applied; a late or failed one keeps the current roadmap
+                updated_roadmap = calls.result('roadmap', default=None)
+                if updated_roadmap is not None:
+                    roadmaps[user_id] = updated_roadmap
         else:
             # Fallback for when Groq API is not available
             ai_response = "I'm sorry, but the AI service is currently unavailable. Please try again later."
@@ -132,9 +112,125 @@ def process_chat():
             "newNodes": new_node_ids
         })
     
+    except CircuitOpen as unavailable:
+        # Groq is unhealthy: answer from the heuristics at once instead of waiting on it
+        print(f"⚠️ {unavailable}, using the fallback response")
+        # The 'roadmap' worker may still be reading roadmaps[user_id]; edit a copy
+        roadmaps[user_id] = update_roadmap_heuristic(copy.deepcopy(roadmaps[user_id]), user_message)
+        return jsonify({
+            "response": "I'm sorry, but the AI service is currently unavailable. Please try again later.",
+            "roadmap": roadmaps[user_id],
+            "newNodes": [node["id"] for node in roadmaps[user_id]["nodes"] if node["id"] not in current_node_ids]
+        })
+    
+    except RateLimited as limited:
+        # Shed under load: answer at once and let the client retry the same message
+        print(f"⚠️ {limited}")
+        chat_history[user_id].pop()
+        return rate_limited_response(limited, roadmap=roadmaps[user_id])
+    
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def packed_history(user_id):
+    """The user's chat history packed into the prompt token budget (older turns summarized)"""
+    history = chat_history[user_id]
+    return context_manager.pack(history[1:], context_states.setdefault(user_id, {}), system=history[:1], reserve=800)
+
+def generate_chat_reply(messages):
+    """Get the assistant's chat reply for the conversation so far"""
+    chat_response = router.complete(
+        'chat',
+        client=llm_clients.get_client(),
+        deadline=CHAT_DEADLINE,
+        hedge=True,
+        messages=messages,
+        temperature=0.7,
+        max_tokens=800
+    )
+    return chat_response.choices[0].message.content
+
+def stream_chat_turn(user_id, user_message, current_node_ids, timer):
+    """Stream the chat reply as SSE token events, then send the updated roadmap as the terminal event"""
+    # Closing the generator (client disconnected) exits the block and cancels the roadmap call
+    with ParallelCalls() as calls:
+        try:
+            calls.submit('roadmap', update_roadmap_with_llm, roadmaps[user_id], user_message, deadline=ROADMAP_DEADLINE)
+            
+            parts = []
+            try:
+                # Behind the circuit breaker, with a deadline for the first token
+                for delta in resilience.stream(
+                    'chat',
+                    llm_clients.get_client(),
+                    timer,
+                    deadline=CHAT_DEADLINE,
+                    model=model_for('chat'),
+                    messages=packed_history(user_id),
+                    temperature=0.7,
+                    max_tokens=800
+                ):
+                    parts.append(delta)
+                    yield format_sse('token', {'text': delta})
+            except CircuitOpen as unavailable:
+                # Groq is unhealthy: answer at once (the roadmap call falls back to the heuristics too)
+                print(f"⚠️ {unavailable}, using the fallback response")
+                parts = ["I'm sorry, but the AI service is currently unavailable. Please try again later."]
+                timer.mark_token()
+                yield format_sse('token', {'text': parts[0]})
+            
+            ai_response = "".join(parts)
+            chat_history[user_id].append({"role": "assistant", "content": ai_response})
+            
+            updated_roadmap = calls.result('roadmap', default=None)
+            if updated_roadmap is not None:
+                roadmaps[user_id] = updated_roadmap
+            new_node_ids = [node["id"] for node in roadmaps[user_id]["nodes"] if node["id"] not in current_node_ids]
+            
+            metrics = timer.metrics()
+            print(f"Streamed reply: TTFB {metrics['ttfb_ms']}ms, total {metrics['total_ms']}ms")
+            yield format_sse('done', {
+                "response": ai_response,
+                "roadmap": roadmaps[user_id],
+                "newNodes": new_node_ids,
+                "metrics": metrics
+            })
+        except Exception as e:
+            print(f"Error streaming chat: {e}")
+            yield format_sse('error', {"message": str(e)})
+
+def update_roadmap_with_llm(roadmap, user_message):
+    """
+    Ask the LLM for new nodes (as a patch) and return the updated roadmap.
+
+    Runs in a worker thread and may outlive its deadline, so it never writes
+    roadmaps[...]: the caller applies the result only if it arrives in time.
+    """
+    roadmap_update_prompt = build_patch_prompt(user_message, roadmap, guidance="""
+    Add relevant nodes based on the user's interests, attached to the most specific existing parent.
+    Give every new node a set_details op with a detailed description and learning resources.
+    """)
+    
+    # Validate the patch and apply it; existing nodes are never touched
+    try:
+        # Get roadmap patch from LLM (a reply without a valid patch is retried on the large model)
+        roadmap_update, ops = router.complete_parsed(
+            'roadmap_patch',
+            parse_patch,
+            client=llm_clients.get_client(),
+            deadline=ROADMAP_DEADLINE,
+            messages=[{"role": "system", "content": roadmap_update_prompt}],
+            temperature=0.5,
+            max_tokens=600
+        )
+        updated_roadmap, added = apply_patch(roadmap, ops)
+        return updated_roadmap
+    except Exception as e:
+        # Bad patch, unavailable model or any other failure: use the fallback update
+        print(f"Error updating roadmap: {e}")
+        # (on a copy: the heuristic update works in place)
+        return update_roadmap_heuristic(copy.deepcopy(roadmap), user_message)
+
 def create_default_roadmap():
     """Create a default roadmap to start with"""
     return {
@@ -228,11 +324,11 @@ def update_roadmap_heuristic(roadmap, message):
     Fallback method to update roadmap based on simple keyword matching
     Used when LLM is not available
     """
-    message_lower = message.lower()
+    matches = message_matcher.scan(message)
     new_nodes = []
     
     # Check for AI/Robotics related keywords
-    if ('ai' in message_lower or 'artificial intelligence' in message_lower) and ('robot' in message_lower or 'robotics' in message_lower):
+    if matches.has('domain', 'artificial intelligence') and matches.has('topic', 'robotics'):
         if not any(node['id'] == 'ai_robotics' for node in roadmap['nodes']):
             # Add AI Robotics node
             roadmap['nodes'].append({
@@ -299,9 +395,9 @@ def update_roadmap_heuristic(roadmap, message):
             }
     
     # Check for frontend development keywords
-    elif any(keyword in message_lower for keyword in ['frontend', 'front end', 'ui', 'interface', 'react', 'vue', 'angular']):
+    elif matches.has('topic', 'frontend'):
         # Frontend frameworks
-        if any(keyword in message_lower for keyword in ['react', 'reactjs']):
+        if matches.has('topic', 'react'):
             if not any(node['id'] == 'react' for node in roadmap['nodes']):
                 roadmap['nodes'].append({
                     "id": "react",
@@ -319,7 +415,7 @@ def update_roadmap_heuristic(roadmap, message):
                     ]
                 }
         
-        if any(keyword in message_lower for keyword in ['vue', 'vuejs']):
+        if matches.has('topic', 'vue'):
             if not any(node['id'] == 'vue' for node in roadmap['nodes']):
                 roadmap['nodes'].append({
                     "id": "vue",
@@ -337,7 +433,7 @@ def update_roadmap_heuristic(roadmap, message):
                     ]
                 }
         
-        if any(keyword in message_lower for keyword in ['angular', 'angularjs']):
+        if matches.has('topic', 'angular'):
             if not any(node['id'] == 'angular' for node in roadmap['nodes']):
                 roadmap['nodes'].append({
                     "id": "angular",
@@ -356,9 +452,9 @@ def update_roadmap_heuristic(roadmap, message):
                 }
     
     # Check for backend development keywords
-    elif any(keyword in message_lower for keyword in ['backend', 'back end', 'server', 'database', 'api', 'node', 'express', 'django', 'flask']):
+    elif matches.has('topic', 'backend'):
         # Backend frameworks
-        if any(keyword in message_lower for keyword in ['node', 'nodejs', 'express', 'expressjs']):
+        if matches.has('topic', 'node'):
             if not any(node['id'] == 'node_express' for node in roadmap['nodes']):
                 roadmap['nodes'].append({
                     "id": "node_express",
@@ -376,7 +472,7 @@ def update_roadmap_heuristic(roadmap, message):
                     ]
                 }
         
-        if any(keyword in message_lower for keyword in ['django', 'python web']):
+        if matches.has('topic', 'django'):
             if not any(node['id'] == 'django' for node in roadmap['nodes']):
                 roadmap['nodes'].append({
                     "id": "django",
@@ -0,0 +1,95 @@
+"""
+Single-flight execution: concurrent identical calls share one run.
+
+When many users arrive at once they ask for the same things: the same
+roadmap JSON on a cold cache, the same converted subtrees, the same
+greeting completion. `SingleFlight.do(key, fn)` runs `fn` for the first
+caller of a key; callers that arrive while it is running wait for it and
+get the same result (or exception) instead of repeating the work. Once the
+call finishes the key is forgotten, so this complements caches rather than
+replacing them.
+
+Results are shared between callers, so use it for values nobody mutates
+(strings, read-only objects) or copy them afterwards.
+"""
+
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key; counters are reported under `name`"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executions = 0
+        self._shared = 0
+        _groups.add(self)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        `fn(*args, **kwargs)`, run once for all concurrent callers with `key`
+
+        Raises:
+            Whatever the shared run raised (in every caller that waited for it)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self._executions += 1
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Runs, calls that shared another caller's run, and keys running now"""
+        with self._lock:
+            return {'executions': self._executions, 'shared': self._shared, 'in_flight': len(self._calls)}
+
+
+# Every group, for the process-wide report (groups with the same name are added up)
+_groups: "weakref.WeakSet[SingleFlight]" = weakref.WeakSet()
+
+
+def singleflight_stats() -> Dict[str, Dict[str, int]]:
+    """Duplicate-suppression counters of every single-flight group, by name"""
+    totals: Dict[str, Dict[str, int]] = {}
+    for group in list(_groups):
+        stats = group.stats()
+        total = totals.setdefault(group.name, {'executions': 0, 'shared': 0, 'in_flight': 0})
+        for key, value in stats.items():
+            total[key] += value
+    return totals
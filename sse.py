@@ -0,0 +1,111 @@
+"""
+Server-Sent Events helpers for streaming chat replies.
+
+The chat endpoints forward model tokens to the browser as they arrive instead
+of waiting for the full completion. Wire format (one event per token batch,
+then exactly one terminal event):
+
+    event: token
+    data: {"text": "Hello"}
+
+    event: done
+    data: {"response": "...", "roadmap": {...}, "metrics": {"ttfb_ms": 123.4, ...}}
+
+    event: error
+    data: {"message": "..."}
+"""
+
+import json
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from flask import Response, stream_with_context
+
+from llm_client import usage_tokens
+from rate_limiter import estimate_call_tokens, rate_limiter
+
+
+def wants_event_stream(request, data: Optional[Dict[str, Any]] = None) -> bool:
+    """Whether the client asked for a streamed (SSE) chat reply"""
+    if data and data.get('stream') in (True, 1, '1', 'true'):
+        return True
+    if request.args.get('stream') in ('1', 'true'):
+        return True
+    return 'text/event-stream' in request.headers.get('Accept', '')
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Serialize one SSE event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(events: Iterator[str]) -> Response:
+    """Wrap an event generator in a streaming response that proxies won't buffer"""
+    response = Response(stream_with_context(events), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class StreamTimer:
+    """Measures time-to-first-token and total time for a streamed reply"""
+
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = started_at or time.perf_counter()
+        self.first_token_at: Optional[float] = None
+
+    def mark_token(self) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def metrics(self) -> Dict[str, Optional[float]]:
+        now = time.perf_counter()
+        ttfb = None
+        if self.first_token_at is not None:
+            ttfb = round((self.first_token_at - self.started_at) * 1000, 1)
+        return {
+            'ttfb_ms': ttfb,
+            'total_ms': round((now - self.started_at) * 1000, 1)
+        }
+
+
+def stream_completion(client, timer: Optional[StreamTimer] = None, **create_kwargs) -> Iterator[str]:
+    """
+    Call the Groq chat completions API with stream=True and yield text deltas.
+
+    Args:
+        client: A Groq client
+        timer: Optional StreamTimer to record time-to-first-token
+        **create_kwargs: Arguments for client.chat.completions.create
+
+    Yields:
+        Non-empty content deltas in arrival order
+
+    Raises:
+        RateLimited: when the rate limiter sheds the call
+    """
+    create_kwargs['stream'] = True
+    estimated = estimate_call_tokens(create_kwargs)
+    rate_limiter.acquire(estimated, timeout=create_kwargs.get('timeout'))
+    # Refund the estimate if the request fails; keep it if the stream ends without a usage block
+    actual: Optional[int] = 0
+    try:
+        stream = client.chat.completions.create(**create_kwargs)
+        actual = None
+        try:
+            for chunk in stream:
+                # Groq reports the stream's usage in the last chunk
+                usage = chunk.usage or getattr(chunk.x_groq, 'usage', None)
+                if usage is not None:
+                    actual = usage_tokens(usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if timer:
+                        timer.mark_token()
+                    yield delta
+        finally:
+            stream.close()
+    finally:
+        rate_limiter.settle(estimated, actual)
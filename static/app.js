@@ -620,15 +620,19 @@ async function sendMessage() {
     chatMessages.appendChild(loadingDiv);
     chatMessages.scrollTop = chatMessages.scrollHeight;
     
+    // Remove loading indicator (once the first token arrives when streaming)
+    const removeLoading = () => {
+        if (loadingDiv.parentNode) {
+            chatMessages.removeChild(loadingDiv);
+        }
+    };
+    
     try {
         // Process the message through the server API
-        await sendChatMessage(text);
-        
-        // Remove loading indicator
-        chatMessages.removeChild(loadingDiv);
+        await sendChatMessage(text, removeLoading);
+        removeLoading();
     } catch (error) {
-        // Remove loading indicator
-        chatMessages.removeChild(loadingDiv);
+        removeLoading();
         
         // Show error message
         addMessage('Sorry, I encountered an error while processing your message. Please try again.', 'bot');
@@ -641,58 +645,108 @@ async function sendMessage() {
     }
 }
 
-// Process chat through the server API
-async function sendChatMessage(message) {
+// Read a Server-Sent Events response body, calling onEvent(name, data) per event
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let eventName = 'message';
+            let dataLines = [];
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+            });
+            if (dataLines.length > 0) {
+                onEvent(eventName, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+}
+
+// Process chat through the server API, streaming tokens into the chat as they arrive
+async function sendChatMessage(message, onFirstToken) {
     try {
         console.log('Sending chat message to API:', message);
-        console.time('API Request Time');
+        const requestStart = performance.now();
         
-        // Send message to API
+        // Ask for a streamed reply; servers without streaming answer with plain JSON
         const response = await fetch('/api/chat', {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
             },
-            body: JSON.stringify({ message: message })
+            body: JSON.stringify({ message: message, stream: true })
         });
         
-        console.timeEnd('API Request Time');
-        
         if (!response.ok) {
             throw new Error(`Server returned ${response.status}: ${response.statusText}`);
         }
         
-        const data = await response.json();
-        console.log('Server response:', data);
-        
-        // Add bot response to chat
-        if (data.response) {
-            addMessage(data.response, 'bot');
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!contentType.includes('text/event-stream')) {
+            const data = await response.json();
+            console.log(`API Request Time: ${(performance.now() - requestStart).toFixed(1)}ms`);
+            if (onFirstToken) onFirstToken();
+            if (data.response) {
+                addMessage(data.response, 'bot');
+            }
+            handleChatResult(data);
+            return true;
         }
         
-        // Update roadmap if new nodes were added
-        if (data.roadmap) {
-            roadmapData = data.roadmap;
-            const newNodes = data.newNodes || [];
-            
-            // Show system message if new nodes were added
-            if (newNodes.length > 0) {
-                // Get the labels of new nodes
-                const newNodeLabels = newNodes.map(nodeId => {
-                    const node = roadmapData.nodes.find(n => n.id === nodeId);
-                    return node ? node.label : nodeId;
-                }).join(', ');
-                
-                const systemMsg = document.createElement('div');
-                systemMsg.className = 'message system-message';
-                systemMsg.textContent = `✨ Added ${newNodes.length} new topics to your roadmap: ${newNodeLabels}`;
-                chatMessages.appendChild(systemMsg);
+        // Render tokens into a live message, then swap in the formatted reply
+        let liveMessage = null;
+        let finalData = null;
+        let streamError = null;
+        
+        await readEventStream(response, (event, data) => {
+            if (event === 'token') {
+                if (!liveMessage) {
+                    console.log(`Time to first token: ${(performance.now() - requestStart).toFixed(1)}ms`);
+                    if (onFirstToken) onFirstToken();
+                    liveMessage = document.createElement('div');
+                    liveMessage.className = 'message bot-message';
+                    chatMessages.appendChild(liveMessage);
+                }
+                liveMessage.textContent += data.text;
                 chatMessages.scrollTop = chatMessages.scrollHeight;
+            } else if (event === 'done') {
+                finalData = data;
+            } else if (event === 'error') {
+                streamError = data.message || 'Stream error';
             }
-            
-            // Update the roadmap visualization
-            renderRoadmap(newNodes);
+        });
+        
+        console.log(`API Request Time: ${(performance.now() - requestStart).toFixed(1)}ms`);
+        if (liveMessage) {
+            chatMessages.removeChild(liveMessage);
+        }
+        if (streamError || !finalData) {
+            throw new Error(streamError || 'Stream ended unexpectedly');
+        }
+        if (onFirstToken) onFirstToken();
+        
+        console.log('Server response:', finalData);
+        if (finalData.metrics) {
+            console.log(`Server-side TTFB: ${finalData.metrics.ttfb_ms}ms, total: ${finalData.metrics.total_ms}ms`);
         }
+        if (finalData.response) {
+            addMessage(finalData.response, 'bot');
+        }
+        handleChatResult(finalData);
         
         return true;
     } catch (error) {
@@ -702,6 +756,33 @@ async function sendChatMessage(message) {
     }
 }
 
+// Apply the roadmap part of a chat reply
+function handleChatResult(data) {
+    // Update roadmap if new nodes were added
+    if (data.roadmap) {
+        roadmapData = data.roadmap;
+        const newNodes = data.newNodes || [];
+        
+        // Show system message if new nodes were added
+        if (newNodes.length > 0) {
+            // Get the labels of new nodes
+            const newNodeLabels = newNodes.map(nodeId => {
+                const node = roadmapData.nodes.find(n => n.id === nodeId);
+                return node ? node.label : nodeId;
+            }).join(', ');
+            
+            const systemMsg = document.createElement('div');
+            systemMsg.className = 'message system-message';
+            systemMsg.textContent = `✨ Added ${newNodes.length} new topics to your roadmap: ${newNodeLabels}`;
+            chatMessages.appendChild(systemMsg);
+            chatMessages.scrollTop = chatMessages.scrollHeight;
+        }
+        
+        // Update the roadmap visualization
+        renderRoadmap(newNodes);
+    }
+}
+
 // Add a message to the chat
 function addMessage(text, sender) {
     const message = document.createElement('div');
@@ -64,6 +64,39 @@ function collapseMessage(messageId) {
     }
 }
 
+// Read a Server-Sent Events response body, calling onEvent(name, data) per event
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let eventName = 'message';
+            let dataLines = [];
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+            });
+            if (dataLines.length > 0) {
+                onEvent(eventName, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+}
+
+// ETag of the roadmap currently rendered
+let renderedRoadmapEtag = null;
+
 // Chat logic
 function sendMessage() {
     const input = document.getElementById('chat-input');
@@ -76,19 +109,67 @@ function sendMessage() {
     input.value = '';
     chatBox.scrollTop = chatBox.scrollHeight;
     
+    const requestStart = performance.now();
+    
+    // Ask for a streamed reply; servers without streaming answer with plain JSON
     fetch('/api/chat', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ message })
+        headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+        body: JSON.stringify({ message, stream: true })
+    })
+    .then(res => {
+        const contentType = res.headers.get('Content-Type') || '';
+        if (!contentType.includes('text/event-stream')) {
+            return res.json();
+        }
+        
+        // Render tokens into a live bot message as they arrive
+        let liveText = null;
+        let finalData = null;
+        let streamError = null;
+        const liveMessage = document.createElement('div');
+        liveMessage.className = 'message bot-message';
+        
+        return readEventStream(res, (event, data) => {
+            if (event === 'token') {
+                if (liveText === null) {
+                    console.log(`Time to first token: ${(performance.now() - requestStart).toFixed(1)}ms`);
+                    liveText = '';
+                    chatBox.appendChild(liveMessage);
+                }
+                liveText += data.text;
+                liveMessage.innerHTML = `<b>Bot:</b> ${formatBotResponse(liveText)}`;
+                chatBox.scrollTop = chatBox.scrollHeight;
+            } else if (event === 'done') {
+                finalData = data;
+            } else if (event === 'error') {
+                streamError = data.message || 'Stream error';
+            }
+        }).then(() => {
+            if (liveMessage.parentNode) {
+                chatBox.removeChild(liveMessage);
+            }
+            if (streamError || !finalData) {
+                throw new Error(streamError || 'Stream ended unexpectedly');
+            }
+            if (finalData.metrics) {
+                console.log(`Server-side TTFB: ${finalData.metrics.ttfb_ms}ms, total: ${finalData.metrics.total_ms}ms`);
+            }
+            return finalData;
+        });
     })
-    .then(res => res.json())
     .then(data => {
+        console.log(`API Request Time: ${(performance.now() - requestStart).toFixed(1)}ms`);
+        
         // Add bot's response with markdown support and expandable content
         chatBox.innerHTML += `<div class="message bot-message"><b>Bot:</b> ${createExpandableMessage(data.response)}</div>`;
         chatBox.scrollTop = chatBox.scrollHeight;
         
-        // Check if roadmap data exists and has the required structure
-        if (data.roadmap) {
+        // Node IDs are deterministic, so an unchanged roadmap has the same ETag; keep the current view
+        if (data.roadmap && data.roadmap_etag && data.roadmap_etag === renderedRoadmapEtag) {
+            console.log('Roadmap unchanged');
+        } else if (data.roadmap) {
+            renderedRoadmapEtag = data.roadmap_etag || null;
             console.log('Received roadmap data:', JSON.stringify(data.roadmap));
             
             try {
@@ -150,6 +231,54 @@ function countNewNodes(roadmap) {
     return newCount;
 }
 
+// Children loaded on demand for trimmed developer-roadmap nodes, by node id;
+// kept across re-renders so expanded branches survive the next chat reply
+const expandedPages = {};
+
+// Label for a node, noting how many of its children haven't been loaded yet
+function nodeLabel(node) {
+    const shown = (node.children || []).length;
+    if (node.next_cursor != null && node.child_count > shown) {
+        return `${node.title} (+${node.child_count - shown})`;
+    }
+    return node.title;
+}
+
+function visNode(node, level) {
+    return {
+        id: node.id,
+        label: nodeLabel(node),
+        level: level,
+        color: getNodeColor(node.type),
+        shape: getNodeShape(node.type),
+        font: { color: '#ffffff', size: 14 },
+        margin: 10,
+        data: node // Store the original data for details
+    };
+}
+
+function visEdge(parentId, childId) {
+    return {
+        from: parentId,
+        to: childId,
+        arrows: 'to',
+        color: { color: '#4a5568' },
+        smooth: { type: 'cubicBezier', roundness: 0.2 }
+    };
+}
+
+// Merge previously expanded children back into a freshly received node
+function applyExpandedPages(node) {
+    const page = expandedPages[node.id];
+    if (!page) return;
+    node.children = node.children || [];
+    const known = new Set(node.children.map(child => child.id));
+    page.children.forEach(child => {
+        if (!known.has(child.id)) node.children.push(child);
+    });
+    node.next_cursor = page.next_cursor;
+}
+
 // Convert hierarchical data to vis.js format
 function convertToVisFormat(roadmapData) {
     const nodes = [];
@@ -157,20 +286,8 @@ function convertToVisFormat(roadmapData) {
     const highlightNodes = [];
     
     function traverse(node, parent = null, level = 0) {
-        // Create node
-        const nodeColor = getNodeColor(node.type);
-        const nodeShape = getNodeShape(node.type);
-        
-        nodes.push({
-            id: node.id,
-            label: node.title,
-            level: level,
-            color: nodeColor,
-            shape: nodeShape,
-            font: { color: '#ffffff', size: 14 },
-            margin: 10,
-            data: node // Store the original data for details
-        });
+        applyExpandedPages(node);
+        nodes.push(visNode(node, level));
         
         // If this is a new node, highlight it
         if (!previousNodes.has(node.id)) {
@@ -179,13 +296,7 @@ function convertToVisFormat(roadmapData) {
         
         // Create edge if parent exists
         if (parent) {
-            edges.push({
-                from: parent.id,
-                to: node.id,
-                arrows: 'to',
-                color: { color: '#4a5568' },
-                smooth: { type: 'cubicBezier', roundness: 0.2 }
-            });
+            edges.push(visEdge(parent.id, node.id));
         }
         
         // Process children recursively
@@ -198,6 +309,44 @@ function convertToVisFormat(roadmapData) {
     return { nodes, edges, highlightNodes };
 }
 
+// Load the next page of a trimmed node's children and add them to the graph
+async function expandNode(node, data) {
+    if (node.next_cursor == null || !node.roadmap || node.loading) return;
+    node.loading = true;
+    try {
+        const params = new URLSearchParams({ roadmap: node.roadmap, cursor: node.next_cursor });
+        const response = await fetch(`/api/roadmap/node/${encodeURIComponent(node.id)}/children?${params}`);
+        if (!response.ok) {
+            // Servers without the endpoint (or an evicted roadmap): stop offering expansion
+            node.next_cursor = null;
+            data.nodes.update({ id: node.id, label: nodeLabel(node) });
+            return;
+        }
+        const page = await response.json();
+        const parentLevel = data.nodes.get(node.id).level;
+        
+        node.children = node.children || [];
+        page.children.forEach(child => {
+            node.children.push(child);
+            if (!data.nodes.get(child.id)) {
+                data.nodes.add(visNode(child, parentLevel + 1));
+            }
+            data.edges.add(visEdge(node.id, child.id));
+            previousNodes.add(child.id);
+        });
+        node.next_cursor = page.next_cursor;
+        data.nodes.update({ id: node.id, label: nodeLabel(node) });
+        
+        const expanded = expandedPages[node.id] || (expandedPages[node.id] = { children: [] });
+        expanded.children.push(...page.children);
+        expanded.next_cursor = page.next_cursor;
+    } catch (error) {
+        console.error('Error expanding roadmap node:', error);
+    } finally {
+        node.loading = false;
+    }
+}
+
 // Get node color based on type
 function getNodeColor(type) {
     switch(type) {
@@ -326,9 +475,12 @@ function renderRoadmap(roadmapData = null) {
     network.on('click', function(params) {
         if (params.nodes.length > 0) {
             const nodeId = params.nodes[0];
-            const nodeData = nodes.find(n => n.id === nodeId);
+            const nodeData = data.nodes.get(nodeId);
             if (nodeData && nodeData.data) {
                 showNodeDetails(nodeData.data);
+                // Developer-roadmap nodes load their content and next children on click
+                loadNodeContent(nodeData.data, network);
+                expandNode(nodeData.data, data);
             }
         } else {
             // Hide details panel when clicking away
@@ -357,17 +509,58 @@ function renderRoadmap(roadmapData = null) {
     }
 }
 
+// Node whose details panel is open
+let detailsNodeId = null;
+
+// Fetch a developer-roadmap node's full content when it is opened, asking the
+// server to prefetch the content of its visible siblings and children
+async function loadNodeContent(node, network) {
+    if (!node.roadmap || node.contentLoaded) return;
+    const related = new Set(network.getConnectedNodes(node.id, 'to'));
+    network.getConnectedNodes(node.id, 'from').forEach(parentId => {
+        network.getConnectedNodes(parentId, 'to').forEach(id => related.add(id));
+    });
+    related.delete(node.id);
+    
+    try {
+        const params = new URLSearchParams({ roadmap: node.roadmap, prefetch: [...related].join(',') });
+        const response = await fetch(`/api/roadmap/node/${encodeURIComponent(node.id)}/content?${params}`);
+        if (!response.ok) return;
+        const details = await response.json();
+        node.contentLoaded = true;
+        if (details.has_content_file) {
+            node.content = details.content;
+            node.markdown = true;
+            node.resources = details.resources;
+        }
+        if (detailsNodeId === node.id) {
+            showNodeDetails(node);
+        }
+    } catch (error) {
+        console.error('Error loading node content:', error);
+    }
+}
+
 // Show node details in the panel
 function showNodeDetails(node) {
     const detailsDiv = document.getElementById('node-details');
     if (!detailsDiv) return;
+    detailsNodeId = node.id;
     
     // Set content
     const title = document.createElement('h3');
     title.textContent = node.title;
     
-    const content = document.createElement('p');
-    content.textContent = node.content || 'No detailed information available';
+    let content;
+    if (node.markdown) {
+        // Content files from the developer roadmaps are markdown
+        content = document.createElement('div');
+        content.className = 'node-content';
+        content.innerHTML = formatBotResponse(node.content);
+    } else {
+        content = document.createElement('p');
+        content.textContent = node.content || 'No detailed information available';
+    }
     
     // Clear previous content
     detailsDiv.innerHTML = '';
@@ -414,6 +607,7 @@ function hideNodeDetails() {
     if (detailsDiv) {
         detailsDiv.classList.remove('visible');
     }
+    detailsNodeId = null;
 }
 
 // Initial render with welcome message
@@ -0,0 +1,23 @@
+"""
+Tokenizer-free token estimates for chat messages.
+
+Tokens are estimated from character counts (~4 per token plus per-message
+overhead), which is close enough for prompt budgeting (context_manager) and
+rate limiting (rate_limiter) and needs no tokenizer.
+"""
+
+from typing import Dict
+
+# Role/formatting tokens each message adds on top of its content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+Message = Dict[str, str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a piece of text"""
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: Message) -> int:
+    return estimate_tokens(message.get('content') or '') + MESSAGE_OVERHEAD_TOKENS
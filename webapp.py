@@ -3,8 +3,9 @@ import os
 import json
 import uuid
 from dotenv import load_dotenv
-import groq
 import threading
+from model_router import router
+from rate_limiter import RateLimited, rate_limited_response, set_current_user
 
 # Load environment variables
 load_dotenv()
@@ -15,9 +16,6 @@ app = Flask(__name__, static_folder='static')
 roadmaps = {}
 chat_history = {}
 
-# Initialize Groq client
-client = groq.Client(api_key=os.getenv("GROQ_API_KEY"))
-
 # Get user ID
 def get_user_id():
     if not request.cookies.get('user_id'):
@@ -130,11 +128,12 @@ def chat():
     
     roadmap = roadmaps[user_id]
     
-    # Send message to Groq
+    # Send message to Groq (rate limiter, resilience and usage accounting via the router)
+    set_current_user(user_id)
     try:
-        response = client.chat.completions.create(
+        response = router.complete(
+            'chat',
             messages=chat_history[user_id],
-            model="llama-3.3-70b-versatile",
             temperature=0.7,
             max_tokens=800
         )
@@ -150,6 +149,10 @@ def chat():
             "response": ai_response,
             "roadmap": roadmap
         })
+    except RateLimited as limited:
+        # Shed under load: let the client retry the same message
+        chat_history[user_id].pop()
+        return rate_limited_response(limited, roadmap=roadmap)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 